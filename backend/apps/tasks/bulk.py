@@ -0,0 +1,469 @@
+"""Bulk task operations for task management."""
+
+import logging
+import time
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import models, transaction
+from django.db.models import signals as model_signals
+from django.utils import timezone
+from rest_framework import serializers
+
+from . import counters, response_cache, signals
+from .models import Task
+from .search import get_search_backend
+from .serializers import TaskBulkItemSerializer, TaskUpdateSerializer
+
+logger = logging.getLogger(__name__)
+
+# Columns an upsert overwrites on an existing task; created_at is kept.
+UPSERT_FIELDS = ['title', 'description', 'status', 'due_date', 'updated_at']
+# Columns a bulk patch may change.
+PATCH_FIELDS = ['title', 'description', 'status', 'due_date']
+SEARCH_FIELDS = {'title', 'description'}
+
+
+def batch_size():
+    """Return the number of rows written per statement."""
+    return getattr(settings, 'TASK_BULK_BATCH_SIZE', 1000)
+
+
+def _batches(values):
+    size = batch_size()
+    for start in range(0, len(values), size):
+        yield values[start:start + size]
+
+
+def clean_ids(values):
+    """Return ``values`` as a list of unique task ids, or None if any is invalid."""
+    if not isinstance(values, list):
+        return None
+    ids = []
+    for value in values:
+        if isinstance(value, bool):
+            return None
+        try:
+            ids.append(int(value))
+        except (TypeError, ValueError):
+            return None
+    return list(dict.fromkeys(ids))
+
+
+def _throughput(action, count, chunks, started):
+    elapsed = time.perf_counter() - started
+    logger.info('%s: %d tasks in %d chunks, %.1f ms', action, count, chunks, elapsed * 1000)
+    return {
+        'chunks': chunks,
+        'elapsed_ms': round(elapsed * 1000, 1),
+        'tasks_per_second': round(count / elapsed) if elapsed else count,
+    }
+
+
+def validate_items(items, upsert, context=None):
+    """
+    Validate every item with ``TaskBulkItemSerializer`` in a single pass.
+
+    Returns ``(valid, errors)`` where ``valid`` is a list of
+    ``(index, validated_data)`` and ``errors`` a list of
+    ``{'index': ..., 'errors': ...}``.
+    """
+    item_serializer = TaskBulkItemSerializer(context=context)
+    valid, errors, seen = [], [], set()
+    for index, item in enumerate(items):
+        try:
+            data = item_serializer.run_validation(item)
+        except serializers.ValidationError as exc:
+            errors.append({'index': index, 'errors': exc.detail})
+            continue
+
+        external_id = data.get('external_id')
+        if upsert and not external_id:
+            errors.append({'index': index, 'errors': {
+                'external_id': ['This field is required in upsert mode.'],
+            }})
+        elif external_id and external_id in seen:
+            errors.append({'index': index, 'errors': {
+                'external_id': ['Duplicate external_id in this request.'],
+            }})
+        else:
+            if external_id:
+                seen.add(external_id)
+            valid.append((index, data))
+    return valid, errors
+
+
+def _lock_external_ids(user):
+    """
+    Serialize writes of ``user``'s external ids until the transaction ends.
+
+    The lookup in ``create_tasks`` decides between insert, update and
+    "already exists"; without a lock two requests could both find a new
+    key free, and the second insert would fail on the unique constraint
+    (a trigger on PostgreSQL) with an ``IntegrityError``. The user row is
+    locked rather than the keys, so the lock count does not
+    grow with the batch. ``FOR NO KEY UPDATE`` conflicts with itself but
+    not with the ``FOR KEY SHARE`` lock that every task insert's foreign
+    key check takes, so the user's other writes are not held up.
+    """
+    list(
+        get_user_model()._base_manager.select_for_update(no_key=True)
+        .filter(pk=user.pk).values_list('pk', flat=True)
+    )
+
+
+def create_tasks(user, items, upsert=False, context=None):
+    """
+    Insert ``items`` for ``user`` with batched ``bulk_create`` calls.
+
+    Invalid items are reported and skipped; the valid ones are written in
+    one transaction. With ``upsert`` every item needs an ``external_id``
+    and replaces the user's task with that id if there is one (fields the
+    item leaves out are reset to their defaults). Without it, an item whose
+    ``external_id`` is already taken is reported as an error.
+
+    Upserts update the matched rows and insert the rest rather than use
+    ``ON CONFLICT``: on PostgreSQL ``(user, external_id)`` is kept unique
+    by a trigger, since the table is partitioned by status, and there is
+    no unique index for a conflict target. ``_lock_external_ids`` keeps
+    concurrent requests from racing for the same keys.
+    """
+    valid, errors = validate_items(items, upsert, context)
+    now = timezone.now()
+    created = updated = 0
+    results = []
+
+    with transaction.atomic():
+        keys = [data['external_id'] for _, data in valid if data.get('external_id')]
+        existing = {}
+        existing_ids = {}
+        if keys:
+            _lock_external_ids(user)
+        for batch in _batches(keys):
+            # A soft-deleted task still holds its external id; drop it now.
+            _delete_rows(Task.all_objects.filter(
+                user=user, external_id__in=batch, deleted_at__isnull=False,
+            ))
+            rows = Task.objects.filter(user=user, external_id__in=batch).values_list(
+                'external_id', 'id', 'status', 'due_date'
+            )
+            for key, pk, status, due_date in rows:
+                existing[key] = (status, due_date)
+                existing_ids[key] = pk
+
+        if not upsert and existing:
+            taken = [(index, data) for index, data in valid if data.get('external_id') in existing]
+            errors.extend(
+                {'index': index, 'errors': {
+                    'external_id': ['A task with this external_id already exists.'],
+                }}
+                for index, _ in taken
+            )
+            valid = [(index, data) for index, data in valid if data.get('external_id') not in existing]
+
+        tasks = [Task(user=user, **data) for _, data in valid]
+        replaced = []
+        if upsert:
+            replaced = [task for task in tasks if task.external_id in existing_ids]
+            for task in replaced:
+                task.pk = existing_ids[task.external_id]
+                task.updated_at = now
+            Task.objects.bulk_update(
+                replaced,
+                UPSERT_FIELDS,
+                batch_size=getattr(settings, 'TASK_BULK_UPDATE_BATCH_SIZE', 100),
+            )
+            Task.objects.bulk_create([task for task in tasks if task.pk is None], batch_size=batch_size())
+            updated = len(replaced)
+        else:
+            Task.objects.bulk_create(tasks, batch_size=batch_size())
+        created = len(tasks) - updated
+
+        if tasks:
+            if counters.counters_enabled():
+                # Only replaced rows leave their old status; keys rejected
+                # in create mode were not touched.
+                counters.apply(
+                    user.pk,
+                    counters.tally_values((existing[task.external_id] for task in replaced), now),
+                    counters.tally_values(((task.status, task.due_date) for task in tasks), now),
+                )
+            backend = get_search_backend()
+            for task in tasks:
+                backend.index_task(task)
+            response_cache.invalidate(user.pk)
+
+    for (index, _), task in zip(valid, tasks):
+        results.append({'index': index, 'id': task.pk, 'external_id': task.external_id})
+    errors.sort(key=lambda error: error['index'])
+    return {
+        'created': created,
+        'updated': updated,
+        'results': results,
+        'errors': errors,
+    }
+
+
+def update_tasks(user, task_ids, values):
+    """
+    Set the same ``values`` on the tasks of ``user`` listed in ``task_ids``.
+
+    IDs are processed ``TASK_BULK_BATCH_SIZE`` at a time, each chunk in
+    its own transaction, so statements stay small and locks are released
+    between chunks. ``updated_at`` is set explicitly since ``update()``
+    skips ``auto_now``.
+    """
+    started = time.perf_counter()
+    updated = chunks = 0
+    backend = get_search_backend()
+    for batch in _batches(task_ids):
+        now = timezone.now()
+        with transaction.atomic():
+            queryset = Task.objects.filter(user=user, id__in=batch)
+            if counters.counters_enabled():
+                # Locked first, so a concurrent update of the same rows waits
+                # and tallies them only after this one has moved them.
+                ids = list(queryset.select_for_update().values_list('id', flat=True))
+                queryset = Task.objects.filter(pk__in=ids)
+                before = counters.tally(queryset, now)
+            count = queryset.update(**values, updated_at=now)
+            if counters.counters_enabled():
+                counters.apply(user.pk, before, counters.tally(queryset, now))
+            if SEARCH_FIELDS.intersection(values):
+                for task in queryset.only('id', 'user_id', 'title', 'description'):
+                    backend.index_task(task)
+            response_cache.invalidate(user.pk)
+        updated += count
+        chunks += 1
+    return {'updated_count': updated, **_throughput('bulk update', updated, chunks, started)}
+
+
+def validate_patches(items, context=None):
+    """
+    Validate per-task patches of the form ``{"id": ..., <fields>}``.
+
+    Returns ``(valid, errors)`` where ``valid`` maps task ids to
+    ``(index, validated_data)``.
+    """
+    item_serializer = TaskUpdateSerializer(partial=True, context=context)
+    valid, errors = {}, []
+    for index, item in enumerate(items):
+        if not isinstance(item, dict):
+            errors.append({'index': index, 'errors': {
+                'non_field_errors': ['Expected an object with an id.'],
+            }})
+            continue
+
+        task_ids = clean_ids([item.get('id')])
+        fields = {key: value for key, value in item.items() if key != 'id'}
+        if not task_ids:
+            errors.append({'index': index, 'errors': {'id': ['A valid integer is required.']}})
+        elif task_ids[0] in valid:
+            errors.append({'index': index, 'errors': {'id': ['Duplicate id in this request.']}})
+        elif not set(fields) & set(PATCH_FIELDS):
+            errors.append({'index': index, 'errors': {
+                'non_field_errors': [f'Provide at least one of: {", ".join(PATCH_FIELDS)}.'],
+            }})
+        else:
+            try:
+                valid[task_ids[0]] = (index, item_serializer.run_validation(fields))
+            except serializers.ValidationError as exc:
+                errors.append({'index': index, 'errors': exc.detail})
+    return valid, errors
+
+
+def _split_fields(patches):
+    """Split patched fields into ``{name: value}`` common to all patches and the rest."""
+    names = set().union(*patches) if patches else set()
+    shared = {}
+    for name in sorted(names):
+        first = patches[0].get(name)
+        if all(name in data and data[name] == first for data in patches):
+            shared[name] = first
+    return shared, sorted(names - set(shared))
+
+
+def patch_tasks(user, items, context=None):
+    """
+    Apply per-task patches with chunked ``bulk_update`` calls.
+
+    Each chunk of ``TASK_BULK_BATCH_SIZE`` tasks is locked, patched and
+    written in its own transaction. Invalid items and ids that do not
+    belong to ``user`` are reported by index without stopping the rest.
+    """
+    started = time.perf_counter()
+    valid, errors = validate_patches(items, context)
+    updated = chunks = 0
+    backend = get_search_backend()
+
+    for batch in _batches(list(valid)):
+        now = timezone.now()
+        with transaction.atomic():
+            tasks = list(
+                Task.objects.filter(user=user, id__in=batch)
+                .select_for_update()
+                .only('id', 'user_id', *PATCH_FIELDS)
+            )
+            found = {task.pk for task in tasks}
+            errors.extend(
+                {'index': valid[task_id][0], 'errors': {'id': ['Not found.']}}
+                for task_id in batch if task_id not in found
+            )
+
+            before = counters.tally_values(((task.status, task.due_date) for task in tasks), now)
+            patches = [valid[task.pk][1] for task in tasks]
+            for task, data in zip(tasks, patches):
+                for name, value in data.items():
+                    setattr(task, name, value)
+                task.updated_at = now
+
+            # Fields set to one value on every task need no CASE expression.
+            shared, varying = _split_fields(patches)
+            if shared and tasks:
+                Task.objects.filter(pk__in=[task.pk for task in tasks]).update(
+                    **shared, updated_at=now
+                )
+            if varying:
+                Task.objects.bulk_update(
+                    tasks,
+                    varying if shared else [*varying, 'updated_at'],
+                    batch_size=getattr(settings, 'TASK_BULK_UPDATE_BATCH_SIZE', 100),
+                )
+
+            if counters.counters_enabled():
+                after = counters.tally_values(((task.status, task.due_date) for task in tasks), now)
+                counters.apply(user.pk, before, after)
+            for task in tasks:
+                if SEARCH_FIELDS.intersection(valid[task.pk][1]):
+                    backend.index_task(task)
+            if tasks:
+                response_cache.invalidate(user.pk)
+        updated += len(tasks)
+        chunks += 1
+
+    errors.sort(key=lambda error: error['index'])
+    return {
+        'updated_count': updated,
+        'errors': errors,
+        **_throughput('bulk patch', updated, chunks, started),
+    }
+
+
+def soft_delete_enabled():
+    """Return whether deletes leave a tombstone instead of removing rows."""
+    return getattr(settings, 'TASK_SOFT_DELETE', False)
+
+
+def can_raw_delete():
+    """
+    Return whether tasks can be removed with a plain ``DELETE``.
+
+    Mirrors ``Collector.can_fast_delete``, except that the task signal
+    handlers are ignored: the bulk paths do their bookkeeping themselves.
+    Any other delete receiver, or a relation pointing at tasks that is not
+    ``DO_NOTHING``, requires Django's collector.
+    """
+    own = {signals.task_deleted}
+    for signal in (model_signals.pre_delete, model_signals.post_delete):
+        if not signal.has_listeners(Task):
+            continue
+        # Private, but what ``Signal.send`` itself dispatches to; checked
+        # against the Django pinned in requirements.txt (4.2) by the tests.
+        if any(receiver not in own for receiver in signal._live_receivers(Task)):
+            return False
+    opts = Task._meta
+    return (
+        not opts.parents
+        and all(
+            related.field.remote_field.on_delete is models.DO_NOTHING
+            for related in opts.related_objects
+        )
+        and not any(hasattr(field, 'bulk_related_objects') for field in opts.private_fields)
+    )
+
+
+def _delete_rows(queryset):
+    """
+    Delete ``queryset`` without per-row task bookkeeping and return the row count.
+
+    A single ``DELETE`` when ``can_raw_delete`` allows it, so the rows are
+    never loaded. Otherwise Django's collector runs cascades and foreign
+    receivers while the task receivers are suspended.
+    """
+    if can_raw_delete():
+        # ``QuerySet._raw_delete`` is private too; see can_raw_delete().
+        return queryset._raw_delete(queryset.db)
+    with signals.suspended():
+        deleted, by_model = queryset.delete()
+    return by_model.get(Task._meta.label, 0)
+
+
+def delete_tasks(user, task_ids, soft=None):
+    """
+    Delete the tasks of ``user`` listed in ``task_ids`` in bounded chunks.
+
+    Each chunk of ``TASK_BULK_BATCH_SIZE`` ids is locked and removed in its
+    own transaction. With ``soft`` (default: ``TASK_SOFT_DELETE``) rows are
+    only stamped with ``deleted_at``; ``purge_deleted`` removes them later.
+    Counters, the search index and the response cache are updated per chunk.
+    """
+    soft = soft_delete_enabled() if soft is None else soft
+    started = time.perf_counter()
+    deleted = chunks = 0
+    backend = get_search_backend()
+
+    for batch in _batches(task_ids):
+        now = timezone.now()
+        with transaction.atomic():
+            ids = list(
+                Task.objects.filter(user=user, id__in=batch)
+                .select_for_update()
+                .values_list('id', flat=True)
+            )
+            if ids:
+                queryset = Task.all_objects.filter(pk__in=ids)
+                if counters.counters_enabled():
+                    counters.apply(user.pk, counters.tally(queryset, now), [])
+                if soft:
+                    queryset.update(deleted_at=now)
+                else:
+                    _delete_rows(queryset)
+                for task_id in ids:
+                    backend.remove_task(Task(pk=task_id, user_id=user.pk))
+                response_cache.invalidate(user.pk)
+        deleted += len(ids)
+        chunks += 1
+
+    action = 'bulk soft delete' if soft else 'bulk delete'
+    return {
+        'deleted_count': deleted,
+        'soft': soft,
+        **_throughput(action, deleted, chunks, started),
+    }
+
+
+def purge_deleted(older_than=None, limit=None, pause=0):
+    """
+    Remove soft-deleted tasks in ``TASK_BULK_BATCH_SIZE`` chunks.
+
+    Only tombstones older than ``older_than`` (a timedelta) are purged.
+    Each chunk is its own short transaction, optionally followed by a
+    ``pause`` in seconds, so the purge can run next to live traffic.
+    Returns the number of rows removed.
+    """
+    cutoff = timezone.now() - older_than if older_than else None
+    tombstones = Task.all_objects.filter(deleted_at__isnull=False)
+    if cutoff is not None:
+        tombstones = tombstones.filter(deleted_at__lte=cutoff)
+
+    purged = 0
+    while limit is None or purged < limit:
+        size = batch_size() if limit is None else min(batch_size(), limit - purged)
+        with transaction.atomic():
+            ids = list(tombstones.order_by('deleted_at').values_list('id', flat=True)[:size])
+            if not ids:
+                break
+            purged += _delete_rows(Task.all_objects.filter(pk__in=ids))
+        if pause:
+            time.sleep(pause)
+    return purged
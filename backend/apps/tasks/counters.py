@@ -0,0 +1,192 @@
+"""Task statistics: single-query aggregation and the per-user counter cache."""
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, IntegrityError, transaction
+from django.db.models import Case, Count, F, Min, Q, Value, When
+from django.utils import timezone
+
+from .models import Task, TaskCounter, TaskQuerySet
+
+STATUSES = [choice for choice, _ in Task.STATUS_CHOICES]
+
+
+def counters_enabled():
+    """Return whether the per-user counter cache is switched on."""
+    return getattr(settings, 'TASK_COUNTER_CACHE', False)
+
+
+def _stats_aggregates(now):
+    outstanding = TaskQuerySet.outstanding_q()
+    return {
+        'total': Count('id'),
+        **{
+            status_value: Count('id', filter=Q(status=status_value))
+            for status_value in STATUSES
+        },
+        'overdue': Count('id', filter=outstanding & Q(due_date__lt=now)),
+        'next_due': Min('due_date', filter=outstanding & Q(due_date__gte=now)),
+    }
+
+
+def aggregate_stats(queryset, now=None):
+    """Compute all task statistics with one conditional-aggregation query."""
+    return queryset.order_by().aggregate(**_stats_aggregates(now or timezone.now()))
+
+
+async def aaggregate_stats(queryset, now=None):
+    """Async counterpart of ``aggregate_stats``."""
+    return await queryset.order_by().aaggregate(**_stats_aggregates(now or timezone.now()))
+
+
+def get_stats(user):
+    """
+    Return cached statistics for ``user``, rebuilding stale parts.
+
+    Rebuilds run on the primary with the counter row locked, so writers
+    adjusting it through ``apply`` wait and add their change on top.
+    """
+    now = timezone.now()
+    counter = TaskCounter.objects.filter(user=user).first()
+
+    if counter is None:
+        with transaction.atomic(using=DEFAULT_DB_ALIAS):
+            counter, _ = TaskCounter.objects.using(DEFAULT_DB_ALIAS).select_for_update().get_or_create(user=user)
+            stats = aggregate_stats(Task.objects.using(DEFAULT_DB_ALIAS).filter(user=user), now)
+            for key in ['total', 'overdue', *STATUSES]:
+                setattr(counter, key, stats[key])
+            counter.overdue_expires_at = stats['next_due']
+            counter.save(using=DEFAULT_DB_ALIAS)
+    elif counter.overdue is None or (
+        counter.overdue_expires_at is not None and now >= counter.overdue_expires_at
+    ):
+        # A deadline has passed since the count was taken; only the overdue
+        # part needs the tasks table, and it is served by the due date index.
+        with transaction.atomic(using=DEFAULT_DB_ALIAS):
+            counter = TaskCounter.objects.using(DEFAULT_DB_ALIAS).select_for_update().filter(user=user).first()
+            if counter is None:
+                return get_stats(user)
+            outstanding = Task.objects.using(DEFAULT_DB_ALIAS).filter(TaskQuerySet.outstanding_q(), user=user)
+            result = outstanding.order_by().aggregate(
+                overdue=Count('id', filter=Q(due_date__lt=now)),
+                next_due=Min('due_date', filter=Q(due_date__gte=now)),
+            )
+            counter.overdue = result['overdue']
+            counter.overdue_expires_at = result['next_due']
+            counter.save(using=DEFAULT_DB_ALIAS, update_fields=['overdue', 'overdue_expires_at'])
+
+    return {
+        'total': counter.total,
+        'pending': counter.pending,
+        'done': counter.done,
+        'archived': counter.archived,
+        'overdue': counter.overdue,
+        'next_due': counter.overdue_expires_at,
+    }
+
+
+def tally(queryset, now=None):
+    """
+    Group rows by status for counter bookkeeping.
+
+    Each group carries the row count, how many rows are past due and the
+    earliest future due date, which is all ``apply`` needs.
+    """
+    now = now or timezone.now()
+    return list(
+        queryset.order_by().values('status').annotate(
+            count=Count('id'),
+            past_due=Count('id', filter=Q(due_date__lt=now)),
+            next_due=Min('due_date', filter=Q(due_date__gte=now)),
+        )
+    )
+
+
+def single(status_value, due_date, now=None):
+    """Describe one task in the same shape as ``tally`` groups."""
+    now = now or timezone.now()
+    return [{
+        'status': status_value,
+        'count': 1,
+        'past_due': int(due_date is not None and due_date < now),
+        'next_due': due_date if due_date is not None and due_date >= now else None,
+    }]
+
+
+def tally_values(rows, now=None):
+    """Group in-memory ``(status, due_date)`` pairs like ``tally`` does."""
+    now = now or timezone.now()
+    groups = {}
+    for status_value, due_date in rows:
+        group = groups.setdefault(status_value, {
+            'status': status_value, 'count': 0, 'past_due': 0, 'next_due': None,
+        })
+        group['count'] += 1
+        if due_date is not None and due_date < now:
+            group['past_due'] += 1
+        elif due_date is not None:
+            group['next_due'] = min(group['next_due'] or due_date, due_date)
+    return list(groups.values())
+
+
+def restatus(groups, new_status):
+    """Return ``groups`` as they look after every row moves to ``new_status``."""
+    return [{**group, 'status': new_status} for group in groups]
+
+
+def apply(user_id, before, after):
+    """
+    Shift the counters of ``user_id`` from the ``before`` groups to ``after``.
+
+    Does nothing if the user has no counter row yet; it will be built from
+    scratch on the next read.
+    """
+    deltas = {key: 0 for key in ['total', 'overdue', *STATUSES]}
+    next_due = None
+    for sign, groups in ((-1, before), (1, after)):
+        for group in groups:
+            deltas['total'] += sign * group['count']
+            deltas[group['status']] += sign * group['count']
+            if group['status'] != 'done':
+                deltas['overdue'] += sign * group['past_due']
+                if sign > 0 and group['next_due'] is not None:
+                    next_due = min(next_due or group['next_due'], group['next_due'])
+
+    updates = {key: F(key) + delta for key, delta in deltas.items() if delta}
+    if next_due is not None:
+        updates['overdue_expires_at'] = Case(
+            When(overdue_expires_at__isnull=True, then=Value(next_due)),
+            When(overdue_expires_at__gt=next_due, then=Value(next_due)),
+            default=F('overdue_expires_at'),
+        )
+    if not updates:
+        return
+    counter = TaskCounter.objects.filter(user_id=user_id)
+    if not counter.update(**updates) and _fence(user_id):
+        counter.update(**updates)
+
+
+def invalidate(user_id):
+    """Drop the counters of ``user_id`` so the next read rebuilds them."""
+    counter = TaskCounter.objects.filter(user_id=user_id)
+    if not counter.delete()[0] and _fence(user_id):
+        counter.delete()
+
+
+def _fence(user_id):
+    """
+    Keep a rebuild from missing the current transaction's writes.
+
+    Called when ``user_id`` has no counter row to adjust. A rebuild
+    inserts the row before it aggregates, so inserting it here either
+    waits for a rebuild in progress, whose row then exists and is
+    returned as ``True``, or holds the next rebuild off until this
+    transaction ends, so its aggregate includes our writes. The row
+    inserted here is deleted again at once.
+    """
+    try:
+        with transaction.atomic():
+            TaskCounter.objects.create(user_id=user_id)
+    except IntegrityError:
+        return True
+    TaskCounter.objects.filter(user_id=user_id).delete()
+    return False
@@ -0,0 +1,93 @@
+"""Streaming task export for task management."""
+
+import csv
+import itertools
+
+from django.conf import settings
+from django.utils import timezone
+from rest_framework import serializers
+
+from todo_project.renderers import FastJSONRenderer, streaming_http_response
+
+COLUMNS = ['id', 'title', 'description', 'status', 'due_date', 'created_at', 'updated_at']
+FIELDS = ['id', 'title', 'description', 'status', 'due_date', 'is_overdue', 'created_at', 'updated_at']
+
+CONTENT_TYPES = {
+    'ndjson': 'application/x-ndjson',
+    'csv': 'text/csv; charset=utf-8',
+}
+
+
+class _Echo:
+    """File-like object whose ``write`` hands the line back to the caller."""
+
+    def write(self, value):
+        return value
+
+
+def _records(queryset):
+    """
+    Yield chunks of export records for ``queryset``.
+
+    Rows are read through a server-side cursor ``TASK_EXPORT_CHUNK_SIZE``
+    at a time, so memory use does not depend on the number of tasks.
+    """
+    chunk_size = getattr(settings, 'TASK_EXPORT_CHUNK_SIZE', 2000)
+    datetime_field = serializers.DateTimeField()
+    to_representation = datetime_field.to_representation
+    now = timezone.now()
+
+    rows = queryset.values_list(*COLUMNS).iterator(chunk_size=chunk_size)
+    while True:
+        chunk = list(itertools.islice(rows, chunk_size))
+        if not chunk:
+            return
+        yield [
+            {
+                'id': task_id,
+                'title': title,
+                'description': description,
+                'status': status,
+                'due_date': to_representation(due_date),
+                'is_overdue': bool(due_date and status != 'done' and now > due_date),
+                'created_at': to_representation(created_at),
+                'updated_at': to_representation(updated_at),
+            }
+            for task_id, title, description, status, due_date, created_at, updated_at in chunk
+        ]
+
+
+def iter_ndjson(queryset):
+    """Yield ``queryset`` as newline-delimited JSON, one task per line."""
+    renderer = FastJSONRenderer()
+    for records in _records(queryset):
+        yield b''.join(renderer.render(record) + b'\n' for record in records)
+
+
+def iter_csv(queryset):
+    """Yield ``queryset`` as CSV with a header row."""
+    writer = csv.writer(_Echo())
+    yield writer.writerow(FIELDS)
+    for records in _records(queryset):
+        yield ''.join(
+            writer.writerow([
+                _csv_value(record[name]) for name in FIELDS
+            ])
+            for record in records
+        )
+
+
+def _csv_value(value):
+    if value is None:
+        return ''
+    if isinstance(value, bool):
+        return 'true' if value else 'false'
+    return value
+
+
+def export_response(queryset, export_format, request):
+    """Return a streaming response exporting ``queryset`` as ``export_format``."""
+    content = iter_csv(queryset) if export_format == 'csv' else iter_ndjson(queryset)
+    response = streaming_http_response(content, request, content_type=CONTENT_TYPES[export_format])
+    response['Content-Disposition'] = f'attachment; filename="tasks.{export_format}"'
+    return response
@@ -1,8 +1,48 @@
 """Filters for task management."""
 
+import zoneinfo
+from datetime import datetime, time, timedelta
+
 import django_filters
 from django.db import models
-from .models import Task
+from django.utils import timezone
+from rest_framework.filters import OrderingFilter
+from .models import Task, TaskQuerySet
+from .search import get_search_backend
+
+
+class DayRangeFilter(django_filters.DateFilter):
+    """
+    Date filter for datetime columns that avoids ``__date`` casts.
+
+    The day is turned into a half-open ``[start, next day)`` timestamp
+    range in the filter set's timezone, so the column is compared as-is
+    and its indexes stay usable. Supports the ``date``, ``date__gte``,
+    ``date__gt``, ``date__lte`` and ``date__lt`` lookups.
+    """
+
+    def filter(self, qs, value):
+        if value in django_filters.constants.EMPTY_VALUES:
+            return qs
+
+        tzinfo = getattr(self.parent, 'tzinfo', None) or timezone.get_current_timezone()
+        start = timezone.make_aware(datetime.combine(value, time.min), tzinfo)
+        end = timezone.make_aware(datetime.combine(value + timedelta(days=1), time.min), tzinfo)
+
+        bounds = {
+            'date': {'gte': start, 'lt': end},
+            'date__gte': {'gte': start},
+            'date__gt': {'gte': end},
+            'date__lte': {'lt': end},
+            'date__lt': {'lt': start},
+        }[self.lookup_expr]
+
+        if self.distinct:
+            qs = qs.distinct()
+        return self.get_method(qs)(**{
+            f'{self.field_name}__{lookup}': bound
+            for lookup, bound in bounds.items()
+        })
 
 
 class TaskFilter(django_filters.FilterSet):
@@ -13,37 +53,37 @@ class TaskFilter(django_filters.FilterSet):
         help_text="Filter by task status"
     )
     
-    created_date = django_filters.DateFilter(
+    created_date = DayRangeFilter(
         field_name='created_at',
         lookup_expr='date',
         help_text="Filter by creation date (YYYY-MM-DD)"
     )
     
-    created_date_gte = django_filters.DateFilter(
+    created_date_gte = DayRangeFilter(
         field_name='created_at',
         lookup_expr='date__gte',
         help_text="Filter tasks created on or after this date"
     )
     
-    created_date_lte = django_filters.DateFilter(
+    created_date_lte = DayRangeFilter(
         field_name='created_at',
         lookup_expr='date__lte',
         help_text="Filter tasks created on or before this date"
     )
     
-    due_date = django_filters.DateFilter(
+    due_date = DayRangeFilter(
         field_name='due_date',
         lookup_expr='date',
         help_text="Filter by due date (YYYY-MM-DD)"
     )
     
-    due_date_gte = django_filters.DateFilter(
+    due_date_gte = DayRangeFilter(
         field_name='due_date',
         lookup_expr='date__gte',
         help_text="Filter tasks due on or after this date"
     )
     
-    due_date_lte = django_filters.DateFilter(
+    due_date_lte = DayRangeFilter(
         field_name='due_date',
         lookup_expr='date__lte',
         help_text="Filter tasks due on or before this date"
@@ -54,10 +94,21 @@ class TaskFilter(django_filters.FilterSet):
         help_text="Filter overdue tasks (true/false)"
     )
     
+    archived = django_filters.BooleanFilter(
+        method='filter_archived',
+        help_text="Only archived tasks (true) or only the others (false)"
+    )
+    
     search = django_filters.CharFilter(
         method='filter_search',
         help_text="Search in title and description"
     )
+    
+    tz = django_filters.ChoiceFilter(
+        choices=[(name, name) for name in sorted(zoneinfo.available_timezones())],
+        method='filter_tz',
+        help_text="Timezone for day-based date filters (defaults to the server timezone)"
+    )
 
     class Meta:
         model = Task
@@ -67,36 +118,51 @@ class TaskFilter(django_filters.FilterSet):
             'due_date': ['date', 'date__gte', 'date__lte'],
         }
 
+    @classmethod
+    def filter_for_lookup(cls, field, lookup_type):
+        """Use range-based day filters for the generated ``__date`` lookups too."""
+        if isinstance(field, models.DateTimeField) and lookup_type.startswith('date'):
+            return DayRangeFilter, {}
+        return super().filter_for_lookup(field, lookup_type)
+
+    @property
+    def tzinfo(self):
+        """Timezone in which day-based filters are interpreted."""
+        name = getattr(self.form, 'cleaned_data', {}).get('tz')
+        if name:
+            return zoneinfo.ZoneInfo(name)
+        return timezone.get_current_timezone()
+
+    def filter_tz(self, queryset, name, value):
+        """Timezone is consumed by the date filters via ``tzinfo``."""
+        return queryset
+
     def filter_overdue(self, queryset, name, value):
         """Filter overdue tasks."""
         if value is None:
             return queryset
             
-        from django.utils import timezone
         now = timezone.now()
         
         if value:
             # Return overdue tasks (due_date < now and status != 'done')
-            return queryset.filter(
-                due_date__lt=now,
-                status__in=['pending', 'archived']
-            )
+            return queryset.overdue(now)
         else:
             # Return non-overdue tasks
-            return queryset.exclude(
-                due_date__lt=now,
-                status__in=['pending', 'archived']
-            )
+            return queryset.exclude(TaskQuerySet.overdue_q(now))
+
+    def filter_archived(self, queryset, name, value):
+        """Keep to one status partition, so PostgreSQL skips the other."""
+        if value is None:
+            return queryset
+        return queryset.archived() if value else queryset.active()
 
     def filter_search(self, queryset, name, value):
-        """Search in title and description."""
+        """Search in title and description using the configured backend."""
         if not value:
             return queryset
             
-        return queryset.filter(
-            models.Q(title__icontains=value) |
-            models.Q(description__icontains=value)
-        )
+        return get_search_backend().search(queryset, value, self.request.user)
 
     def filter_queryset(self, queryset):
         """Override to ensure user filtering."""
@@ -104,4 +170,14 @@ class TaskFilter(django_filters.FilterSet):
         if hasattr(self.request, 'user') and self.request.user.is_authenticated:
             queryset = queryset.filter(user=self.request.user)
         
-        return super().filter_queryset(queryset) 
\ No newline at end of file
+        return super().filter_queryset(queryset)
+
+
+class TaskOrderingFilter(OrderingFilter):
+    """Ordering filter that keeps search results ranked by relevance."""
+
+    def filter_queryset(self, request, queryset, view):
+        explicit = request.query_params.get(self.ordering_param)
+        if not explicit and 'search_rank' in queryset.query.annotations:
+            return queryset.order_by('-search_rank', *self.get_default_ordering(view))
+        return super().filter_queryset(request, queryset, view)
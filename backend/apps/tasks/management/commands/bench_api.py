@@ -0,0 +1,300 @@
+"""Benchmark the task API at controlled concurrency and save the results as JSON."""
+
+import json
+import random
+import subprocess
+import threading
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from pathlib import Path
+
+import django
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client, override_settings
+from django.utils import timezone
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from apps.tasks.models import Task
+from apps.users.models import User
+
+USERNAME_PREFIX = 'bench_api_'
+WORDS = [
+    'report', 'invoice', 'meeting', 'release', 'review', 'backup', 'deploy', 'budget',
+    'design', 'migration', 'support', 'hiring', 'audit', 'roadmap', 'training', 'billing',
+]
+STATUSES = [value for value, _ in Task.STATUS_CHOICES]
+BULK_SIZE = 20
+DELETE_SIZE = 5
+
+
+def _list(run, user):
+    return 'GET', '/api/tasks/', None
+
+
+def _filter(run, user):
+    status = run.rng.choice(STATUSES)
+    return 'GET', f'/api/tasks/?status={status}&ordering=due_date', None
+
+
+def _search(run, user):
+    return 'GET', f'/api/tasks/?search={run.rng.choice(WORDS)}', None
+
+
+def _stats(run, user):
+    return 'GET', '/api/tasks/stats/', None
+
+
+def _create(run, user):
+    return 'POST', '/api/tasks/', {'title': f'{run.rng.choice(WORDS)} benchmark', 'status': 'pending'}
+
+
+def _bulk_update_status(run, user):
+    task_ids = run.rng.sample(user['task_ids'], min(BULK_SIZE, len(user['task_ids'])))
+    return 'POST', '/api/tasks/bulk_update_status/', {'task_ids': task_ids, 'status': run.rng.choice(STATUSES)}
+
+
+def _bulk_delete(run, user):
+    task_ids = [user['victims'].pop() for _ in range(DELETE_SIZE)]
+    return 'DELETE', '/api/tasks/bulk_delete/', {'task_ids': task_ids}
+
+
+SCENARIOS = {
+    'list': _list,
+    'filter': _filter,
+    'search': _search,
+    'stats': _stats,
+    'create': _create,
+    'bulk_update_status': _bulk_update_status,
+    'bulk_delete': _bulk_delete,
+}
+
+
+class Command(BaseCommand):
+    """
+    Reproducible load test of the main task endpoints.
+
+    Seeds ``--users`` throwaway users with ``--tasks`` tasks each from a
+    fixed ``--seed``, then fires ``--requests`` requests per scenario at
+    each ``--concurrency`` level, spread over the users. Requests go
+    through the test client on worker threads in this process, or over
+    HTTP with ``--url`` (the server must use the same database). Reports
+    requests/s and p50/p95/p99 latency per scenario and level, writes them
+    with the commit and setup to ``--output``, and with ``--compare``
+    prints the change against an earlier result file. The benchmark users
+    are deleted afterwards.
+    """
+
+    help = 'Benchmark list, filter, search, stats, create and bulk task endpoints.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=4)
+        parser.add_argument('--tasks', type=int, default=1000, help='Tasks per user.')
+        parser.add_argument('--concurrency', type=int, nargs='+', default=[1, 8, 32])
+        parser.add_argument('--requests', type=int, default=200, help='Requests per scenario and level.')
+        parser.add_argument('--scenarios', nargs='+', choices=list(SCENARIOS), default=list(SCENARIOS))
+        parser.add_argument('--seed', type=int, default=1)
+        parser.add_argument(
+            '--url', default=None,
+            help='Base URL of a running server, e.g. http://localhost:8000.',
+        )
+        parser.add_argument('--output', default='bench-results.json', help='JSON result file.')
+        parser.add_argument('--compare', default=None, help='Earlier JSON result file to diff against.')
+
+    def handle(self, *args, **options):
+        run = _Run(options)
+        User.objects.filter(username__startswith=USERNAME_PREFIX).delete()
+        try:
+            self.stdout.write(f'Seeding {options["users"]} users x {options["tasks"]} tasks...')
+            run.users = self._seed(run)
+            results = {}
+            self.stdout.write(
+                f'{"scenario":<20}{"concurrency":>12}{"req/s":>10}{"p50 ms":>9}'
+                f'{"p95 ms":>9}{"p99 ms":>9}{"errors":>8}'
+            )
+            # The test client always sends Host: testserver.
+            with override_settings(ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, 'testserver']):
+                for name in options['scenarios']:
+                    for concurrency in options['concurrency']:
+                        result = self._run_scenario(run, name, concurrency)
+                        results.setdefault(name, {})[str(concurrency)] = result
+                        self.stdout.write(
+                            f'{name:<20}{concurrency:>12}{result["rps"]:>10.1f}{result["p50_ms"]:>9.1f}'
+                            f'{result["p95_ms"]:>9.1f}{result["p99_ms"]:>9.1f}{result["errors"]:>8}'
+                        )
+        finally:
+            User.objects.filter(username__startswith=USERNAME_PREFIX).delete()
+
+        report = {'meta': self._meta(options), 'results': results}
+        Path(options['output']).write_text(json.dumps(report, indent=2) + '\n')
+        self.stdout.write(self.style.SUCCESS(f'Wrote {options["output"]}.'))
+        if options['compare']:
+            self._compare(json.loads(Path(options['compare']).read_text()), report)
+
+    def _seed(self, run):
+        now = timezone.now()
+        users = []
+        for index in range(run.options['users']):
+            user = User.objects.create_user(
+                username=f'{USERNAME_PREFIX}{index}', email=f'{USERNAME_PREFIX}{index}@example.com',
+            )
+            Task.objects.bulk_create(
+                (
+                    Task(
+                        user=user,
+                        title=f'{run.rng.choice(WORDS)} {run.rng.choice(WORDS)} {number}',
+                        description=' '.join(run.rng.choices(WORDS, k=8)),
+                        status=run.rng.choice(STATUSES),
+                        due_date=(
+                            now + timedelta(hours=run.rng.randint(-24 * 30, 24 * 30))
+                            if run.rng.random() < 0.7 else None
+                        ),
+                    )
+                    for number in range(run.options['tasks'])
+                ),
+                batch_size=1000,
+            )
+            users.append({
+                'user': user,
+                'token': f'Bearer {RefreshToken.for_user(user).access_token}',
+                'task_ids': list(Task.objects.filter(user=user).values_list('id', flat=True)),
+                'victims': [],
+            })
+        return users
+
+    def _prepare_victims(self, run, count):
+        """Create the tasks a ``bulk_delete`` run will delete, outside the timing."""
+        for user in run.users:
+            Task.objects.bulk_create(
+                Task(user=user['user'], title='bench_api victim') for _ in range(count)
+            )
+            user['victims'] = list(
+                Task.objects.filter(user=user['user'], title='bench_api victim').values_list('id', flat=True)
+            )
+
+    def _run_scenario(self, run, name, concurrency):
+        total = run.options['requests']
+        warmup = min(concurrency, total)
+        if name == 'bulk_delete':
+            per_user = -(-(total + warmup) // len(run.users)) + 1
+            self._prepare_victims(run, per_user * DELETE_SIZE)
+        requests = [
+            SCENARIOS[name](run, run.users[index % len(run.users)]) + (run.users[index % len(run.users)]['token'],)
+            for index in range(total + warmup)
+        ]
+        send = self._send_http if run.options['url'] else self._send_in_process
+
+        self._drive(send, requests[:warmup], concurrency, run)
+        started = time.perf_counter()
+        outcomes = self._drive(send, requests[warmup:], concurrency, run)
+        elapsed = time.perf_counter() - started
+
+        timings = sorted(duration for code, duration in outcomes if code < 400)
+        errors = len(outcomes) - len(timings)
+        if not timings:
+            raise CommandError(f'Every {name} request failed.')
+        return {
+            'requests': len(outcomes),
+            'errors': errors,
+            'rps': len(outcomes) / elapsed,
+            **{f'p{percent}_ms': _percentile(timings, percent) * 1000 for percent in (50, 95, 99)},
+        }
+
+    def _drive(self, send, requests, concurrency, run):
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            return list(executor.map(lambda request: send(run, *request), requests))
+
+    def _send_in_process(self, run, method, path, body, token):
+        client = getattr(run.local, 'client', None)
+        if client is None:
+            # Server errors (e.g. SQLite lock timeouts) count as failed requests.
+            client = run.local.client = Client(raise_request_exception=False)
+        kwargs = {'HTTP_AUTHORIZATION': token}
+        if body is not None:
+            kwargs.update(data=json.dumps(body), content_type='application/json')
+        started = time.perf_counter()
+        response = getattr(client, method.lower())(path, **kwargs)
+        if response.streaming:
+            b''.join(response.streaming_content)
+        return response.status_code, time.perf_counter() - started
+
+    def _send_http(self, run, method, path, body, token):
+        request = urllib.request.Request(
+            run.options['url'].rstrip('/') + path,
+            data=json.dumps(body).encode() if body is not None else None,
+            headers={'Authorization': token, 'Content-Type': 'application/json'},
+            method=method,
+        )
+        started = time.perf_counter()
+        try:
+            with urllib.request.urlopen(request) as response:
+                response.read()
+                code = response.status
+        except urllib.error.HTTPError as exc:
+            code = exc.code
+        return code, time.perf_counter() - started
+
+    def _meta(self, options):
+        return {
+            'commit': _git('rev-parse', 'HEAD'),
+            'dirty': bool(_git('status', '--porcelain', '--untracked-files=no')),
+            'timestamp': timezone.now().isoformat(),
+            'database': connection.vendor,
+            'target': options['url'] or 'in-process',
+            'django': django.get_version(),
+            **{key: options[key] for key in ('users', 'tasks', 'requests', 'concurrency', 'seed')},
+        }
+
+    def _compare(self, baseline, report):
+        self.stdout.write(
+            f'\nAgainst {baseline["meta"].get("commit") or "baseline"}:\n'
+            f'{"scenario":<20}{"concurrency":>12}{"req/s":>10}{"p95":>10}'
+        )
+        for name, levels in report['results'].items():
+            for concurrency, result in levels.items():
+                old = baseline['results'].get(name, {}).get(concurrency)
+                if old is None:
+                    continue
+                self.stdout.write(
+                    f'{name:<20}{concurrency:>12}{_change(old["rps"], result["rps"]):>10}'
+                    f'{_change(old["p95_ms"], result["p95_ms"]):>10}'
+                )
+
+
+class _Run:
+    """
+    Options, seeded random source and per-thread clients of one benchmark run.
+
+    Requests are built up front on the main thread, so the same seed
+    always yields the same request sequence.
+    """
+
+    def __init__(self, options):
+        self.options = options
+        self.rng = random.Random(options['seed'])
+        self.local = threading.local()
+        self.users = []
+
+
+def _git(*args):
+    try:
+        completed = subprocess.run(
+            ['git', *args], cwd=settings.BASE_DIR, capture_output=True, text=True, check=True,
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return completed.stdout.strip()
+
+
+def _change(old, new):
+    if not old:
+        return 'n/a'
+    return f'{(new - old) / old * 100:+.1f}%'
+
+
+def _percentile(values, percent):
+    return values[min(len(values) - 1, len(values) * percent // 100)]
@@ -0,0 +1,145 @@
+"""Benchmark the task read endpoints under WSGI and ASGI."""
+
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.test import AsyncClient, Client, override_settings
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from apps.tasks.models import Task
+from apps.users.models import User
+
+USERNAME = 'bench_asgi'
+PATHS = ['/api/tasks/', '/api/tasks/{task_id}/', '/api/tasks/stats/']
+
+
+class Command(BaseCommand):
+    """
+    Drive list, retrieve and stats at several concurrency levels.
+
+    Each mode runs in a fresh ``manage.py`` process, since ``ASYNC_VIEWS``
+    is read when the URLconf is built. WSGI requests go through the sync
+    handlers on ``concurrency`` threads, like a threaded sync worker; ASGI
+    requests go through the async handlers with ``concurrency`` requests
+    in flight on a single event loop. A throwaway user and its tasks are
+    created for the run and deleted afterwards.
+    """
+
+    help = 'Compare requests/s and latency of the task read endpoints under WSGI and ASGI.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--concurrency', type=int, nargs='+', default=[1, 8, 32, 128])
+        parser.add_argument('--requests', type=int, default=300)
+        parser.add_argument('--tasks', type=int, default=200)
+        parser.add_argument('--mode', choices=['wsgi', 'asgi'], help=argparse.SUPPRESS)
+        parser.add_argument('--token', help=argparse.SUPPRESS)
+        parser.add_argument('--task-id', type=int, help=argparse.SUPPRESS)
+
+    def handle(self, *args, **options):
+        if options['mode']:
+            return self._run_mode(options)
+
+        User.objects.filter(username=USERNAME).delete()
+        user = User.objects.create_user(username=USERNAME, email=f'{USERNAME}@example.com')
+        try:
+            Task.objects.bulk_create(
+                Task(user=user, title=f'Benchmark task {index}') for index in range(options['tasks'])
+            )
+            token = str(RefreshToken.for_user(user).access_token)
+            task_id = Task.objects.filter(user=user).values_list('id', flat=True).first()
+
+            self.stdout.write(
+                f'{"concurrency":>11}  {"mode":<5}{"req/s":>9}{"p50 ms":>9}{"p95 ms":>9}{"p99 ms":>9}'
+            )
+            for concurrency in options['concurrency']:
+                for mode in ['wsgi', 'asgi']:
+                    result = self._spawn(mode, concurrency, options['requests'], token, task_id)
+                    self.stdout.write(
+                        f'{concurrency:>11}  {mode:<5}{result["rps"]:>9.1f}{result["p50"]:>9.1f}'
+                        f'{result["p95"]:>9.1f}{result["p99"]:>9.1f}'
+                    )
+        finally:
+            User.objects.filter(username=USERNAME).delete()
+
+    def _spawn(self, mode, concurrency, requests, token, task_id):
+        env = {**os.environ, 'ASYNC_VIEWS': str(mode == 'asgi')}
+        command = [
+            sys.executable, sys.argv[0], 'bench_asgi', '--mode', mode,
+            '--concurrency', str(concurrency), '--requests', str(requests),
+            '--token', token, '--task-id', str(task_id),
+        ]
+        completed = subprocess.run(command, env=env, capture_output=True, text=True)
+        if completed.returncode:
+            raise CommandError(f'{mode} run failed:\n{completed.stderr}')
+        return json.loads(completed.stdout.strip().splitlines()[-1])
+
+    def _run_mode(self, options):
+        if settings.ASYNC_VIEWS != (options['mode'] == 'asgi'):
+            raise CommandError('ASYNC_VIEWS does not match --mode.')
+        paths = [path.format(task_id=options['task_id']) for path in PATHS]
+        requests = [paths[index % len(paths)] for index in range(options['requests'])]
+        concurrency = options['concurrency'][0]
+        authorization = f'Bearer {options["token"]}'
+
+        # The test clients always send Host: testserver.
+        with override_settings(ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, 'testserver']):
+            run = self._run_wsgi if options['mode'] == 'wsgi' else self._run_asgi
+            # Warm up every endpoint before timing.
+            run(paths, concurrency, authorization)
+            started = time.perf_counter()
+            timings = run(requests, concurrency, authorization)
+            elapsed = time.perf_counter() - started
+
+        timings.sort()
+        self.stdout.write(json.dumps({
+            'rps': len(timings) / elapsed,
+            **{f'p{percent}': _percentile(timings, percent) * 1000 for percent in (50, 95, 99)},
+        }))
+
+    def _run_wsgi(self, paths, concurrency, authorization):
+        local = threading.local()
+
+        def request(path):
+            if not hasattr(local, 'client'):
+                local.client = Client(HTTP_AUTHORIZATION=authorization)
+            started = time.perf_counter()
+            response = local.client.get(path)
+            _check(response, path)
+            return time.perf_counter() - started
+
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            return list(executor.map(request, paths))
+
+    def _run_asgi(self, paths, concurrency, authorization):
+        async def run():
+            client = AsyncClient()
+            slots = asyncio.Semaphore(concurrency)
+
+            async def request(path):
+                async with slots:
+                    started = time.perf_counter()
+                    response = await client.get(path, headers={'Authorization': authorization})
+                    _check(response, path)
+                    return time.perf_counter() - started
+
+            return await asyncio.gather(*(request(path) for path in paths))
+
+        return list(asyncio.run(run()))
+
+
+def _check(response, path):
+    if response.status_code != 200:
+        raise CommandError(f'GET {path} returned {response.status_code}')
+
+
+def _percentile(values, percent):
+    return values[min(len(values) - 1, len(values) * percent // 100)]
@@ -0,0 +1,94 @@
+"""Benchmark the API JSON renderer and parser against DRF's stock ones."""
+
+import io
+import time
+from datetime import timedelta
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+
+from todo_project.parsers import FastJSONParser
+from todo_project.renderers import FastJSONRenderer, orjson
+
+
+class Command(BaseCommand):
+    """
+    Time encoding of task list pages and decoding of bulk payloads.
+
+    Pages mimic the list endpoint and also carry a raw ``datetime`` and a
+    ``Decimal`` per task, so the encoder fallbacks are exercised. Every
+    fast result is checked against the stock renderer and parser, and a
+    mismatch fails the command.
+    """
+
+    help = 'Compare FastJSONRenderer/FastJSONParser throughput with the DRF defaults.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', type=int, nargs='+', default=[20, 200, 2000, 20000])
+        parser.add_argument('--repeat', type=int, default=20)
+
+    def handle(self, *args, **options):
+        if orjson is None:
+            self.stdout.write(self.style.WARNING('orjson is not installed; timing the fallback.'))
+
+        stock_renderer, fast_renderer = JSONRenderer(), FastJSONRenderer()
+        stock_parser, fast_parser = JSONParser(), FastJSONParser()
+
+        self.stdout.write(
+            f'{"items":>7} {"size":>9} {"render":>9} {"fast":>9} {"stream":>9}'
+            f' {"parse":>9} {"fast":>9}   (MB/s)'
+        )
+        for size in options['sizes']:
+            page = self._page(size)
+            body = stock_renderer.render(page)
+            if fast_renderer.render(page) != body:
+                raise CommandError(f'FastJSONRenderer output differs for {size} items.')
+            if b''.join(fast_renderer.iter_render(page)) != body:
+                raise CommandError(f'Streamed output differs for {size} items.')
+            payload = stock_renderer.render({'tasks': page['results']})
+            if fast_parser.parse(io.BytesIO(payload)) != stock_parser.parse(io.BytesIO(payload)):
+                raise CommandError(f'FastJSONParser result differs for {size} items.')
+
+            repeat = options['repeat']
+            timings = [
+                self._time(stock_renderer.render, repeat, page),
+                self._time(fast_renderer.render, repeat, page),
+                self._time(lambda data: b''.join(fast_renderer.iter_render(data)), repeat, page),
+                self._time(lambda data: stock_parser.parse(io.BytesIO(data)), repeat, payload),
+                self._time(lambda data: fast_parser.parse(io.BytesIO(data)), repeat, payload),
+            ]
+            megabytes = len(body) / 1_000_000
+            self.stdout.write(
+                f'{size:>7} {len(body) // 1024:>7}kB'
+                + ''.join(f' {megabytes / seconds:>9.1f}' for seconds in timings)
+            )
+
+    def _page(self, size):
+        now = timezone.now()
+        results = []
+        for index in range(size):
+            due_date = now + timedelta(hours=index - size // 2) if index % 3 else None
+            results.append({
+                'id': index + 1,
+                'title': f'Задача {index} — review the quarterly budget',
+                'status': ('pending', 'done', 'archived')[index % 3],
+                'due_date': due_date.isoformat() if due_date else None,
+                'is_overdue': bool(due_date and due_date < now),
+                'created_at': (now - timedelta(days=index)).isoformat(),
+                'updated_at': (now - timedelta(seconds=index)).isoformat(),
+                'synced_at': now - timedelta(microseconds=index),
+                'estimate': Decimal(index) / 4,
+            })
+        return {'count': size, 'next': None, 'previous': None, 'results': results}
+
+    def _time(self, func, repeat, data):
+        timings = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            func(data)
+            timings.append(time.perf_counter() - started)
+        timings.sort()
+        return timings[len(timings) // 2]
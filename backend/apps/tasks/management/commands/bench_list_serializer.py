@@ -0,0 +1,95 @@
+"""Benchmark the task list renderer against TaskListSerializer."""
+
+import random
+import time
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+
+from apps.tasks.models import Task
+from apps.tasks.serializers import TaskListRenderer, TaskListSerializer
+from apps.tasks.views import TaskViewSet
+
+
+class Command(BaseCommand):
+    """
+    Compare ``TaskListRenderer`` with ``TaskListSerializer`` page by page.
+
+    Both paths are timed from the query to the rendered JSON, and their
+    JSON output is required to be byte-for-byte identical; a mismatch
+    fails the command. Seeded data is rolled back afterwards.
+    """
+
+    help = 'Time the values_list() list renderer against TaskListSerializer.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--page-sizes', type=int, nargs='+', default=[20, 200, 2000])
+        parser.add_argument('--repeat', type=int, default=20)
+
+    def handle(self, *args, **options):
+        page_sizes = options['page_sizes']
+        renderer = TaskListRenderer()
+
+        with transaction.atomic():
+            user = self._seed(max(page_sizes))
+            queryset = Task.objects.filter(user=user).order_by(*TaskViewSet.ordering)
+
+            self.stdout.write(
+                f'{"page size":>10} {"serializer ms":>15} {"renderer ms":>13} {"speedup":>9}'
+            )
+            for size in page_sizes:
+                serializer_json = self._serializer_json(queryset, size)
+                renderer_json = self._renderer_json(renderer, queryset, size)
+                if serializer_json != renderer_json:
+                    raise CommandError(f'Renderer output differs at page size {size}.')
+
+                slow = self._time(self._serializer_json, options['repeat'], queryset, size)
+                fast = self._time(
+                    self._renderer_json, options['repeat'], renderer, queryset, size
+                )
+                self.stdout.write(f'{size:>10} {slow:>15.2f} {fast:>13.2f} {slow / fast:>8.1f}x')
+
+            transaction.set_rollback(True)
+
+    def _seed(self, count):
+        user = get_user_model().objects.create_user(
+            username='bench_list_serializer',
+            email='bench_list_serializer@example.com',
+        )
+        rng = random.Random(0)
+        now = timezone.now()
+        statuses = [choice for choice, _ in Task.STATUS_CHOICES]
+        Task.objects.bulk_create(
+            Task(
+                user=user,
+                title=f'Task {index}',
+                status=rng.choice(statuses),
+                due_date=(
+                    None if rng.random() < 0.3
+                    else now + timedelta(days=rng.randint(-30, 30), seconds=rng.randint(0, 86399))
+                ),
+            )
+            for index in range(count)
+        )
+        return user
+
+    def _serializer_json(self, queryset, size):
+        page = list(queryset.only(*TaskListRenderer.columns)[:size])
+        return JSONRenderer().render(TaskListSerializer(page, many=True).data)
+
+    def _renderer_json(self, renderer, queryset, size):
+        page = list(queryset.values_list(*TaskListRenderer.columns)[:size])
+        return JSONRenderer().render(renderer.render(page))
+
+    def _time(self, func, repeat, *args):
+        timings = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            func(*args)
+            timings.append(time.perf_counter() - started)
+        timings.sort()
+        return timings[len(timings) // 2] * 1000
@@ -0,0 +1,110 @@
+"""Benchmark page number versus keyset pagination on the task list."""
+
+import time
+from datetime import timedelta
+from urllib.parse import parse_qs, urlparse
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from apps.tasks.models import Task
+from apps.tasks.pagination import TaskPagination
+from apps.tasks.views import TaskViewSet
+
+
+class Command(BaseCommand):
+    """
+    Seed one user with many tasks and time list pages at increasing depth.
+
+    Everything runs inside a transaction that is rolled back, so the
+    database is left untouched.
+    """
+
+    help = 'Compare page number and cursor pagination latency by page depth.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--tasks', type=int, default=1_000_000)
+        parser.add_argument('--batch-size', type=int, default=10_000)
+        parser.add_argument('--repeat', type=int, default=5)
+        parser.add_argument('--ordering', default='-created_at')
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            user = self._seed(options['tasks'], options['batch_size'])
+            self._run(user, options['tasks'], options['repeat'], options['ordering'])
+            transaction.set_rollback(True)
+
+    def _seed(self, count, batch_size):
+        User = get_user_model()
+        user = User.objects.create_user(
+            username='bench_pagination',
+            email='bench_pagination@example.com',
+        )
+        start = timezone.now() - timedelta(seconds=count)
+        self.stdout.write(f'Seeding {count} tasks...')
+        for offset in range(0, count, batch_size):
+            Task.objects.bulk_create(
+                Task(
+                    user=user,
+                    title=f'Task {i}',
+                    due_date=start + timedelta(hours=i % 500) if i % 3 else None,
+                )
+                for i in range(offset, min(offset + batch_size, count))
+            )
+        # auto_now_add ignores explicit values, so spread created_at afterwards.
+        first_id = Task.objects.filter(user=user).order_by('id').values_list('id', flat=True)[0]
+        for offset in range(0, count, batch_size):
+            Task.objects.filter(
+                user=user,
+                id__gte=first_id + offset,
+                id__lt=first_id + offset + batch_size,
+            ).update(created_at=start + timedelta(seconds=offset))
+        return user
+
+    def _run(self, user, count, repeat, ordering):
+        page_size = TaskPagination.page_size
+        view = TaskViewSet.as_view({'get': 'list'})
+        factory = APIRequestFactory(SERVER_NAME='localhost')
+        paginator = TaskPagination()
+        paginator.base_url = 'http://localhost/api/tasks/'
+        paginator.field_name = ordering.lstrip('-')
+        paginator.nullable = Task._meta.get_field(paginator.field_name).null
+        order_by = paginator._order_expressions(
+            paginator.field_name, ordering.startswith('-'), nulls_last=True
+        )
+
+        depths = [0]
+        depth = page_size * 10
+        while depth < count:
+            depths.append(depth)
+            depth *= 10
+
+        self.stdout.write(f'{"depth":>10} {"page (ms)":>12} {"cursor (ms)":>12}')
+        for depth in depths:
+            page_params = {'ordering': ordering, 'page': depth // page_size + 1}
+            cursor_params = {'ordering': ordering, 'cursor': ''}
+            if depth:
+                # Build the cursor the previous page would have handed out.
+                anchor = Task.objects.filter(user=user).order_by(*order_by)[depth - 1]
+                url = paginator.encode_cursor(anchor, reverse=False)
+                cursor_params['cursor'] = parse_qs(urlparse(url).query)['cursor'][0]
+
+            page_ms = self._time(view, factory, user, page_params, repeat)
+            cursor_ms = self._time(view, factory, user, cursor_params, repeat)
+            self.stdout.write(f'{depth:>10} {page_ms:>12.2f} {cursor_ms:>12.2f}')
+
+    def _time(self, view, factory, user, params, repeat):
+        timings = []
+        for _ in range(repeat):
+            request = factory.get('/api/tasks/', params)
+            force_authenticate(request, user=user)
+            started = time.perf_counter()
+            response = view(request)
+            response.render()
+            timings.append(time.perf_counter() - started)
+            assert response.status_code == 200, response.content
+        timings.sort()
+        return timings[len(timings) // 2] * 1000
@@ -0,0 +1,98 @@
+"""Benchmark task search backends against the ILIKE scan."""
+
+import random
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+
+from apps.tasks.models import Task
+from apps.tasks.search import get_search_backend
+
+WORDS = (
+    'report budget review meeting client invoice deploy release backlog '
+    'design sprint planning email call refactor database migration audit '
+    'contract hiring onboarding roadmap feedback survey research launch'
+).split()
+
+
+class Command(BaseCommand):
+    """
+    Seed one user with synthetic tasks and time each search backend.
+
+    Runs inside a transaction that is rolled back. The ``postgres``
+    backend is only timed on PostgreSQL.
+    """
+
+    help = 'Compare search backend latency with the ILIKE scan.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--tasks', type=int, default=100_000)
+        parser.add_argument('--batch-size', type=int, default=5_000)
+        parser.add_argument('--repeat', type=int, default=5)
+        parser.add_argument(
+            '--queries', nargs='+',
+            default=['budget', 'rev', 'client invoice', 'migraton'],
+        )
+
+    def handle(self, *args, **options):
+        backends = ['ilike', 'inverted_index']
+        if connection.vendor == 'postgresql':
+            backends.append('postgres')
+
+        with transaction.atomic():
+            user = self._seed(options['tasks'], options['batch_size'])
+            queryset = Task.objects.filter(user=user)
+
+            if 'inverted_index' in backends:
+                started = time.perf_counter()
+                get_search_backend('inverted_index').search(queryset, 'warmup', user)
+                elapsed = (time.perf_counter() - started) * 1000
+                self.stdout.write(f'inverted_index build: {elapsed:.1f} ms')
+
+            header = f'{"query":<20}' + ''.join(f'{name:>18}' for name in backends)
+            self.stdout.write(header)
+            for query in options['queries']:
+                row = f'{query:<20}'
+                for name in backends:
+                    backend = get_search_backend(name)
+                    ms, hits = self._time(backend, queryset, query, user, options['repeat'])
+                    row += f'{ms:>10.2f} ({hits:>5})'
+                self.stdout.write(row)
+
+            transaction.set_rollback(True)
+
+    def _seed(self, count, batch_size):
+        User = get_user_model()
+        user = User.objects.create_user(
+            username='bench_search',
+            email='bench_search@example.com',
+        )
+        rng = random.Random(0)
+        self.stdout.write(f'Seeding {count} tasks...')
+        for offset in range(0, count, batch_size):
+            Task.objects.bulk_create(
+                Task(
+                    user=user,
+                    title=' '.join(rng.choices(WORDS, k=4)),
+                    description=' '.join(rng.choices(WORDS, k=20)),
+                )
+                for _ in range(offset, min(offset + batch_size, count))
+            )
+        return user
+
+    def _time(self, backend, queryset, query, user, repeat):
+        timings = []
+        hits = 0
+        for _ in range(repeat):
+            started = time.perf_counter()
+            results = backend.search(queryset, query, user)
+            if 'search_rank' in results.query.annotations:
+                results = results.order_by('-search_rank')
+            # The list endpoint counts the matches and then loads one page.
+            hits = results.count()
+            list(results.values_list('id', flat=True)[:20])
+            timings.append(time.perf_counter() - started)
+        timings.sort()
+        return timings[len(timings) // 2] * 1000, hits
@@ -0,0 +1,208 @@
+"""Assert that no API endpoint's query count grows with the amount of data."""
+
+import json
+from contextlib import ExitStack, contextmanager
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections, transaction
+from django.test import Client, override_settings
+from django.urls import URLResolver, get_resolver, reverse
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from apps.tasks.models import Task
+from apps.users.authentication import user_states
+from apps.users.models import User
+
+PREFIXES = ('api/tasks/', 'api/auth/')
+# The router's API root is shadowed by the task list on the same path.
+IGNORED_ROUTES = {'tasks:api-root'}
+PASSWORDS = ['Harness-pass-1!', 'Harness-pass-2!', 'Harness-pass-3!']
+
+# (route name, method) -> function of the run returning (URL kwargs, JSON body).
+# Requests run in this order; every route under PREFIXES needs an entry.
+SCENARIOS = {
+    ('users:register', 'post'): lambda run: ({}, {
+        'username': f'{run.username}_new', 'email': f'{run.username}_new@example.com',
+        'password': PASSWORDS[0], 'password_confirm': PASSWORDS[0],
+        'first_name': 'New', 'last_name': 'User',
+    }),
+    ('users:login', 'post'): lambda run: ({}, {'username': run.username, 'password': PASSWORDS[0]}),
+    ('users:token_refresh', 'post'): lambda run: ({}, {'refresh': run.refresh_token()}),
+    ('users:profile', 'get'): lambda run: ({}, None),
+    ('users:profile', 'put'): lambda run: ({}, {
+        'email': f'{run.username}@example.com', 'first_name': 'Query', 'last_name': 'Counts',
+    }),
+    ('users:profile', 'patch'): lambda run: ({}, {'first_name': 'Patched'}),
+    ('users:change_password', 'put'): lambda run: ({}, {
+        'old_password': PASSWORDS[0], 'new_password': PASSWORDS[1], 'new_password_confirm': PASSWORDS[1],
+    }),
+    ('users:change_password', 'patch'): lambda run: ({}, {
+        'old_password': PASSWORDS[1], 'new_password': PASSWORDS[2], 'new_password_confirm': PASSWORDS[2],
+    }),
+    ('users:logout', 'post'): lambda run: ({}, {'refresh': run.refresh_token()}),
+    ('tasks:task-list', 'get'): lambda run: ({}, None),
+    ('tasks:task-list', 'post'): lambda run: ({}, {'title': 'Created task', 'description': 'Body'}),
+    ('tasks:task-detail', 'get'): lambda run: ({'pk': run.task_ids[0]}, None),
+    ('tasks:task-detail', 'put'): lambda run: (
+        {'pk': run.task_ids[0]}, {'title': 'Replaced', 'description': '', 'status': 'pending', 'due_date': None},
+    ),
+    ('tasks:task-detail', 'patch'): lambda run: ({'pk': run.task_ids[0]}, {'title': 'Patched'}),
+    ('tasks:task-update-status', 'patch'): lambda run: ({'pk': run.task_ids[1]}, {'status': 'done'}),
+    ('tasks:task-stats', 'get'): lambda run: ({}, None),
+    ('tasks:task-export', 'get'): lambda run: ({}, None),
+    ('tasks:task-bulk-create', 'post'): lambda run: ({}, {
+        'tasks': [{'title': f'Bulk {index}'} for index in range(3)],
+    }),
+    ('tasks:task-bulk-update-status', 'post'): lambda run: ({}, {
+        'task_ids': run.task_ids[:3], 'status': 'archived',
+    }),
+    ('tasks:task-bulk-patch', 'patch'): lambda run: ({}, {
+        'tasks': [{'id': task_id, 'title': f'Bulk patched {task_id}'} for task_id in run.task_ids[:3]],
+    }),
+    ('tasks:task-detail', 'delete'): lambda run: ({'pk': run.task_ids[-1]}, None),
+    ('tasks:task-bulk-delete', 'delete'): lambda run: ({}, {'task_ids': run.task_ids[-3:-1]}),
+}
+
+
+class Command(BaseCommand):
+    """
+    N+1 regression check for the task and auth APIs.
+
+    Every route under ``api/tasks/`` and ``api/auth/`` is discovered from
+    the URLconf and requested once per data size, for a user seeded with
+    that many tasks, in a transaction that is rolled back. Queries on all
+    database aliases are counted; the check fails when an endpoint's count
+    differs between sizes, when a request fails, or when a route has no
+    entry in ``SCENARIOS``. Exits non-zero on failure, for use in CI.
+    """
+
+    help = 'Fail if the query count of an API endpoint depends on the number of tasks.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', type=int, nargs='+', default=[10, 100, 500])
+
+    def handle(self, *args, **options):
+        sizes = options['sizes']
+        if min(sizes) < 6:
+            raise CommandError('Every size must be at least 6 tasks.')
+
+        missing = discover_routes() - set(SCENARIOS)
+        if missing:
+            raise CommandError(
+                'No query count scenario for: '
+                + ', '.join(f'{method.upper()} {name}' for name, method in sorted(missing))
+            )
+
+        # The test client always sends Host: testserver. Cached responses
+        # would hide the queries being checked.
+        with override_settings(
+            ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, 'testserver'], TASK_RESPONSE_CACHE=False,
+        ):
+            # The first pass warms per-process caches and is not reported.
+            self._run_pass(sizes[0])
+            counts = {size: self._run_pass(size) for size in sizes}
+
+        self.stdout.write(f'{"endpoint":<42}' + ''.join(f'{size:>8}' for size in sizes))
+        failures = []
+        for name, method in SCENARIOS:
+            row = [counts[size][name, method] for size in sizes]
+            ok = len(set(row)) == 1
+            self.stdout.write(
+                f'{"ok  " if ok else "FAIL"}{method.upper() + " " + name:<38}'
+                + ''.join(f'{count:>8}' for count in row)
+            )
+            if not ok:
+                failures.append(f'{method.upper()} {name}: {row}')
+
+        if failures:
+            raise CommandError('Query count grows with the data for:\n' + '\n'.join(failures))
+
+    def _run_pass(self, size):
+        counts = {}
+        with transaction.atomic():
+            run = _Run(size)
+            client = Client(HTTP_AUTHORIZATION=f'Bearer {run.access_token}')
+            for (name, method), scenario in SCENARIOS.items():
+                kwargs, body = scenario(run)
+                path = reverse(name, kwargs=kwargs)
+                request_kwargs = {}
+                if body is not None:
+                    request_kwargs = {'data': json.dumps(body), 'content_type': 'application/json'}
+                with count_queries() as queries:
+                    response = getattr(client, method)(path, **request_kwargs)
+                    if response.streaming:
+                        b''.join(response.streaming_content)
+                if response.status_code >= 400:
+                    raise CommandError(
+                        f'{method.upper()} {path} returned {response.status_code}: {response.content[:500]!r}'
+                    )
+                counts[name, method] = queries[0]
+            transaction.set_rollback(True)
+        user_states.clear()
+        return counts
+
+
+class _Run:
+    """A user with ``size`` tasks and tokens for one pass."""
+
+    def __init__(self, size):
+        self.username = f'query_counts_{size}'
+        self.user = User.objects.create_user(
+            username=self.username, email=f'{self.username}@example.com', password=PASSWORDS[0],
+        )
+        Task.objects.bulk_create(
+            Task(user=self.user, title=f'Task {index}', description=f'Description {index}')
+            for index in range(size)
+        )
+        self.task_ids = list(Task.objects.filter(user=self.user).order_by('id').values_list('id', flat=True))
+        self.access_token = str(RefreshToken.for_user(self.user).access_token)
+
+    def refresh_token(self):
+        return str(RefreshToken.for_user(self.user))
+
+
+def discover_routes():
+    """Return ``(route name, method)`` for every view under ``PREFIXES``."""
+    routes = set()
+    for route, name, callback in _walk(get_resolver().url_patterns):
+        if not route.startswith(PREFIXES) or name in IGNORED_ROUTES:
+            continue
+        actions = getattr(callback, 'actions', None)
+        if actions is not None:
+            methods = actions
+        else:
+            view_class = getattr(callback, 'cls', None) or getattr(callback, 'view_class', None)
+            methods = [
+                method for method in view_class.http_method_names
+                if method not in ('head', 'options') and hasattr(view_class, method)
+            ]
+        routes.update((name, method) for method in methods)
+    return routes
+
+
+def _walk(patterns, prefix='', namespace=''):
+    for pattern in patterns:
+        if isinstance(pattern, URLResolver):
+            inner = namespace
+            if pattern.namespace:
+                inner = f'{namespace}:{pattern.namespace}' if namespace else pattern.namespace
+            yield from _walk(pattern.url_patterns, prefix + str(pattern.pattern), inner)
+        elif pattern.name:
+            name = f'{namespace}:{pattern.name}' if namespace else pattern.name
+            yield prefix + str(pattern.pattern), name, pattern.callback
+
+
+@contextmanager
+def count_queries():
+    """Count the queries run on every database alias; yields a one-item list."""
+    count = [0]
+
+    def wrapper(execute, sql, params, many, context):
+        count[0] += 1
+        return execute(sql, params, many, context)
+
+    with ExitStack() as stack:
+        for alias in connections:
+            stack.enter_context(connections[alias].execute_wrapper(wrapper))
+        yield count
@@ -0,0 +1,131 @@
+"""Assert that task list filters are answered with index range scans."""
+
+import json
+import re
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test import RequestFactory
+
+from apps.tasks.filters import TaskFilter
+from apps.tasks.models import Task
+
+# (filter parameters, column that must appear in an index condition)
+CHECKS = [
+    ({'created_date': '2024-01-15'}, 'created_at'),
+    ({'created_date_gte': '2024-01-15'}, 'created_at'),
+    ({'created_date_lte': '2024-01-15'}, 'created_at'),
+    ({'created_date': '2024-01-15', 'tz': 'Asia/Almaty'}, 'created_at'),
+    ({'due_date': '2024-01-15'}, 'due_date'),
+    ({'due_date_gte': '2024-01-15'}, 'due_date'),
+    ({'due_date_lte': '2024-01-15'}, 'due_date'),
+    ({'overdue': 'true'}, 'due_date'),
+]
+# (filter parameters, partition the plan must not touch); PostgreSQL with
+# the tasks table partitioned by status only.
+PRUNING_CHECKS = [
+    ({'status': 'pending'}, 'tasks_archived'),
+    ({'archived': 'false'}, 'tasks_archived'),
+    ({'archived': 'false', 'overdue': 'true'}, 'tasks_archived'),
+    ({'archived': 'true'}, 'tasks_active'),
+]
+
+
+class Command(BaseCommand):
+    """
+    Query-plan regression check for ``TaskFilter``.
+
+    Each filter is applied to a user's tasks and the resulting SQL is run
+    through ``EXPLAIN``; the check fails unless the filtered column is part
+    of an index condition. Ordering is cleared so only the predicate is
+    judged. On PostgreSQL sequential scans are disabled for the check, so
+    it asserts that an index *can* serve the filter regardless of table
+    size. When the table is partitioned by status, filters that rule out
+    one partition must also leave it out of the plan. Exits non-zero on
+    failure, for use in CI.
+    """
+
+    help = 'Fail if a task filter cannot be served by an index scan.'
+
+    def handle(self, *args, **options):
+        if connection.vendor not in ('postgresql', 'sqlite'):
+            self.stdout.write(f'Query plan checks are not supported on {connection.vendor}.')
+            return
+
+        failures = []
+        with transaction.atomic():
+            user = get_user_model().objects.create_user(
+                username='check_query_plans',
+                email='check_query_plans@example.com',
+            )
+            if connection.vendor == 'postgresql':
+                with connection.cursor() as cursor:
+                    cursor.execute('SET LOCAL enable_seqscan = off')
+
+            checks = [(params, column, self._uses_index) for params, column in CHECKS]
+            if self._partitioned():
+                checks += [(params, partition, self._prunes) for params, partition in PRUNING_CHECKS]
+            for params, target, check in checks:
+                plan = self._explain(self._filtered(user, params))
+                ok = check(plan, target)
+                label = '&'.join(f'{key}={value}' for key, value in params.items())
+                if check == self._prunes:
+                    label = f'{label} skips {target}'
+                self.stdout.write(f'{"ok  " if ok else "FAIL"} {label}')
+                if not ok:
+                    failures.append(f'{label}:\n{plan}')
+
+            transaction.set_rollback(True)
+
+        if failures:
+            raise CommandError('Index scan not chosen for:\n' + '\n'.join(failures))
+
+    def _filtered(self, user, params):
+        request = RequestFactory().get('/api/tasks/', params)
+        request.user = user
+        filterset = TaskFilter(
+            request.GET,
+            queryset=Task.objects.filter(user=user),
+            request=request,
+        )
+        if not filterset.is_valid():
+            raise CommandError(f'Invalid filter {params}: {filterset.errors}')
+        return filterset.qs.order_by()
+
+    def _explain(self, queryset):
+        sql, params = queryset.query.sql_with_params()
+        with connection.cursor() as cursor:
+            if connection.vendor == 'postgresql':
+                cursor.execute(f'EXPLAIN (FORMAT JSON) {sql}', params)
+                return json.dumps(cursor.fetchone()[0], indent=2)
+            cursor.execute(f'EXPLAIN QUERY PLAN {sql}', params)
+            return '\n'.join(row[-1] for row in cursor.fetchall())
+
+    def _uses_index(self, plan, column):
+        if connection.vendor == 'postgresql':
+            return any(
+                column in node.get('Index Cond', '')
+                for node in self._nodes(json.loads(plan)[0]['Plan'])
+            )
+        return re.search(rf'INDEX \w+ \([^)]*\b{column}[<>=]', plan) is not None
+
+    def _partitioned(self):
+        if connection.vendor != 'postgresql':
+            return False
+        with connection.cursor() as cursor:
+            cursor.execute(
+                'SELECT relkind FROM pg_class WHERE oid = %s::regclass', [Task._meta.db_table]
+            )
+            return cursor.fetchone()[0] == 'p'
+
+    def _prunes(self, plan, partition):
+        return all(
+            node.get('Relation Name') != partition
+            for node in self._nodes(json.loads(plan)[0]['Plan'])
+        )
+
+    def _nodes(self, node):
+        yield node
+        for child in node.get('Plans', []):
+            yield from self._nodes(child)
@@ -0,0 +1,65 @@
+"""Report index usage statistics from pg_stat_user_indexes."""
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+INDEX_USAGE_SQL = """
+    SELECT
+        s.relname,
+        s.indexrelname,
+        s.idx_scan,
+        s.idx_tup_read,
+        s.idx_tup_fetch,
+        pg_relation_size(s.indexrelid)
+    FROM pg_stat_user_indexes s
+    WHERE s.relname = ANY(%s)
+    ORDER BY s.relname, s.idx_scan DESC, s.indexrelname
+"""
+
+
+class Command(BaseCommand):
+    """
+    Show how often each index on the task tables has been scanned.
+
+    Counters are cumulative since the last statistics reset, so compare two
+    runs taken before and after a workload to see which indexes pay off.
+    Indexes that were never scanned are flagged as candidates for removal.
+    """
+
+    help = 'Report index scans and sizes for the task tables (PostgreSQL only).'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--table', action='append', dest='tables',
+            help='Table to report on (repeatable, default: tasks and task_counters).',
+        )
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'postgresql':
+            self.stdout.write('Index usage statistics are only available on PostgreSQL.')
+            return
+
+        tables = options['tables'] or ['tasks', 'task_counters']
+        with connection.cursor() as cursor:
+            cursor.execute(INDEX_USAGE_SQL, [tables])
+            rows = cursor.fetchall()
+
+        self.stdout.write(
+            f'{"table":<16} {"index":<36} {"scans":>12} {"tup read":>12} '
+            f'{"tup fetch":>12} {"size":>10}'
+        )
+        for table, index, scans, read, fetched, size in rows:
+            line = (
+                f'{table:<16} {index:<36} {scans:>12} {read:>12} '
+                f'{fetched:>12} {self._size(size):>10}'
+            )
+            if not scans:
+                line = self.style.WARNING(f'{line}  unused')
+            self.stdout.write(line)
+
+    def _size(self, size):
+        for unit in ('B', 'kB', 'MB', 'GB'):
+            if size < 1024:
+                return f'{size:.0f} {unit}'
+            size /= 1024
+        return f'{size:.1f} TB'
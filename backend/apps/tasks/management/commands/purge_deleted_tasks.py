@@ -0,0 +1,44 @@
+"""Remove soft-deleted tasks in small batches."""
+
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+
+from apps.tasks.bulk import batch_size, can_raw_delete, purge_deleted
+
+
+class Command(BaseCommand):
+    """
+    Background purge of task tombstones left by soft deletes.
+
+    Meant to run from cron or a scheduler. Rows go in chunks of
+    ``TASK_BULK_BATCH_SIZE``, each in its own short transaction, with an
+    optional pause in between so the purge never holds locks for long.
+    """
+
+    help = 'Purge soft-deleted tasks in batches.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--older-than', type=int, default=0, metavar='SECONDS',
+            help='Only purge tasks deleted at least this long ago.',
+        )
+        parser.add_argument(
+            '--limit', type=int, default=None,
+            help='Stop after purging this many tasks.',
+        )
+        parser.add_argument(
+            '--pause', type=float, default=0,
+            help='Seconds to sleep between batches.',
+        )
+
+    def handle(self, *args, **options):
+        older_than = timedelta(seconds=options['older_than']) if options['older_than'] else None
+        mode = 'raw DELETE' if can_raw_delete() else 'collector delete'
+        self.stdout.write(f'Purging in batches of {batch_size()} ({mode})...')
+
+        started = time.perf_counter()
+        purged = purge_deleted(older_than, options['limit'], options['pause'])
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(f'Purged {purged} tasks in {elapsed:.1f}s.'))
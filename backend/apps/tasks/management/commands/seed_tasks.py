@@ -0,0 +1,277 @@
+"""Load large amounts of realistic synthetic tasks for performance work."""
+
+import io
+import itertools
+import multiprocessing
+import random
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import timedelta
+
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, connections, transaction
+from django.utils import timezone
+
+from apps.tasks.models import Task
+from apps.users.models import User
+
+COLUMNS = ['user_id', 'title', 'description', 'status', 'due_date', 'created_at', 'updated_at']
+# Rows per COPY / INSERT round trip.
+BATCH_SIZE = 20000
+# Upper bound of rows a worker is handed at once.
+CHUNK_ROWS = 25000
+
+STATUS_WEIGHTS = {'pending': 55, 'done': 35, 'archived': 10}
+VERBS = [
+    'Prepare', 'Review', 'Update', 'Fix', 'Write', 'Schedule', 'Call', 'Send', 'Plan',
+    'Check', 'Deploy', 'Migrate', 'Refactor', 'Test', 'Document', 'Pay', 'Order', 'Clean',
+]
+NOUNS = [
+    'report', 'invoice', 'meeting notes', 'release', 'backup', 'budget', 'roadmap', 'contract',
+    'presentation', 'newsletter', 'database', 'dashboard', 'onboarding', 'audit', 'proposal',
+    'website', 'payroll', 'inventory', 'feedback', 'tickets', 'dentist appointment', 'groceries',
+]
+QUALIFIERS = [
+    'for Q3', 'before Friday', 'for the team', 'with finance', 'draft', 'v2', 'again',
+    'for the client', 'this week', 'asap', 'follow-up', 'for review',
+]
+SENTENCES = [
+    'Coordinate with the owner before starting.',
+    'Numbers are in the shared folder.',
+    'Blocked until the previous step is done.',
+    'Keep it short, one page at most.',
+    'Remember to attach the latest version.',
+    'Low priority, but should not slip another week.',
+    'Ask for feedback once the first draft is ready.',
+    'See the thread from last Monday for context.',
+]
+
+
+class Command(BaseCommand):
+    """
+    Generate ``--users`` users and ``--tasks`` tasks spread over them.
+
+    Task counts per user follow a heavy-tailed distribution, statuses,
+    due dates and creation times are drawn from realistic mixes, and
+    titles and descriptions are assembled from phrase lists. Generation is
+    split into chunks of users handled by ``--workers`` processes, each
+    with its own connection. On PostgreSQL rows are streamed with
+    ``COPY ... FROM STDIN`` (the search vector trigger still fills
+    ``search_vector``) and the table is analyzed afterwards; elsewhere
+    they are written with batched ``executemany`` inserts. Model signals are
+    not sent, so task counters and search indexes of the new users start
+    empty and are built on first use. Output is deterministic for a given
+    ``--seed``.
+    """
+
+    help = 'Bulk-load synthetic users and tasks (COPY on PostgreSQL).'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=1000)
+        parser.add_argument('--tasks', type=int, default=1000000, help='Total tasks.')
+        parser.add_argument('--workers', type=int, default=None, help='Defaults to the CPU count.')
+        parser.add_argument('--days', type=int, default=365, help='Spread creation times over this many days.')
+        parser.add_argument('--seed', type=int, default=1)
+        parser.add_argument('--password', default='seed-Password-1', help='Password of every generated user.')
+        parser.add_argument('--prefix', default=None, help='Username prefix (defaults to a random one).')
+
+    def handle(self, *args, **options):
+        if options['users'] < 1 or options['tasks'] < 0:
+            raise CommandError('--users must be positive and --tasks not negative.')
+        workers = options['workers'] or multiprocessing.cpu_count()
+        rng = random.Random(options['seed'])
+        started = time.perf_counter()
+
+        user_ids = self._create_users(options)
+        counts = task_counts(rng, options['tasks'], len(user_ids))
+        chunks = list(_chunks(user_ids, counts))
+        self.stdout.write(
+            f'Created {len(user_ids)} users; loading {options["tasks"]} tasks '
+            f'in {len(chunks)} chunks on {workers} workers ({connection.vendor})...'
+        )
+
+        loaded_at = time.perf_counter()
+        now = timezone.now()
+        jobs = [
+            (index, chunk, options['seed'], options['days'], now)
+            for index, chunk in enumerate(chunks)
+        ]
+        loaded = 0
+        if workers == 1:
+            for job in jobs:
+                loaded += seed_chunk(*job)
+        else:
+            # Workers are forked with the app loaded but must not share
+            # this process's connection.
+            connections.close_all()
+            context = multiprocessing.get_context('fork')
+            with ProcessPoolExecutor(max_workers=workers, mp_context=context) as executor:
+                futures = [executor.submit(seed_chunk, *job) for job in jobs]
+                for future in as_completed(futures):
+                    loaded += future.result()
+                    self.stdout.write(f'  {loaded} tasks', ending='\r')
+                    self.stdout.flush()
+            self.stdout.write('')
+        load_time = time.perf_counter() - loaded_at
+
+        if connection.vendor == 'postgresql':
+            with connection.cursor() as cursor:
+                cursor.execute(f'ANALYZE {Task._meta.db_table}')
+
+        rate = loaded / load_time * 60 if load_time else 0
+        self.stdout.write(self.style.SUCCESS(
+            f'Loaded {loaded} tasks in {load_time:.1f}s ({rate:,.0f} rows/min), '
+            f'{time.perf_counter() - started:.1f}s in total.'
+        ))
+
+    def _create_users(self, options):
+        prefix = options['prefix'] or f'seed_{uuid.uuid4().hex[:6]}'
+        if User.objects.filter(username__startswith=f'{prefix}_').exists():
+            raise CommandError(f'Users with the prefix {prefix!r} already exist.')
+        # One hash for everyone; hashing per user would dominate the run.
+        password = make_password(options['password'])
+        users = [
+            User(
+                username=f'{prefix}_{index}',
+                email=f'{prefix}_{index}@example.com',
+                password=password,
+            )
+            for index in range(options['users'])
+        ]
+        with transaction.atomic():
+            User.objects.bulk_create(users, batch_size=1000)
+        return list(
+            User.objects.filter(username__startswith=f'{prefix}_').order_by('id').values_list('id', flat=True)
+        )
+
+
+def task_counts(rng, total, users):
+    """Split ``total`` tasks over ``users`` with a Pareto-like skew."""
+    weights = [rng.paretovariate(1.2) for _ in range(users)]
+    scale = total / sum(weights)
+    counts = [int(weight * scale) for weight in weights]
+    # Rounding down leaves fewer than one task per user over.
+    for index in range(total - sum(counts)):
+        counts[index] += 1
+    return counts
+
+
+def _chunks(user_ids, counts):
+    """Yield lists of ``(user_id, count)`` holding about ``CHUNK_ROWS`` tasks each."""
+    chunk, rows = [], 0
+    for user_id, count in zip(user_ids, counts):
+        while count:
+            take = min(count, CHUNK_ROWS - rows)
+            chunk.append((user_id, take))
+            rows += take
+            count -= take
+            if rows >= CHUNK_ROWS:
+                yield chunk
+                chunk, rows = [], 0
+    if chunk:
+        yield chunk
+
+
+def generate_rows(rng, chunk, days, now):
+    """Yield task rows, in ``COLUMNS`` order, for ``(user_id, count)`` pairs."""
+    statuses = list(STATUS_WEIGHTS)
+    status_weights = list(STATUS_WEIGHTS.values())
+    span = days * 86400
+    for user_id, count in chunk:
+        for status in rng.choices(statuses, status_weights, k=count):
+            # Skewed towards recent tasks.
+            created_at = now - timedelta(seconds=span * rng.random() ** 2)
+            title = f'{rng.choice(VERBS)} {rng.choice(NOUNS)}'
+            if rng.random() < 0.4:
+                title = f'{title} {rng.choice(QUALIFIERS)}'
+            description = (
+                ' '.join(rng.sample(SENTENCES, rng.randint(1, 3))) if rng.random() < 0.7 else ''
+            )
+            due_date = None
+            if rng.random() < 0.65:
+                # Mostly days to a few weeks after creation, occasionally months.
+                due_date = created_at + timedelta(days=rng.lognormvariate(1.8, 0.9))
+            if status == 'pending':
+                updated_at = created_at + timedelta(seconds=rng.random() * 3600)
+            else:
+                updated_at = created_at + timedelta(days=rng.expovariate(1 / 5))
+            yield user_id, title, description, status, due_date, created_at, min(updated_at, now)
+
+
+def seed_chunk(index, chunk, seed, days, now):
+    """Generate and store one chunk; runs in a worker process."""
+    rng = random.Random(seed * 1000003 + index)
+    rows = generate_rows(rng, chunk, days, now)
+    try:
+        if connection.vendor == 'postgresql':
+            return _copy_rows(rows)
+        return _insert_rows(rows)
+    finally:
+        connection.close()
+
+
+def _copy_rows(rows):
+    table = connection.ops.quote_name(Task._meta.db_table)
+    sql = f'COPY {table} ({", ".join(COLUMNS)}) FROM STDIN'
+    loaded = 0
+    with connection.cursor() as cursor:
+        while True:
+            buffer = io.StringIO()
+            batch = 0
+            for row in itertools.islice(rows, BATCH_SIZE):
+                buffer.write('\t'.join(_copy_value(value) for value in row) + '\n')
+                batch += 1
+            if not batch:
+                return loaded
+            buffer.seek(0)
+            raw = cursor.cursor
+            if hasattr(raw, 'copy_expert'):
+                raw.copy_expert(sql, buffer)
+            else:
+                # psycopg 3
+                with raw.copy(sql) as copy:
+                    copy.write(buffer.getvalue())
+            loaded += batch
+
+
+def _copy_value(value):
+    """Format ``value`` for COPY's text format."""
+    if value is None:
+        return '\\N'
+    if isinstance(value, str):
+        return value.replace('\\', '\\\\').replace('\t', '\\t').replace('\n', '\\n').replace('\r', '\\r')
+    if hasattr(value, 'isoformat'):
+        return value.isoformat()
+    return str(value)
+
+
+def _insert_rows(rows):
+    """
+    Write ``rows`` with one ``executemany`` per batch.
+
+    ``bulk_create`` would overwrite the generated ``created_at`` and
+    ``updated_at`` with the current time (``auto_now``), so the batched
+    INSERT is issued directly.
+    """
+    table = connection.ops.quote_name(Task._meta.db_table)
+    columns = ', '.join(connection.ops.quote_name(column) for column in COLUMNS)
+    sql = f'INSERT INTO {table} ({columns}) VALUES ({", ".join(["%s"] * len(COLUMNS))})'
+    adapt = connection.ops.adapt_datetimefield_value
+    if connection.vendor == 'sqlite':
+        # Other workers hold the write lock in turns.
+        with connection.cursor() as cursor:
+            cursor.execute('PRAGMA busy_timeout = 600000')
+    loaded = 0
+    while True:
+        batch = [
+            (user_id, title, description, status, adapt(due_date), adapt(created_at), adapt(updated_at))
+            for user_id, title, description, status, due_date, created_at, updated_at
+            in itertools.islice(rows, BATCH_SIZE)
+        ]
+        if not batch:
+            return loaded
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.executemany(sql, batch)
+        loaded += len(batch)
@@ -0,0 +1,26 @@
+# Generated by Django 4.2.7 on 2026-10-17 23:47
+
+from django.db import migrations, models
+
+from todo_project.db.operations import AddIndexConcurrently, RemoveIndexConcurrently
+
+
+class Migration(migrations.Migration):
+
+    # Indexes are built and dropped concurrently, outside a transaction.
+    atomic = False
+
+    dependencies = [
+        ('tasks', '0001_initial'),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='task',
+            index=models.Index(fields=['user', 'created_at', 'id'], name='tasks_user_id_b1360c_idx'),
+        ),
+        RemoveIndexConcurrently(
+            model_name='task',
+            name='tasks_user_id_90ebe9_idx',
+        ),
+    ]
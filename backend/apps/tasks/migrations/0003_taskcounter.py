@@ -0,0 +1,31 @@
+# Generated by Django 4.2.7 on 2026-10-17 23:50
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('tasks', '0002_task_keyset_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TaskCounter',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='task_counter', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('total', models.IntegerField(default=0)),
+                ('pending', models.IntegerField(default=0)),
+                ('done', models.IntegerField(default=0)),
+                ('archived', models.IntegerField(default=0)),
+                ('overdue', models.IntegerField(blank=True, null=True)),
+                ('overdue_expires_at', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'db_table': 'task_counters',
+            },
+        ),
+    ]
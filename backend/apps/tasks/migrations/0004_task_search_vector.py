@@ -0,0 +1,93 @@
+# Generated by Django 4.2.7 on 2026-10-17 23:51
+
+import django.contrib.postgres.search
+from django.contrib.postgres.operations import TrigramExtension
+from django.db import migrations
+
+
+# Title terms outrank description terms in ts_rank. The trigger goes in first
+# so rows written during the backfill are covered; the backfill itself sets
+# search_vector only and so does not fire it.
+CREATE_SEARCH_SQL = [
+    """
+    CREATE OR REPLACE FUNCTION tasks_search_vector_update() RETURNS trigger AS $$
+    BEGIN
+        NEW.search_vector :=
+            setweight(to_tsvector('simple', coalesce(NEW.title, '')), 'A') ||
+            setweight(to_tsvector('simple', coalesce(NEW.description, '')), 'B');
+        RETURN NEW;
+    END
+    $$ LANGUAGE plpgsql;
+    """,
+    """
+    CREATE TRIGGER tasks_search_vector_trigger
+    BEFORE INSERT OR UPDATE OF title, description ON tasks
+    FOR EACH ROW EXECUTE FUNCTION tasks_search_vector_update();
+    """,
+]
+
+# Each batch commits on its own (the migration is not atomic), so row locks
+# are held for one id range at a time instead of the whole table.
+BACKFILL_BATCH_SIZE = 5000
+
+BACKFILL_SQL = """
+    UPDATE tasks SET search_vector =
+        setweight(to_tsvector('simple', coalesce(title, '')), 'A') ||
+        setweight(to_tsvector('simple', coalesce(description, '')), 'B')
+    WHERE id > %s AND id <= %s AND search_vector IS NULL;
+"""
+
+CREATE_INDEX_SQL = [
+    'CREATE INDEX CONCURRENTLY IF NOT EXISTS tasks_search_vector_gin '
+    'ON tasks USING gin (search_vector);',
+    'CREATE INDEX CONCURRENTLY IF NOT EXISTS tasks_title_trgm_gin '
+    'ON tasks USING gin (title gin_trgm_ops);',
+]
+
+DROP_SEARCH_SQL = [
+    'DROP INDEX CONCURRENTLY IF EXISTS tasks_title_trgm_gin;',
+    'DROP INDEX CONCURRENTLY IF EXISTS tasks_search_vector_gin;',
+    'DROP TRIGGER IF EXISTS tasks_search_vector_trigger ON tasks;',
+    'DROP FUNCTION IF EXISTS tasks_search_vector_update();',
+]
+
+
+def create_search(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for statement in CREATE_SEARCH_SQL:
+        schema_editor.execute(statement)
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute('SELECT coalesce(max(id), 0) FROM tasks')
+        last_id = cursor.fetchone()[0]
+        for start in range(0, last_id, BACKFILL_BATCH_SIZE):
+            cursor.execute(BACKFILL_SQL, [start, start + BACKFILL_BATCH_SIZE])
+    for statement in CREATE_INDEX_SQL:
+        schema_editor.execute(statement)
+
+
+def drop_search(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for statement in DROP_SEARCH_SQL:
+        schema_editor.execute(statement)
+
+
+class Migration(migrations.Migration):
+
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction block.
+    atomic = False
+
+    dependencies = [
+        ('tasks', '0003_taskcounter'),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        migrations.AddField(
+            model_name='task',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.RunPython(create_search, drop_search),
+    ]
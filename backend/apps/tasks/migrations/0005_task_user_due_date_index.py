@@ -0,0 +1,26 @@
+# Generated by Django 4.2.7 on 2026-10-17 23:55
+
+from django.db import migrations, models
+
+from todo_project.db.operations import AddIndexConcurrently, RemoveIndexConcurrently
+
+
+class Migration(migrations.Migration):
+
+    # Indexes are built and dropped concurrently, outside a transaction.
+    atomic = False
+
+    dependencies = [
+        ('tasks', '0004_task_search_vector'),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='task',
+            index=models.Index(fields=['user', 'due_date'], name='tasks_user_id_20dbf7_idx'),
+        ),
+        RemoveIndexConcurrently(
+            model_name='task',
+            name='tasks_due_dat_0359a9_idx',
+        ),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 4.2.7 on 2026-10-17 23:56
+
+from django.db import migrations, models
+
+from todo_project.db.operations import AddIndexConcurrently, RemoveIndexConcurrently
+
+
+class Migration(migrations.Migration):
+
+    # Indexes are built and dropped concurrently, outside a transaction.
+    atomic = False
+
+    dependencies = [
+        ('tasks', '0005_task_user_due_date_index'),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='task',
+            index=models.Index(fields=['user', 'created_at', 'id'], include=('title', 'status', 'due_date', 'updated_at'), name='tasks_list_covering_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='task',
+            index=models.Index(condition=models.Q(('status', 'done'), _negated=True), fields=['user', 'due_date'], include=('title', 'status', 'created_at', 'updated_at'), name='tasks_outstanding_due_idx'),
+        ),
+        RemoveIndexConcurrently(
+            model_name='task',
+            name='tasks_user_id_b1360c_idx',
+        ),
+    ]
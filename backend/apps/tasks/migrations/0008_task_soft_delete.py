@@ -0,0 +1,43 @@
+# Generated by Django 4.2.7 on 2026-10-18 00:09
+
+from django.db import migrations, models
+
+from todo_project.db.operations import AddIndexConcurrently, RemoveIndexConcurrently
+
+
+class Migration(migrations.Migration):
+
+    # Indexes are built and dropped concurrently, outside a transaction.
+    atomic = False
+
+    dependencies = [
+        ('tasks', '0007_task_external_id'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='task',
+            name='deleted_at',
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+        AddIndexConcurrently(
+            model_name='task',
+            index=models.Index(condition=models.Q(('deleted_at__isnull', True)), fields=['user', 'created_at', 'id'], include=('title', 'status', 'due_date', 'updated_at'), name='tasks_list_alive_covering_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='task',
+            index=models.Index(condition=models.Q(models.Q(('status', 'done'), _negated=True), ('deleted_at__isnull', True)), fields=['user', 'due_date'], include=('title', 'status', 'created_at', 'updated_at'), name='tasks_outstanding_alive_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='task',
+            index=models.Index(condition=models.Q(('deleted_at__isnull', False)), fields=['deleted_at'], name='tasks_tombstone_idx'),
+        ),
+        RemoveIndexConcurrently(
+            model_name='task',
+            name='tasks_list_covering_idx',
+        ),
+        RemoveIndexConcurrently(
+            model_name='task',
+            name='tasks_outstanding_due_idx',
+        ),
+    ]
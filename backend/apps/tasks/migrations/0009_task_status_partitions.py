@@ -0,0 +1,248 @@
+"""
+Partition the tasks table by status on PostgreSQL.
+
+Archived tasks move to their own ``tasks_archived`` partition and every
+other status lives in ``tasks_active``, so the hot indexes only cover
+active rows and queries that exclude archived tasks skip the archive
+altogether. PostgreSQL cannot turn a table into a partitioned one in
+place, so the data is moved online:
+
+1. an empty copy of the table with the new layout and all indexes is
+   created next to it;
+2. a trigger mirrors every write on ``tasks`` into the copy;
+3. existing rows are copied in short batches, each its own transaction;
+4. in one short transaction the copy replaces ``tasks`` under a lock
+   that is retried instead of queueing behind long requests.
+
+Readers and writers are only blocked during step 4. The primary key
+becomes ``(id, status)``. Unique constraints of a partitioned table must
+contain the partition key, so ``tasks_user_external_id_uniq`` becomes a
+plain ``(user_id, external_id)`` index and a trigger that rejects a
+duplicate key in either partition with the same ``unique_violation``.
+Django's migration state keeps the constraint, so model validation
+still checks it. Reversing runs the same steps towards a plain table and
+restores the real constraint. Other databases keep the constraint and
+are not changed.
+"""
+
+import re
+
+from django.db import OperationalError, migrations, transaction
+
+# Rows copied per statement while the new table is filled.
+COPY_BATCH = 10000
+# The swap gives up waiting for its lock after this long and tries again.
+SWAP_LOCK_TIMEOUT = '3s'
+SWAP_ATTEMPTS = 20
+
+PARTITIONS = {
+    'tasks_archived': "FOR VALUES IN ('archived')",
+    'tasks_active': 'DEFAULT',
+}
+
+SYNC_FUNCTION_SQL = """
+    CREATE FUNCTION tasks_partitioning_sync() RETURNS trigger AS $$
+    BEGIN
+        IF TG_OP <> 'INSERT' THEN
+            DELETE FROM {target} WHERE id = OLD.id;
+        END IF;
+        IF TG_OP <> 'DELETE' THEN
+            INSERT INTO {target} VALUES (NEW.*);
+        END IF;
+        RETURN NULL;
+    END
+    $$ LANGUAGE plpgsql;
+"""
+
+SYNC_TRIGGER_SQL = """
+    CREATE TRIGGER tasks_partitioning_sync
+    AFTER INSERT OR UPDATE OR DELETE ON tasks
+    FOR EACH ROW EXECUTE FUNCTION tasks_partitioning_sync();
+"""
+
+# Locks the batch so a concurrent update waits for the copy and its
+# mirrored row then replaces the copied one.
+COPY_BATCH_SQL = """
+    WITH batch AS (
+        SELECT * FROM tasks WHERE id > %s AND id <= %s ORDER BY id LIMIT %s FOR SHARE
+    ), copied AS (
+        INSERT INTO {target} SELECT * FROM batch ON CONFLICT DO NOTHING
+    )
+    SELECT max(id) FROM batch
+"""
+
+INDEXES_SQL = """
+    SELECT class.relname, pg_get_indexdef(class.oid)
+    FROM pg_index JOIN pg_class class ON class.oid = pg_index.indexrelid
+    WHERE pg_index.indrelid = 'tasks'::regclass
+      AND NOT EXISTS (SELECT 1 FROM pg_constraint WHERE conindid = pg_index.indexrelid)
+"""
+
+SEARCH_TRIGGER_SQL = """
+    CREATE TRIGGER tasks_search_vector_trigger
+    BEFORE INSERT OR UPDATE OF title, description ON tasks
+    FOR EACH ROW EXECUTE FUNCTION tasks_search_vector_update();
+"""
+
+EXTERNAL_ID_CONSTRAINT = 'tasks_user_external_id_uniq'
+EXTERNAL_ID_INDEX = 'tasks_user_external_id_idx'
+
+# The advisory lock serializes writers of one key; under READ COMMITTED the
+# check that follows then sees a row the other writer has committed.
+UNIQUE_FUNCTION_SQL = """
+    CREATE OR REPLACE FUNCTION tasks_external_id_unique() RETURNS trigger AS $$
+    BEGIN
+        IF NEW.external_id IS NOT NULL THEN
+            PERFORM pg_advisory_xact_lock(hashtextextended(NEW.user_id || '/' || NEW.external_id, 0));
+            IF EXISTS (
+                SELECT 1 FROM tasks
+                WHERE user_id = NEW.user_id AND external_id = NEW.external_id AND id <> NEW.id
+            ) THEN
+                RAISE unique_violation USING
+                    MESSAGE = 'duplicate key value violates unique constraint "{constraint}"',
+                    DETAIL = format('Key (user_id, external_id)=(%s, %s) already exists.',
+                                    NEW.user_id, NEW.external_id),
+                    CONSTRAINT = '{constraint}';
+            END IF;
+        END IF;
+        RETURN NEW;
+    END
+    $$ LANGUAGE plpgsql;
+""".format(constraint=EXTERNAL_ID_CONSTRAINT)
+
+UNIQUE_TRIGGER_SQL = """
+    CREATE TRIGGER tasks_external_id_unique
+    BEFORE INSERT OR UPDATE OF user_id, external_id ON tasks
+    FOR EACH ROW EXECUTE FUNCTION tasks_external_id_unique();
+"""
+
+INDEX_TARGET = re.compile(r'^CREATE (UNIQUE )?INDEX \S+ ON (?:ONLY )?\S+ ')
+
+
+def _is_partitioned(cursor):
+    cursor.execute("SELECT relkind FROM pg_class WHERE oid = 'tasks'::regclass")
+    return cursor.fetchone()[0] == 'p'
+
+
+def _create_partitioned(cursor, target):
+    cursor.execute(f'CREATE TABLE {target} (LIKE tasks INCLUDING DEFAULTS) PARTITION BY LIST (status)')
+    cursor.execute(f'ALTER TABLE {target} ADD CONSTRAINT {target}_pkey PRIMARY KEY (id, status)')
+    for partition, bounds in PARTITIONS.items():
+        cursor.execute(f'CREATE TABLE {partition} PARTITION OF {target} {bounds}')
+    # Serves the uniqueness trigger in place of the constraint, which is not copied.
+    cursor.execute(f'CREATE INDEX {EXTERNAL_ID_INDEX}_swap ON {target} (user_id, external_id)')
+    return [(f'{EXTERNAL_ID_INDEX}_swap', EXTERNAL_ID_INDEX)]
+
+
+def _create_plain(cursor, target):
+    cursor.execute(f'CREATE TABLE {target} (LIKE tasks INCLUDING DEFAULTS)')
+    cursor.execute(f'ALTER TABLE {target} ADD CONSTRAINT {target}_pkey PRIMARY KEY (id)')
+    # Renaming the index renames the constraint with it.
+    cursor.execute(
+        f'ALTER TABLE {target} ADD CONSTRAINT {EXTERNAL_ID_CONSTRAINT}_swap UNIQUE (user_id, external_id)'
+    )
+    return [(f'{EXTERNAL_ID_CONSTRAINT}_swap', EXTERNAL_ID_CONSTRAINT)]
+
+
+def _copy_schema(cursor, target, skip=()):
+    """Give ``target`` the id sequence, foreign keys and indexes of ``tasks`` but ``skip``; return index renames."""
+    cursor.execute(f'CREATE SEQUENCE {target}_id_seq OWNED BY {target}.id')
+    cursor.execute(f"ALTER TABLE {target} ALTER COLUMN id SET DEFAULT nextval('{target}_id_seq')")
+    cursor.execute(
+        "SELECT conname, pg_get_constraintdef(oid) FROM pg_constraint "
+        "WHERE conrelid = 'tasks'::regclass AND contype = 'f'"
+    )
+    for name, definition in cursor.fetchall():
+        cursor.execute(f'ALTER TABLE {target} ADD CONSTRAINT {name} {definition}')
+
+    # Built before the copy: building them afterwards would lock the new
+    # table, and with it every mirrored write, for the whole build.
+    cursor.execute(INDEXES_SQL)
+    renames = []
+    for name, definition in cursor.fetchall():
+        if name in skip:
+            continue
+        temporary = f'{name[:58]}_swap'
+        cursor.execute(INDEX_TARGET.sub(f'CREATE \\1INDEX {temporary} ON {target} ', definition, count=1))
+        renames.append((temporary, name))
+    return renames
+
+
+def _copy_rows(cursor, target):
+    # Rows written from now on are mirrored by the trigger.
+    cursor.execute('SELECT max(id) FROM tasks')
+    last = cursor.fetchone()[0] or 0
+    copied = 0
+    while copied is not None and copied < last:
+        cursor.execute(COPY_BATCH_SQL.format(target=target), [copied, last, COPY_BATCH])
+        copied = cursor.fetchone()[0]
+
+
+def _swap(connection, target, renames, triggers):
+    for attempt in range(SWAP_ATTEMPTS):
+        try:
+            with transaction.atomic(using=connection.alias), connection.cursor() as cursor:
+                cursor.execute(f"SET LOCAL lock_timeout = '{SWAP_LOCK_TIMEOUT}'")
+                cursor.execute('LOCK TABLE tasks IN ACCESS EXCLUSIVE MODE')
+                cursor.execute(
+                    f"SELECT setval('{target}_id_seq', nextval(pg_get_serial_sequence('tasks', 'id')), false)"
+                )
+                cursor.execute('DROP TABLE tasks')
+                cursor.execute('DROP FUNCTION tasks_partitioning_sync()')
+                cursor.execute(f'ALTER TABLE {target} RENAME TO tasks')
+                cursor.execute(f'ALTER TABLE tasks RENAME CONSTRAINT {target}_pkey TO tasks_pkey')
+                cursor.execute(f'ALTER SEQUENCE {target}_id_seq RENAME TO tasks_id_seq')
+                for temporary, name in renames:
+                    cursor.execute(f'ALTER INDEX {temporary} RENAME TO {name}')
+                cursor.execute(SEARCH_TRIGGER_SQL)
+                for sql in triggers:
+                    cursor.execute(sql)
+            return
+        except OperationalError:
+            # Lock timeout; the mirror trigger keeps the copy current meanwhile.
+            if attempt == SWAP_ATTEMPTS - 1:
+                raise
+
+
+def _rebuild(partitioned):
+    def run(apps, schema_editor):
+        connection = schema_editor.connection
+        if connection.vendor != 'postgresql':
+            return
+        target = 'tasks_partitioned' if partitioned else 'tasks_unpartitioned'
+        with connection.cursor() as cursor:
+            if _is_partitioned(cursor) == partitioned:
+                return
+            # Leftovers of an interrupted run.
+            cursor.execute('DROP TRIGGER IF EXISTS tasks_partitioning_sync ON tasks')
+            cursor.execute('DROP FUNCTION IF EXISTS tasks_partitioning_sync()')
+            cursor.execute(f'DROP TABLE IF EXISTS {target}')
+
+            if partitioned:
+                renames = _create_partitioned(cursor, target)
+                renames += _copy_schema(cursor, target)
+                triggers = [UNIQUE_FUNCTION_SQL, UNIQUE_TRIGGER_SQL]
+            else:
+                renames = _create_plain(cursor, target)
+                renames += _copy_schema(cursor, target, skip={EXTERNAL_ID_INDEX})
+                triggers = ['DROP FUNCTION tasks_external_id_unique()']
+            cursor.execute(SYNC_FUNCTION_SQL.format(target=target))
+            cursor.execute(SYNC_TRIGGER_SQL)
+            _copy_rows(cursor, target)
+            cursor.execute(f'ANALYZE {target}')
+        _swap(connection, target, renames, triggers)
+    return run
+
+
+class Migration(migrations.Migration):
+
+    # Every copy batch commits on its own.
+    atomic = False
+
+    dependencies = [
+        ('tasks', '0008_task_soft_delete'),
+    ]
+
+    operations = [
+        migrations.RunPython(_rebuild(partitioned=True), _rebuild(partitioned=False)),
+    ]
@@ -1,7 +1,8 @@
 """Task models for the todo application."""
 
-from django.db import models
+from django.db import models, router, transaction
 from django.conf import settings
+from django.contrib.postgres.search import SearchVectorField
 
 
 class TimeStampedModel(models.Model):
@@ -14,13 +15,58 @@ class TimeStampedModel(models.Model):
         abstract = True
 
 
+class TaskQuerySet(models.QuerySet):
+    """QuerySet with the overdue condition shared by filters and stats."""
+
+    @staticmethod
+    def outstanding_q():
+        """
+        Tasks that can still become overdue.
+
+        Written as ``status <> 'done'`` so it matches the predicate of the
+        partial overdue index exactly.
+        """
+        return ~models.Q(status='done')
+
+    @classmethod
+    def overdue_q(cls, now):
+        return cls.outstanding_q() & models.Q(due_date__lt=now)
+
+    def overdue(self, now):
+        return self.filter(self.overdue_q(now))
+
+    def active(self):
+        """
+        Tasks that are not archived.
+
+        Spelled as a list of the partition's statuses, so PostgreSQL can
+        prune the archived partition at plan time.
+        """
+        return self.filter(status__in=Task.ACTIVE_STATUSES)
+
+    def archived(self):
+        return self.filter(status=Task.ARCHIVED)
+
+
+class TaskManager(models.Manager.from_queryset(TaskQuerySet)):
+    """Default task manager; soft-deleted tasks are left out."""
+
+    def get_queryset(self):
+        return super().get_queryset().filter(deleted_at__isnull=True)
+
+
 class Task(TimeStampedModel):
     """
     Task model representing a todo item.
     
     Each task belongs to a user and has a status that can be updated.
+    On PostgreSQL the table is partitioned by status: archived tasks live
+    in ``tasks_archived``, the rest in ``tasks_active`` (migration 0009).
     """
     
+    ARCHIVED = 'archived'
+    # Statuses stored in the active partition.
+    ACTIVE_STATUSES = ('pending', 'done')
     STATUS_CHOICES = [
         ('pending', 'Pending'),
         ('done', 'Done'),
@@ -40,23 +86,109 @@ class Task(TimeStampedModel):
         related_name='tasks'
     )
     due_date = models.DateTimeField(null=True, blank=True)
+    # Identifier assigned by the client's own system, used by bulk upserts.
+    external_id = models.CharField(max_length=100, null=True, blank=True)
+    # Maintained by a database trigger on PostgreSQL; see apps.tasks.search.
+    search_vector = SearchVectorField(null=True, editable=False)
+    # Tombstone set by soft deletes; such rows are purged later in batches.
+    deleted_at = models.DateTimeField(null=True, blank=True, editable=False)
+
+    objects = TaskManager()
+    # Includes soft-deleted tasks; only the purge should need it.
+    all_objects = TaskQuerySet.as_manager()
 
     class Meta:
         db_table = 'tasks'
         ordering = ['-created_at']
         indexes = [
             models.Index(fields=['user', 'status']),
-            models.Index(fields=['user', 'created_at']),
-            models.Index(fields=['due_date']),
+            # Covers the TaskListSerializer columns so list pages can be
+            # index-only scans (INCLUDE is PostgreSQL only; elsewhere this
+            # is a plain (user, created_at, id) index). Partial on the
+            # tombstone, like every query through the default manager.
+            models.Index(
+                fields=['user', 'created_at', 'id'],
+                include=['title', 'status', 'due_date', 'updated_at'],
+                condition=models.Q(deleted_at__isnull=True),
+                name='tasks_list_alive_covering_idx',
+            ),
+            models.Index(fields=['user', 'due_date']),
+            # Overdue hot path: only tasks that are not done can be overdue.
+            models.Index(
+                fields=['user', 'due_date'],
+                include=['title', 'status', 'created_at', 'updated_at'],
+                condition=~models.Q(status='done') & models.Q(deleted_at__isnull=True),
+                name='tasks_outstanding_alive_idx',
+            ),
+            # Finds tombstones for the purge without scanning live rows.
+            models.Index(
+                fields=['deleted_at'],
+                condition=models.Q(deleted_at__isnull=False),
+                name='tasks_tombstone_idx',
+            ),
+        ]
+        constraints = [
+            # NULLs are distinct, so tasks without an external id never clash.
+            # A status-partitioned table cannot have this unique index, so on
+            # PostgreSQL migration 0009 enforces it with a trigger instead.
+            models.UniqueConstraint(
+                fields=['user', 'external_id'],
+                name='tasks_user_external_id_uniq',
+            ),
         ]
 
     def __str__(self):
         return f"{self.title} ({self.get_status_display()})"
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        """Remember the loaded status and due date for counter bookkeeping."""
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_counter_state = (
+            instance.__dict__.get('status'),
+            instance.__dict__.get('due_date'),
+        )
+        return instance
+
+    def save(self, *args, **kwargs):
+        """Save in one transaction with the post_save counter bookkeeping."""
+        using = kwargs.get('using') or router.db_for_write(type(self), instance=self)
+        with transaction.atomic(using=using, savepoint=False):
+            super().save(*args, **kwargs)
+
     @property
     def is_overdue(self):
         """Check if task is overdue."""
         if self.due_date and self.status != 'done':
             from django.utils import timezone
             return timezone.now() > self.due_date
-        return False 
\ No newline at end of file
+        return False 
+
+
+class TaskCounter(models.Model):
+    """
+    Cached per-user task statistics.
+
+    Status counters are adjusted incrementally on every write. The overdue
+    count is only valid until ``overdue_expires_at``, the earliest future
+    due date among outstanding tasks, after which it is recomputed.
+    """
+
+    user = models.OneToOneField(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='task_counter'
+    )
+    total = models.IntegerField(default=0)
+    pending = models.IntegerField(default=0)
+    done = models.IntegerField(default=0)
+    archived = models.IntegerField(default=0)
+    overdue = models.IntegerField(null=True, blank=True)
+    overdue_expires_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        db_table = 'task_counters'
+
+    def __str__(self):
+        return f"Task counters for user {self.user_id}"
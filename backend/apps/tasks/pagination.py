@@ -0,0 +1,234 @@
+"""Pagination classes for task management."""
+
+import json
+from base64 import b64decode, b64encode
+
+from django.core.paginator import InvalidPage
+from django.db.models import F, Q
+from rest_framework.exceptions import NotFound
+from rest_framework.filters import OrderingFilter
+from rest_framework.pagination import PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+class TaskPagination(PageNumberPagination):
+    """
+    Page number pagination with an opt-in keyset (cursor) mode.
+
+    Passing ``?cursor=`` switches the request to keyset pagination: pages
+    are located by seeking past the last seen ``(ordering field, id)``
+    pair instead of ``OFFSET``, and no ``COUNT(*)`` query is issued.
+    Without the parameter the regular page number behaviour is kept.
+    """
+
+    page_size_query_param = 'page_size'
+    max_page_size = 5000
+    cursor_query_param = 'cursor'
+    invalid_cursor_message = 'Invalid cursor'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        """Dispatch to keyset pagination when a cursor is requested."""
+        self.use_cursor = self.cursor_query_param in request.query_params
+        if not self.use_cursor:
+            return super().paginate_queryset(queryset, request, view)
+
+        queryset = self._seek_queryset(queryset, request, view)
+        if queryset is None:
+            return None
+        return self._keyset_page(list(queryset[:self.page_size + 1]))
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        """Async counterpart of ``paginate_queryset`` using the async ORM."""
+        self.use_cursor = self.cursor_query_param in request.query_params
+        if self.use_cursor:
+            queryset = self._seek_queryset(queryset, request, view)
+            if queryset is None:
+                return None
+            return self._keyset_page([row async for row in queryset[:self.page_size + 1]])
+
+        page_size = self.get_page_size(request)
+        if not page_size:
+            return None
+
+        paginator = self.django_paginator_class(queryset, page_size)
+        # Prime the cached count so that Paginator never queries by itself.
+        paginator.count = await queryset.acount()
+        page_number = self.get_page_number(request, paginator)
+        try:
+            self.page = paginator.page(page_number)
+        except InvalidPage as exc:
+            msg = self.invalid_page_message.format(page_number=page_number, message=str(exc))
+            raise NotFound(msg)
+
+        if paginator.num_pages > 1 and self.template is not None:
+            self.display_page_controls = True
+        self.request = request
+        self.page.object_list = [row async for row in self.page.object_list]
+        return list(self.page)
+
+    def _seek_queryset(self, queryset, request, view):
+        """Return ``queryset`` ordered and filtered for the requested cursor page."""
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        self.page_size = self.get_page_size(request)
+        if not self.page_size:
+            return None
+
+        field_name, descending = self.get_ordering(request, queryset, view)
+        self.field_name = field_name
+        self.descending = descending
+        field = queryset.model._meta.get_field(field_name)
+        self.nullable = field.null
+
+        reverse, position = self.decode_cursor(request, field)
+        self.reverse = reverse
+        self.has_position = position is not None
+
+        # Scan backwards for "previous" links; results are flipped afterwards.
+        scan_descending = descending != reverse
+        nulls_last = not reverse
+        queryset = queryset.order_by(
+            *self._order_expressions(field_name, scan_descending, nulls_last)
+        )
+        if position is not None:
+            queryset = queryset.filter(
+                self._seek_filter(field_name, position, scan_descending, nulls_last)
+            )
+
+        self.row_fields = list(queryset.query.values_select)
+        return queryset
+
+    def _keyset_page(self, results):
+        """Trim the one-row lookahead off ``results`` and put them in page order."""
+        self.has_more = len(results) > self.page_size
+        results = results[:self.page_size]
+        if self.reverse:
+            results.reverse()
+        self.page_results = results
+        return results
+
+    def get_paginated_response(self, data):
+        """Return a page without the total count in cursor mode."""
+        if not self.use_cursor:
+            return super().get_paginated_response(data)
+        return Response({
+            'next': self.get_next_link(),
+            'previous': self.get_previous_link(),
+            'results': data,
+        })
+
+    def get_paginated_response_schema(self, schema):
+        if not getattr(self, 'use_cursor', False):
+            return super().get_paginated_response_schema(schema)
+        return {
+            'type': 'object',
+            'properties': {
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'previous': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'results': schema,
+            },
+        }
+
+    def get_next_link(self):
+        if not self.use_cursor:
+            return super().get_next_link()
+        # Moving backwards always leaves something after the current page.
+        has_next = self.has_position if self.reverse else self.has_more
+        if not has_next or not self.page_results:
+            return None
+        return self.encode_cursor(self.page_results[-1], reverse=False)
+
+    def get_previous_link(self):
+        if not self.use_cursor:
+            return super().get_previous_link()
+        has_previous = self.has_more if self.reverse else self.has_position
+        if not has_previous:
+            return None
+        if not self.page_results:
+            return replace_query_param(self.base_url, self.cursor_query_param, '')
+        return self.encode_cursor(self.page_results[0], reverse=True)
+
+    def get_ordering(self, request, queryset, view):
+        """
+        Return the leading ordering field and its direction.
+
+        Only the first ``ordering`` term is used; ``id`` is always appended
+        as the tie breaker so that positions are unique.
+        """
+        ordering = None
+        if view is not None:
+            ordering = OrderingFilter().get_ordering(request, queryset, view)
+        if not ordering:
+            ordering = queryset.query.order_by or queryset.model._meta.ordering
+        term = ordering[0] if ordering else '-id'
+        if not isinstance(term, str):
+            term = '-id'
+        descending = term.startswith('-')
+        return term.lstrip('-'), descending
+
+    def decode_cursor(self, request, field):
+        """Return ``(reverse, position)`` from the cursor query parameter."""
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return False, None
+
+        try:
+            payload = json.loads(b64decode(encoded.encode('ascii')).decode('utf-8'))
+            reverse = bool(payload['r'])
+            value = payload['v']
+            if value is not None:
+                value = field.to_python(value)
+            position = (value, int(payload['id']))
+        except Exception:
+            raise NotFound(self.invalid_cursor_message)
+
+        return reverse, position
+
+    def encode_cursor(self, instance, reverse):
+        """Return the URL of the page adjacent to ``instance``."""
+        value = self._row_value(instance, self.field_name)
+        if value is not None and hasattr(value, 'isoformat'):
+            value = value.isoformat()
+        payload = json.dumps({
+            'r': int(reverse), 'v': value, 'id': self._row_value(instance, 'id'),
+        })
+        encoded = b64encode(payload.encode('utf-8')).decode('ascii')
+        url = remove_query_param(self.base_url, self.page_query_param)
+        return replace_query_param(url, self.cursor_query_param, encoded)
+
+    def _row_value(self, row, name):
+        """Read ``name`` from a model instance or a ``values_list()`` tuple."""
+        if isinstance(row, tuple):
+            return row[self.row_fields.index(name)]
+        return getattr(row, name)
+
+    def _order_expressions(self, field_name, descending, nulls_last):
+        """Build the ``ORDER BY`` for a scan direction."""
+        nulls = {}
+        if self.nullable:
+            nulls = {'nulls_last': True} if nulls_last else {'nulls_first': True}
+        if descending:
+            return [F(field_name).desc(**nulls), F('id').desc()]
+        return [F(field_name).asc(**nulls), F('id').asc()]
+
+    def _seek_filter(self, field_name, position, descending, nulls_last):
+        """Build the row-value comparison that skips past ``position``."""
+        value, pk = position
+        lookup = 'lt' if descending else 'gt'
+        id_after = Q(**{f'id__{lookup}': pk})
+
+        if value is None:
+            after = Q(**{f'{field_name}__isnull': True}) & id_after
+            if not nulls_last:
+                after |= Q(**{f'{field_name}__isnull': False})
+            return after
+
+        # Expanded as ``f <= v AND (f < v OR id < pk)`` so the leading
+        # column bounds an index range scan.
+        after = Q(**{f'{field_name}__{lookup}e': value}) & (
+            Q(**{f'{field_name}__{lookup}': value}) | id_after
+        )
+        if self.nullable and nulls_last:
+            after |= Q(**{f'{field_name}__isnull': True})
+        return after
@@ -0,0 +1,205 @@
+"""
+Per-user, versioned response cache for the task read endpoints.
+
+Every user has a version token in the ``task_responses`` cache. Cached
+responses are keyed by that token, so replacing it on any write makes all
+of the user's cached pages unreachable at once. Responses carry a content
+ETag, and a matching ``If-None-Match`` is answered with 304.
+"""
+
+import asyncio
+import functools
+import hashlib
+import json
+import uuid
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from rest_framework import status
+from rest_framework.response import Response
+
+CACHE_ALIAS = 'task_responses'
+
+
+def cache_enabled():
+    """Return whether the task response cache is switched on."""
+    return getattr(settings, 'TASK_RESPONSE_CACHE', False)
+
+
+def get_cache():
+    return caches[CACHE_ALIAS]
+
+
+def _version_key(user_id):
+    return f'tasks:version:{user_id}'
+
+
+def get_version(user_id):
+    """Return the user's current version token, creating one if needed."""
+    cache = get_cache()
+    key = _version_key(user_id)
+    version = cache.get(key)
+    if version is None:
+        version = uuid.uuid4().hex
+        if not cache.add(key, version, timeout=None):
+            version = cache.get(key, version)
+    return version
+
+
+def invalidate(user_id):
+    """
+    Replace the user's version token once the current transaction commits.
+
+    A fresh random token is used instead of incrementing, so concurrent
+    writers in different workers can never lose a bump.
+    """
+    if not cache_enabled():
+        return
+    transaction.on_commit(
+        lambda: get_cache().set(_version_key(user_id), uuid.uuid4().hex, timeout=None)
+    )
+
+
+def _etag(data):
+    payload = json.dumps(data, cls=DjangoJSONEncoder, separators=(',', ':'))
+    return '"%s"' % hashlib.md5(payload.encode('utf-8')).hexdigest()
+
+
+def _matches(request, etag):
+    header = request.META.get('HTTP_IF_NONE_MATCH', '')
+    candidates = [tag.strip() for tag in header.split(',')]
+    return etag in candidates or '*' in candidates
+
+
+def _next_overdue_at(data, now):
+    """
+    Return when the first serialized task in ``data`` turns overdue.
+
+    ``is_overdue`` depends on the clock, so a cached copy is only valid
+    until then.
+    """
+    if isinstance(data, dict) and isinstance(data.get('results'), list):
+        items = data['results']
+    elif isinstance(data, dict):
+        items = [data]
+    else:
+        items = data if isinstance(data, list) else []
+
+    earliest = None
+    for item in items:
+        if not isinstance(item, dict) or item.get('status') == 'done':
+            continue
+        due_date = item.get('due_date')
+        due_date = parse_datetime(due_date) if isinstance(due_date, str) else due_date
+        if due_date is not None and due_date > now:
+            earliest = due_date if earliest is None else min(earliest, due_date)
+    return earliest
+
+
+def _finalize(request, data, etag):
+    if _matches(request, etag):
+        response = Response(status=status.HTTP_304_NOT_MODIFIED)
+    else:
+        response = Response(data)
+    response['ETag'] = etag
+    response['Cache-Control'] = 'private, no-cache'
+    return response
+
+
+def _response_key(view, request, version):
+    url_hash = hashlib.sha1(request.build_absolute_uri().encode('utf-8')).hexdigest()
+    return f'tasks:response:{request.user.pk}:{version}:{view.action}:{url_hash}'
+
+
+def _entry_timeout(view, data):
+    """Return how many seconds ``data`` may be cached for."""
+    now = timezone.now()
+    timeout = getattr(settings, 'TASK_RESPONSE_CACHE_TIMEOUT', 300)
+    expiries = [view.response_expires_at, _next_overdue_at(data, now)]
+    for expires_at in filter(None, expiries):
+        timeout = min(timeout, (expires_at - now).total_seconds())
+    return int(timeout)
+
+
+def cache_response(view_method):
+    """
+    Cache successful responses of a ``TaskViewSet`` read action.
+
+    The key covers the user, their version token, the action and the full
+    request URL. An entry lives for ``TASK_RESPONSE_CACHE_TIMEOUT`` seconds
+    at most, and less if a task in it would turn overdue sooner. The view
+    may set ``self.response_expires_at`` to shorten the lifetime further.
+    Coroutine view methods get a wrapper that uses the async cache API.
+    """
+    if asyncio.iscoroutinefunction(view_method):
+        return _cache_async_response(view_method)
+
+    @functools.wraps(view_method)
+    def wrapper(self, request, *args, **kwargs):
+        if not cache_enabled() or not request.user.is_authenticated:
+            return view_method(self, request, *args, **kwargs)
+
+        cache = get_cache()
+        key = _response_key(self, request, get_version(request.user.pk))
+
+        entry = cache.get(key)
+        if entry is not None:
+            data, etag = entry
+            return _finalize(request, data, etag)
+
+        self.response_expires_at = None
+        response = view_method(self, request, *args, **kwargs)
+        if response.status_code != status.HTTP_200_OK:
+            return response
+
+        etag = _etag(response.data)
+        timeout = _entry_timeout(self, response.data)
+        if timeout >= 1:
+            cache.set(key, (response.data, etag), timeout=timeout)
+        return _finalize(request, response.data, etag)
+
+    return wrapper
+
+
+async def aget_version(user_id):
+    """Async counterpart of ``get_version``."""
+    cache = get_cache()
+    key = _version_key(user_id)
+    version = await cache.aget(key)
+    if version is None:
+        version = uuid.uuid4().hex
+        if not await cache.aadd(key, version, timeout=None):
+            version = await cache.aget(key, version)
+    return version
+
+
+def _cache_async_response(view_method):
+    @functools.wraps(view_method)
+    async def wrapper(self, request, *args, **kwargs):
+        if not cache_enabled() or not request.user.is_authenticated:
+            return await view_method(self, request, *args, **kwargs)
+
+        cache = get_cache()
+        key = _response_key(self, request, await aget_version(request.user.pk))
+
+        entry = await cache.aget(key)
+        if entry is not None:
+            data, etag = entry
+            return _finalize(request, data, etag)
+
+        self.response_expires_at = None
+        response = await view_method(self, request, *args, **kwargs)
+        if response.status_code != status.HTTP_200_OK:
+            return response
+
+        etag = _etag(response.data)
+        timeout = _entry_timeout(self, response.data)
+        if timeout >= 1:
+            await cache.aset(key, (response.data, etag), timeout=timeout)
+        return _finalize(request, response.data, etag)
+
+    return wrapper
@@ -0,0 +1,273 @@
+"""
+Search backends for task title and description search.
+
+``postgres`` matches a trigger-maintained ``tsvector`` column through a GIN
+index with prefix terms and ranking, falling back to trigram similarity on
+the title when nothing matches (typos). ``inverted_index`` is a pure-Python
+index for single-process development setups (it runs on any database).
+``ilike`` is the plain ``icontains``
+scan, kept for comparison and used on other databases outside DEBUG.
+"""
+
+import bisect
+import difflib
+import json
+import re
+import threading
+from collections import OrderedDict
+
+from django.conf import settings
+from django.contrib.postgres.search import SearchQuery, SearchRank, TrigramWordSimilarity
+from django.db import connection, connections, models, transaction
+from django.db.models import Case, F, FloatField, Value, When
+from django.db.models.expressions import RawSQL
+
+from .models import Task
+
+# Text search configuration used by the tsvector trigger (migration 0004).
+SEARCH_CONFIG = 'simple'
+
+TITLE_WEIGHT = 1.0
+DESCRIPTION_WEIGHT = 0.4
+
+_token_re = re.compile(r'\w+')
+
+
+def tokenize(text):
+    """Split text into lowercase word tokens."""
+    return _token_re.findall(text.lower()) if text else []
+
+
+class IlikeSearchBackend:
+    """Unindexed ``icontains`` match over title and description."""
+
+    def search(self, queryset, value, user):
+        return queryset.filter(
+            models.Q(title__icontains=value) |
+            models.Q(description__icontains=value)
+        )
+
+    def index_task(self, task):
+        pass
+
+    def remove_task(self, task):
+        pass
+
+
+class PostgresSearchBackend(IlikeSearchBackend):
+    """Full-text search on ``Task.search_vector`` with a trigram fallback."""
+
+    trigram_threshold = 0.3
+
+    def search(self, queryset, value, user):
+        terms = tokenize(value)
+        if not terms:
+            return queryset.none()
+
+        query = SearchQuery(
+            ' & '.join(f"'{term}':*" for term in terms),
+            config=SEARCH_CONFIG,
+            search_type='raw',
+        )
+        matches = queryset.filter(search_vector=query).annotate(
+            search_rank=SearchRank(F('search_vector'), query)
+        )
+        if matches.exists():
+            return matches
+
+        return queryset.filter(title__trigram_word_similar=value).annotate(
+            search_rank=TrigramWordSimilarity(value, 'title')
+        ).filter(search_rank__gte=self.trigram_threshold)
+
+
+class _UserIndex:
+    """Postings for one user's tasks: token -> {task_id: weight}."""
+
+    def __init__(self):
+        self.postings = {}
+        self.documents = {}
+        self._vocabulary = None
+
+    def add(self, task_id, title, description):
+        self.remove(task_id)
+        weights = {}
+        for token in tokenize(title):
+            weights[token] = weights.get(token, 0.0) + TITLE_WEIGHT
+        for token in tokenize(description):
+            weights[token] = weights.get(token, 0.0) + DESCRIPTION_WEIGHT
+        for token, weight in weights.items():
+            if token not in self.postings:
+                self.postings[token] = {}
+                self._vocabulary = None
+            self.postings[token][task_id] = weight
+        self.documents[task_id] = list(weights)
+
+    def remove(self, task_id):
+        for token in self.documents.pop(task_id, ()):
+            posting = self.postings.get(token)
+            if posting is None:
+                continue
+            posting.pop(task_id, None)
+            if not posting:
+                del self.postings[token]
+                self._vocabulary = None
+
+    @property
+    def vocabulary(self):
+        if self._vocabulary is None:
+            self._vocabulary = sorted(self.postings)
+        return self._vocabulary
+
+    def expand(self, term):
+        """Return indexed tokens starting with ``term``, or close misspellings."""
+        vocabulary = self.vocabulary
+        start = bisect.bisect_left(vocabulary, term)
+        tokens = []
+        for token in vocabulary[start:]:
+            if not token.startswith(term):
+                break
+            tokens.append(token)
+        if tokens:
+            return tokens
+        return difflib.get_close_matches(term, vocabulary, n=3, cutoff=0.75)
+
+    def score(self, terms):
+        """Return ``{task_id: score}`` for tasks matching every term."""
+        scores = None
+        for term in terms:
+            term_scores = {}
+            for token in self.expand(term):
+                for task_id, weight in self.postings[token].items():
+                    term_scores[task_id] = term_scores.get(task_id, 0.0) + weight
+            if scores is None:
+                scores = term_scores
+            else:
+                scores = {
+                    task_id: score + term_scores[task_id]
+                    for task_id, score in scores.items()
+                    if task_id in term_scores
+                }
+            if not scores:
+                return {}
+        return scores or {}
+
+
+def _id_set(ids, vendor):
+    """
+    Return an ``id__in`` operand for ``ids``.
+
+    SQLite caps bound parameters, so there the ids travel as one JSON array
+    unpacked by ``json_each``; other backends take a plain list.
+    """
+    if vendor == 'sqlite':
+        return RawSQL('SELECT value FROM json_each(%s)', [json.dumps(ids)])
+    return ids
+
+
+class InvertedIndexSearchBackend(IlikeSearchBackend):
+    """
+    In-process inverted index for SQLite development setups.
+
+    A user's index is built from the database on their first search and
+    then kept current by the task signal handlers. It lives in the worker's
+    memory and misses writes made by other processes, so it is only
+    suitable for single-process development servers. At most
+    ``TASK_SEARCH_INDEX_MAX_USERS`` indexes are kept; the least recently
+    searched one is dropped first.
+    """
+
+    max_rank_levels = 20
+
+    def __init__(self):
+        self._indexes = OrderedDict()
+        self._lock = threading.Lock()
+
+    def search(self, queryset, value, user):
+        terms = tokenize(value)
+        if not terms:
+            return queryset.none()
+
+        scores = self._get_index(user.pk).score(terms)
+        if not scores:
+            return queryset.none()
+
+        # Tasks sharing a score share one CASE branch, so ranking costs a
+        # handful of hashed lookups per row.
+        levels = {}
+        for task_id, score in scores.items():
+            levels.setdefault(round(score, 3), []).append(task_id)
+        ranked = sorted(levels.items(), reverse=True)[:self.max_rank_levels]
+
+        vendor = connections[queryset.db].vendor
+        return queryset.filter(id__in=_id_set(list(scores), vendor)).annotate(
+            search_rank=Case(
+                *[When(id__in=_id_set(ids, vendor), then=Value(score)) for score, ids in ranked],
+                default=Value(0.0),
+                output_field=FloatField(),
+            )
+        )
+
+    def index_task(self, task):
+        args = (task.user_id, task.pk, task.title, task.description)
+        transaction.on_commit(lambda: self._apply(*args))
+
+    def remove_task(self, task):
+        args = (task.user_id, task.pk, None, None)
+        transaction.on_commit(lambda: self._apply(*args))
+
+    def _apply(self, user_id, task_id, title, description):
+        with self._lock:
+            index = self._indexes.get(user_id)
+            if index is None:
+                # Not built yet; it will be loaded from the database later.
+                return
+            if title is None:
+                index.remove(task_id)
+            else:
+                index.add(task_id, title, description)
+
+    def _get_index(self, user_id):
+        with self._lock:
+            index = self._indexes.get(user_id)
+            if index is not None:
+                self._indexes.move_to_end(user_id)
+                return index
+            index = _UserIndex()
+            rows = Task.objects.filter(user_id=user_id).values_list(
+                'id', 'title', 'description'
+            )
+            for task_id, title, description in rows.iterator(chunk_size=2000):
+                index.add(task_id, title, description)
+            self._indexes[user_id] = index
+            while len(self._indexes) > getattr(settings, 'TASK_SEARCH_INDEX_MAX_USERS', 100):
+                self._indexes.popitem(last=False)
+            return index
+
+
+BACKENDS = {
+    'postgres': PostgresSearchBackend,
+    'inverted_index': InvertedIndexSearchBackend,
+    'ilike': IlikeSearchBackend,
+}
+
+_backends = {}
+
+
+def get_search_backend(name=None):
+    """
+    Return the configured search backend instance.
+
+    ``TASK_SEARCH_BACKEND`` picks one explicitly; when empty the backend is
+    chosen from the database vendor. The in-process index is only picked
+    with DEBUG on.
+    """
+    if name is None:
+        name = getattr(settings, 'TASK_SEARCH_BACKEND', '')
+    if not name:
+        if connection.vendor == 'postgresql':
+            name = 'postgres'
+        else:
+            name = 'inverted_index' if settings.DEBUG else 'ilike'
+    if name not in _backends:
+        _backends[name] = BACKENDS[name]()
+    return _backends[name]
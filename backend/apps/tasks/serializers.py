@@ -1,6 +1,11 @@
 """Serializers for task management."""
 
-from rest_framework import serializers
+import functools
+
+from django.core.exceptions import ImproperlyConfigured
+from django.utils import timezone
+from rest_framework import ISO_8601, serializers
+from rest_framework.settings import api_settings
 from .models import Task
 
 
@@ -14,9 +19,9 @@ class TaskSerializer(serializers.ModelSerializer):
         model = Task
         fields = [
             'id', 'title', 'description', 'status', 'user',
-            'due_date', 'is_overdue', 'created_at', 'updated_at'
+            'due_date', 'is_overdue', 'external_id', 'created_at', 'updated_at'
         ]
-        read_only_fields = ['id', 'user', 'created_at', 'updated_at']
+        read_only_fields = ['id', 'user', 'external_id', 'created_at', 'updated_at']
 
     def validate_title(self, value):
         """Validate task title."""
@@ -81,4 +86,76 @@ class TaskStatusUpdateSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Task
-        fields = ['status'] 
\ No newline at end of file
+        fields = ['status']
+
+
+class TaskBulkItemSerializer(TaskCreateSerializer):
+    """Serializer for one item of a bulk create or upsert."""
+
+    class Meta(TaskCreateSerializer.Meta):
+        fields = ['external_id', *TaskCreateSerializer.Meta.fields]
+        extra_kwargs = {'external_id': {'allow_blank': False}}
+
+
+class TaskListRenderer:
+    """
+    Fast path equivalent of ``TaskListSerializer(many=True).data``.
+
+    Works on ``values_list(*TaskListRenderer.columns)`` rows, so no model
+    instances are built and DRF's per-field dispatch is skipped.
+    ``is_overdue`` is evaluated against a single ``now`` per page. The
+    output is identical to the serializer's; the constructor refuses to
+    build if ``TaskListSerializer`` grows fields this path does not know.
+    """
+
+    columns = ['id', 'title', 'status', 'due_date', 'created_at', 'updated_at']
+
+    def __init__(self):
+        fields = TaskListSerializer().fields
+        expected = ['id', 'title', 'status', 'due_date', 'is_overdue', 'created_at', 'updated_at']
+        if list(fields) != expected:
+            raise ImproperlyConfigured(
+                'TaskListRenderer is out of date with TaskListSerializer fields.'
+            )
+        self._datetime_fields = [fields['due_date'], fields['created_at'], fields['updated_at']]
+
+    def render(self, rows):
+        """Return the serialized list for ``rows``."""
+        now = timezone.now()
+        due_date_repr, created_repr, updated_repr = self._datetime_converters()
+        return [
+            {
+                'id': task_id,
+                'title': title,
+                'status': status,
+                'due_date': due_date_repr(due_date),
+                'is_overdue': bool(due_date and status != 'done' and now > due_date),
+                'created_at': created_repr(created_at),
+                'updated_at': updated_repr(updated_at),
+            }
+            for task_id, title, status, due_date, created_at, updated_at in rows
+        ]
+
+    def _datetime_converters(self):
+        """Return one ``to_representation`` per datetime field, inlined for ISO output."""
+        converters = []
+        for field in self._datetime_fields:
+            output_format = getattr(field, 'format', api_settings.DATETIME_FORMAT)
+            field_timezone = field.timezone if hasattr(field, 'timezone') else field.default_timezone()
+            if output_format is None or output_format.lower() != ISO_8601 or field_timezone is None:
+                converters.append(field.to_representation)
+            else:
+                converters.append(functools.partial(_iso_datetime, field, field_timezone))
+        return converters
+
+
+def _iso_datetime(field, field_timezone, value):
+    """``DateTimeField.to_representation`` for ISO 8601 output and aware values."""
+    if not value:
+        return None
+    if timezone.is_naive(value):
+        return field.to_representation(value)
+    value = value.astimezone(field_timezone).isoformat()
+    if value.endswith('+00:00'):
+        value = value[:-6] + 'Z'
+    return value
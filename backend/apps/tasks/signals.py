@@ -0,0 +1,71 @@
+"""Signal handlers for task management."""
+
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from . import counters, response_cache
+from .models import Task
+from .search import get_search_backend
+
+_suspended = ContextVar('task_signals_suspended', default=False)
+
+
+@contextmanager
+def suspended():
+    """Skip per-row bookkeeping while a bulk path does it once for the batch."""
+    token = _suspended.set(True)
+    try:
+        yield
+    finally:
+        _suspended.reset(token)
+
+
+@receiver(post_save, sender=Task)
+def task_saved(sender, instance, created, raw=False, **kwargs):
+    """Update the search index, response cache and counters for a saved task."""
+    if raw or _suspended.get():
+        return
+    get_search_backend().index_task(instance)
+    response_cache.invalidate(instance.user_id)
+    if not counters.counters_enabled():
+        return
+
+    previous = getattr(instance, '_loaded_counter_state', None)
+    instance._loaded_counter_state = (instance.status, instance.due_date)
+
+    if created:
+        before = []
+    elif previous is None or previous[0] is None:
+        # Loaded with deferred fields, so the old bucket is unknown.
+        counters.invalidate(instance.user_id)
+        return
+    elif previous == (instance.status, instance.due_date):
+        return
+    else:
+        before = counters.single(*previous)
+
+    counters.apply(
+        instance.user_id,
+        before,
+        counters.single(instance.status, instance.due_date),
+    )
+
+
+@receiver(post_delete, sender=Task)
+def task_deleted(sender, instance, **kwargs):
+    """Drop a deleted task from the search index, response cache and counters."""
+    if _suspended.get():
+        return
+    get_search_backend().remove_task(instance)
+    response_cache.invalidate(instance.user_id)
+    if not counters.counters_enabled():
+        return
+
+    counters.apply(
+        instance.user_id,
+        counters.single(instance.status, instance.due_date),
+        [],
+    )
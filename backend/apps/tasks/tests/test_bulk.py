@@ -0,0 +1,240 @@
+"""Bulk create, upsert on ``external_id`` and bulk patches."""
+
+import threading
+import unittest
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.db import IntegrityError, connection, transaction
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from apps.tasks import bulk, counters
+from apps.tasks.models import Task
+
+
+class BulkCreateTests(TestCase):
+
+    def setUp(self):
+        self.user = get_user_model().objects.create(username='alice', email='alice@example.com')
+        self.task = Task.objects.create(
+            user=self.user, title='old', description='text', status='done',
+            due_date=timezone.now(), external_id='a',
+        )
+
+    def test_create_rejects_taken_and_repeated_external_ids(self):
+        result = bulk.create_tasks(self.user, [
+            {'title': 'x', 'external_id': 'a'},
+            {'title': 'y', 'external_id': 'b'},
+            {'title': 'z', 'external_id': 'b'},
+        ])
+        self.assertEqual((result['created'], result['updated']), (1, 0))
+        self.assertEqual([error['index'] for error in result['errors']], [0, 2])
+        self.task.refresh_from_db()
+        self.assertEqual(self.task.title, 'old')
+        self.assertEqual(Task.objects.filter(user=self.user, external_id='b').count(), 1)
+
+    def test_external_ids_are_per_user(self):
+        other = get_user_model().objects.create(username='bob', email='bob@example.com')
+        result = bulk.create_tasks(other, [{'title': 'x', 'external_id': 'a'}])
+        self.assertEqual((result['created'], result['errors']), (1, []))
+
+    def test_upsert_replaces_existing_task_in_place(self):
+        created_at = self.task.created_at
+        result = bulk.create_tasks(self.user, [
+            {'title': 'new', 'external_id': 'a'},
+            {'title': 'other', 'external_id': 'c'},
+        ], upsert=True)
+        self.assertEqual((result['created'], result['updated'], result['errors']), (1, 1, []))
+        self.assertEqual(result['results'][0]['id'], self.task.pk)
+
+        self.task.refresh_from_db()
+        self.assertEqual(self.task.title, 'new')
+        self.assertEqual(self.task.created_at, created_at)
+        # Fields the item leaves out are reset.
+        self.assertEqual((self.task.description, self.task.status, self.task.due_date), ('', 'pending', None))
+        self.assertEqual(Task.objects.filter(user=self.user).count(), 2)
+
+    def test_upsert_requires_external_id(self):
+        result = bulk.create_tasks(self.user, [{'title': 'x'}], upsert=True)
+        self.assertEqual(result['created'], 0)
+        self.assertIn('external_id', result['errors'][0]['errors'])
+
+    def test_soft_deleted_task_frees_its_external_id(self):
+        bulk.delete_tasks(self.user, [self.task.pk], soft=True)
+        result = bulk.create_tasks(self.user, [{'title': 'again', 'external_id': 'a'}])
+        self.assertEqual((result['created'], result['errors']), (1, []))
+        self.assertFalse(Task.all_objects.filter(pk=self.task.pk).exists())
+
+    def test_invalid_items_do_not_block_valid_ones(self):
+        result = bulk.create_tasks(self.user, [
+            {'title': ''},
+            {'title': 'ok', 'due_date': (timezone.now() + timedelta(days=1)).isoformat()},
+        ])
+        self.assertEqual(result['created'], 1)
+        self.assertEqual(result['errors'][0]['index'], 0)
+
+
+@unittest.skipUnless(connection.vendor == 'postgresql', 'row locks need PostgreSQL')
+class ConcurrentBulkCreateTests(TransactionTestCase):
+
+    def test_concurrent_creates_of_one_external_id(self):
+        user = get_user_model().objects.create(username='alice', email='alice@example.com')
+        barrier = threading.Barrier(4)
+        results = []
+
+        def create():
+            barrier.wait()
+            try:
+                results.append(bulk.create_tasks(user, [{'title': 'x', 'external_id': 'same'}]))
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=create) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(sorted(result['created'] for result in results), [0, 0, 0, 1])
+        self.assertEqual(Task.objects.filter(user=user, external_id='same').count(), 1)
+
+    def test_external_id_lock_does_not_block_task_inserts(self):
+        user = get_user_model().objects.create(username='alice', email='alice@example.com')
+        errors = []
+
+        def insert():
+            try:
+                with transaction.atomic():
+                    with connection.cursor() as cursor:
+                        cursor.execute("SET LOCAL lock_timeout = '2s'")
+                    Task.objects.create(user=user, title='single')
+            except Exception as exc:
+                errors.append(exc)
+            finally:
+                connection.close()
+
+        with transaction.atomic():
+            bulk._lock_external_ids(user)
+            thread = threading.Thread(target=insert)
+            thread.start()
+            thread.join()
+
+        self.assertEqual(errors, [])
+
+
+class ExternalIdUniquenessTests(TestCase):
+
+    def test_writes_outside_bulk_create_are_checked(self):
+        user = get_user_model().objects.create(username='alice', email='alice@example.com')
+        Task.objects.create(user=user, title='first', external_id='a')
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            Task.objects.create(user=user, title='second', status='archived', external_id='a')
+        Task.objects.create(user=user, title='no key')
+        Task.objects.create(user=user, title='no key either')
+
+
+@override_settings(TASK_BULK_BATCH_SIZE=2, TASK_COUNTER_CACHE=True)
+class BulkPatchTests(TestCase):
+
+    def setUp(self):
+        self.user = get_user_model().objects.create(username='alice', email='alice@example.com')
+        self.tasks = [Task.objects.create(user=self.user, title=f'task {n}') for n in range(5)]
+        self.ids = [task.pk for task in self.tasks]
+        counters.get_stats(self.user)
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def patch(self, data):
+        response = self.client.patch(reverse('tasks:task-bulk-patch'), data, format='json')
+        self.assertEqual(response.status_code, 200)
+        return response.data
+
+    def test_per_task_values_are_applied_across_chunks(self):
+        due_date = timezone.now() - timedelta(days=1)
+        result = self.patch({'tasks': [
+            {'id': self.ids[0], 'title': 'renamed'},
+            {'id': self.ids[1], 'status': 'done'},
+            {'id': self.ids[2], 'status': 'done', 'title': 'both'},
+            {'id': self.ids[3], 'due_date': due_date.isoformat()},
+            {'id': self.ids[4], 'description': 'details'},
+        ]})
+        self.assertEqual((result['updated_count'], result['errors']), (5, []))
+        tasks = Task.objects.in_bulk(self.ids)
+        self.assertEqual(
+            [(tasks[pk].title, tasks[pk].status) for pk in self.ids[:3]],
+            [('renamed', 'pending'), ('task 1', 'done'), ('both', 'done')],
+        )
+        self.assertEqual(tasks[self.ids[3]].due_date, due_date)
+        self.assertEqual(tasks[self.ids[4]].description, 'details')
+        self.assertTrue(all(task.updated_at > self.tasks[0].updated_at for task in tasks.values()))
+
+        stats = counters.get_stats(self.user)
+        self.assertEqual((stats['pending'], stats['done'], stats['overdue']), (3, 2, 1))
+
+    def test_bad_items_are_reported_by_index(self):
+        other = get_user_model().objects.create(username='bob', email='bob@example.com')
+        foreign = Task.objects.create(user=other, title='not mine')
+        result = self.patch({'tasks': [
+            {'id': self.ids[0], 'status': 'done'},
+            {'id': self.ids[0], 'status': 'pending'},
+            {'id': self.ids[1], 'status': 'bogus'},
+            {'id': foreign.pk, 'title': 'stolen'},
+            {'title': 'no id'},
+            {'id': self.ids[2]},
+            'not an object',
+        ]})
+        self.assertEqual(result['updated_count'], 1)
+        self.assertEqual([error['index'] for error in result['errors']], [1, 2, 3, 4, 5, 6])
+        self.assertEqual(Task.objects.get(pk=foreign.pk).title, 'not mine')
+        self.assertEqual(Task.objects.get(pk=self.ids[1]).status, 'pending')
+
+    def test_shared_values_apply_to_every_id(self):
+        result = self.patch({'task_ids': self.ids[:3], 'values': {'status': 'done', 'title': 'same'}})
+        self.assertEqual(result['updated_count'], 3)
+        self.assertEqual(
+            set(Task.objects.filter(pk__in=self.ids[:3]).values_list('title', 'status')),
+            {('same', 'done')},
+        )
+        self.assertEqual(counters.get_stats(self.user)['done'], 3)
+
+    def test_shared_and_varying_values_cost_no_query_per_task(self):
+        def patch_queries(count):
+            with CaptureQueriesContext(connection) as queries:
+                bulk.patch_tasks(self.user, [
+                    {'id': pk, 'status': 'done', 'title': f'new {pk}'} for pk in self.ids[:count]
+                ])
+            return len(queries)
+
+        with self.settings(TASK_BULK_BATCH_SIZE=10):
+            self.assertEqual(patch_queries(2), patch_queries(5))
+
+
+@unittest.skipUnless(connection.vendor == 'postgresql', 'row locks need PostgreSQL')
+@override_settings(TASK_COUNTER_CACHE=True)
+class ConcurrentBulkUpdateTests(TransactionTestCase):
+
+    def test_concurrent_status_updates_count_each_transition_once(self):
+        user = get_user_model().objects.create(username='alice', email='alice@example.com')
+        ids = [Task.objects.create(user=user, title=f't{n}').pk for n in range(20)]
+        counters.get_stats(user)
+        barrier = threading.Barrier(4)
+
+        def update():
+            barrier.wait()
+            try:
+                bulk.update_tasks(user, ids, {'status': 'done'})
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=update) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        stats = counters.get_stats(user)
+        self.assertEqual((stats['total'], stats['pending'], stats['done']), (20, 0, 20))
@@ -0,0 +1,134 @@
+"""The counter cache must always agree with a fresh aggregation."""
+
+import threading
+import unittest
+import unittest.mock
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.db import connection, transaction
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.utils import timezone
+
+from apps.tasks import bulk, counters
+from apps.tasks.models import Task, TaskCounter
+
+STAT_KEYS = ['total', 'pending', 'done', 'archived', 'overdue']
+
+
+@override_settings(TASK_COUNTER_CACHE=True)
+class CounterCacheTests(TestCase):
+
+    def setUp(self):
+        self.user = get_user_model().objects.create(username='alice', email='alice@example.com')
+        past = timezone.now() - timedelta(days=1)
+        Task.objects.create(user=self.user, title='late', due_date=past, external_id='a')
+        Task.objects.create(user=self.user, title='done', status='done', due_date=past)
+        Task.objects.create(user=self.user, title='old', status='archived', external_id='b')
+        # Builds the counter row, so later writes adjust it incrementally.
+        counters.get_stats(self.user)
+
+    def assertCountersMatch(self):
+        cached = counters.get_stats(self.user)
+        fresh = counters.aggregate_stats(Task.objects.filter(user=self.user))
+        self.assertEqual(
+            {key: cached[key] for key in STAT_KEYS},
+            {key: fresh[key] for key in STAT_KEYS},
+        )
+
+    def test_single_task_writes(self):
+        task = Task.objects.create(user=self.user, title='new')
+        task.status = 'done'
+        task.save()
+        Task.objects.get(title='late').delete()
+        self.assertCountersMatch()
+
+    def test_bulk_create_with_taken_external_ids(self):
+        result = bulk.create_tasks(self.user, [
+            {'title': 'x', 'external_id': 'a', 'status': 'done'},
+            {'title': 'y', 'external_id': 'b'},
+            {'title': 'z', 'external_id': 'c', 'status': 'archived'},
+            {'title': 'w'},
+        ])
+        self.assertEqual(result['created'], 2)
+        self.assertEqual([error['index'] for error in result['errors']], [0, 1])
+        self.assertCountersMatch()
+
+    def test_bulk_upsert(self):
+        bulk.create_tasks(self.user, [
+            {'title': 'x', 'external_id': 'a', 'status': 'done'},
+            {'title': 'y', 'external_id': 'b', 'due_date': timezone.now() - timedelta(hours=1)},
+            {'title': 'z', 'external_id': 'c'},
+        ], upsert=True)
+        self.assertCountersMatch()
+
+    def test_bulk_update_and_delete(self):
+        ids = list(Task.objects.filter(user=self.user).values_list('id', flat=True))
+        bulk.update_tasks(self.user, ids[:2], {'status': 'archived'})
+        self.assertCountersMatch()
+        bulk.delete_tasks(self.user, ids[1:], soft=False)
+        self.assertCountersMatch()
+        bulk.delete_tasks(self.user, ids[:1], soft=True)
+        self.assertCountersMatch()
+
+    def test_overdue_is_refreshed_after_a_deadline(self):
+        soon = timezone.now() + timedelta(hours=1)
+        Task.objects.create(user=self.user, title='soon', due_date=soon)
+        with unittest.mock.patch('django.utils.timezone.now', return_value=soon + timedelta(minutes=1)):
+            self.assertEqual(counters.get_stats(self.user)['overdue'], 2)
+
+
+@override_settings(TASK_COUNTER_CACHE=True)
+class CounterWithoutRowTests(TestCase):
+
+    def setUp(self):
+        self.user = get_user_model().objects.create(username='alice', email='alice@example.com')
+
+    def test_writes_without_a_counter_row_leave_none_behind(self):
+        task = Task.objects.create(user=self.user, title='t')
+        task.delete()
+        bulk.create_tasks(self.user, [{'title': 'x'}])
+        self.assertFalse(TaskCounter.objects.exists())
+
+    def test_first_read_builds_the_row(self):
+        Task.objects.create(user=self.user, title='t', status='done')
+        self.assertEqual(counters.get_stats(self.user)['done'], 1)
+        self.assertEqual(TaskCounter.objects.get(user=self.user).total, 1)
+
+
+@unittest.skipUnless(connection.vendor == 'postgresql', 'needs concurrent transactions')
+@override_settings(TASK_COUNTER_CACHE=True)
+class CounterRebuildRaceTests(TransactionTestCase):
+
+    def test_rebuild_waits_for_a_write_in_progress(self):
+        user = get_user_model().objects.create(username='alice', email='alice@example.com')
+        written, release = threading.Event(), threading.Event()
+        stats = []
+
+        def write():
+            try:
+                with transaction.atomic():
+                    Task.objects.create(user=user, title='t')
+                    written.set()
+                    release.wait(5)
+            finally:
+                connection.close()
+
+        def read():
+            try:
+                stats.append(counters.get_stats(user))
+            finally:
+                connection.close()
+
+        writer = threading.Thread(target=write)
+        writer.start()
+        written.wait(5)
+        reader = threading.Thread(target=read)
+        reader.start()
+        reader.join(0.5)
+        release.set()
+        writer.join()
+        reader.join()
+
+        self.assertEqual(stats[0]['total'], 1)
+        self.assertEqual(counters.get_stats(user)['total'], 1)
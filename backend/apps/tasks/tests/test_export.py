@@ -0,0 +1,77 @@
+"""Streaming NDJSON and CSV task export."""
+
+import csv
+import io
+import json
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from apps.tasks.export import FIELDS
+from apps.tasks.models import Task
+from apps.tasks.serializers import TaskListSerializer
+
+
+@override_settings(TASK_EXPORT_CHUNK_SIZE=2)
+class ExportTests(TestCase):
+
+    def setUp(self):
+        self.user = get_user_model().objects.create(username='alice', email='alice@example.com')
+        now = timezone.now()
+        self.tasks = [
+            Task.objects.create(user=self.user, title='plain'),
+            Task.objects.create(user=self.user, title='comma, "quotes"', description='two\nlines'),
+            Task.objects.create(user=self.user, title='overdue', due_date=now - timedelta(days=1)),
+            Task.objects.create(user=self.user, title='finished', status='done', due_date=now - timedelta(days=1)),
+            Task.objects.create(user=self.user, title='later', due_date=now + timedelta(days=1)),
+        ]
+        for age, task in enumerate(reversed(self.tasks)):
+            Task.objects.filter(pk=task.pk).update(created_at=now - timedelta(minutes=age))
+        other = get_user_model().objects.create(username='bob', email='bob@example.com')
+        Task.objects.create(user=other, title='not mine')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def export(self, **params):
+        response = self.client.get(reverse('tasks:task-export'), params)
+        self.assertEqual(response.status_code, 200)
+        return response, b''.join(response.streaming_content).decode('utf-8')
+
+    def test_ndjson_has_one_task_per_line_in_list_order(self):
+        response, body = self.export()
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+        self.assertEqual(response['Content-Disposition'], 'attachment; filename="tasks.ndjson"')
+        records = [json.loads(line) for line in body.splitlines()]
+        self.assertEqual([record['id'] for record in records], [task.pk for task in reversed(self.tasks)])
+        self.assertEqual(list(records[0]), FIELDS)
+
+    def test_ndjson_values_match_the_list_serializer(self):
+        _, body = self.export()
+        records = {record['id']: record for record in map(json.loads, body.splitlines())}
+        for item in TaskListSerializer(Task.objects.filter(user=self.user), many=True).data:
+            record = records[item['id']]
+            self.assertEqual({name: record[name] for name in item}, dict(item))
+
+    def test_csv_quotes_values_and_spells_out_booleans(self):
+        response, body = self.export(export_format='csv')
+        self.assertEqual(response['Content-Type'], 'text/csv; charset=utf-8')
+        rows = list(csv.DictReader(io.StringIO(body)))
+        self.assertEqual(len(rows), 5)
+        by_title = {row['title']: row for row in rows}
+        self.assertEqual(by_title['comma, "quotes"']['description'], 'two\nlines')
+        self.assertEqual(by_title['overdue']['is_overdue'], 'true')
+        self.assertEqual(by_title['finished']['is_overdue'], 'false')
+        self.assertEqual(by_title['plain']['due_date'], '')
+
+    def test_list_filters_and_ordering_apply(self):
+        _, body = self.export(status='pending', ordering='title')
+        titles = [json.loads(line)['title'] for line in body.splitlines()]
+        self.assertEqual(titles, ['comma, "quotes"', 'later', 'overdue', 'plain'])
+
+    def test_unknown_format_is_rejected(self):
+        response = self.client.get(reverse('tasks:task-export'), {'export_format': 'xml'})
+        self.assertEqual(response.status_code, 400)
@@ -0,0 +1,73 @@
+"""Day-based date filters and their timezone."""
+
+import zoneinfo
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from apps.tasks.models import Task
+
+LOOKUPS = {
+    'due_date': 'due_date__date',
+    'due_date_gte': 'due_date__date__gte',
+    'due_date_lte': 'due_date__date__lte',
+    'due_date__date': 'due_date__date',
+    'due_date__date__gte': 'due_date__date__gte',
+    'due_date__date__lte': 'due_date__date__lte',
+}
+
+
+class DayRangeFilterTests(TestCase):
+
+    def setUp(self):
+        self.user = get_user_model().objects.create(username='alice', email='alice@example.com')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        # Every five hours over three UTC days, so each day boundary in any
+        # timezone has tasks on both sides of it.
+        start = datetime(2024, 3, 9, tzinfo=dt_timezone.utc)
+        for n in range(15):
+            Task.objects.create(user=self.user, title=f'task {n}', due_date=start + timedelta(hours=5 * n))
+        Task.objects.create(user=self.user, title='no due date')
+
+    def ids(self, **params):
+        response = self.client.get(reverse('tasks:task-list'), {'page_size': 100, **params})
+        self.assertEqual(response.status_code, 200)
+        return sorted(row['id'] for row in response.data['results'])
+
+    def test_filters_match_date_lookups_in_every_timezone(self):
+        for tz_name in ('UTC', 'America/New_York', 'Asia/Kolkata', 'Pacific/Kiritimati'):
+            tzinfo = zoneinfo.ZoneInfo(tz_name)
+            for param, lookup in LOOKUPS.items():
+                for day in ('2024-03-09', '2024-03-10', '2024-03-11'):
+                    with self.subTest(tz=tz_name, param=param, day=day), timezone.override(tzinfo):
+                        expected = sorted(Task.objects.filter(**{lookup: day}).values_list('pk', flat=True))
+                        self.assertEqual(self.ids(**{param: day, 'tz': tz_name}), expected)
+
+    def test_columns_are_compared_without_a_date_cast(self):
+        with CaptureQueriesContext(connection) as queries:
+            self.ids(due_date='2024-03-10', created_date='2024-03-10')
+        sql = ' '.join(query['sql'] for query in queries).lower()
+        self.assertIn('"due_date" >=', sql)
+        self.assertNotIn('cast_date', sql)
+
+    def test_tz_defaults_to_the_active_timezone(self):
+        with timezone.override(zoneinfo.ZoneInfo('Asia/Kolkata')):
+            self.assertEqual(
+                self.ids(due_date='2024-03-10'),
+                self.ids(due_date='2024-03-10', tz='Asia/Kolkata'),
+            )
+        self.assertNotEqual(
+            self.ids(due_date='2024-03-10', tz='UTC'),
+            self.ids(due_date='2024-03-10', tz='Asia/Kolkata'),
+        )
+
+    def test_unknown_timezone_is_rejected(self):
+        response = self.client.get(reverse('tasks:task-list'), {'due_date': '2024-03-10', 'tz': 'Mars/Olympus'})
+        self.assertEqual(response.status_code, 400)
@@ -0,0 +1,84 @@
+"""Keyset (cursor) pagination of the task list."""
+
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from apps.tasks.models import Task
+
+
+class KeysetPaginationTests(TestCase):
+
+    def setUp(self):
+        self.user = get_user_model().objects.create(username='alice', email='alice@example.com')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        now = timezone.now()
+        for n in range(7):
+            # Pairs of tasks share created_at, so id has to break the ties;
+            # every third task has no due date.
+            task = Task.objects.create(
+                user=self.user, title=f'task {n}',
+                due_date=None if n % 3 == 0 else now + timedelta(days=n % 4),
+            )
+            Task.objects.filter(pk=task.pk).update(created_at=now - timedelta(hours=n // 2))
+
+    def walk(self, url, link='next'):
+        """Follow ``link`` from ``url`` and return the ids of every page."""
+        pages = []
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            self.assertNotIn('count', response.data)
+            pages.append([row['id'] for row in response.data['results']])
+            url = response.data[link]
+        return pages
+
+    def expected(self, key):
+        tasks = sorted(Task.objects.all(), key=key)
+        return [task.pk for task in tasks]
+
+    def test_default_ordering_pages_follow_created_at_then_id(self):
+        pages = self.walk(reverse('tasks:task-list') + '?cursor=&page_size=3')
+        self.assertEqual([len(page) for page in pages], [3, 3, 1])
+        expected = self.expected(lambda task: (-task.created_at.timestamp(), -task.pk))
+        self.assertEqual(sum(pages, []), expected)
+
+    def test_nullable_ordering_puts_nulls_last_in_both_directions(self):
+        for ordering, sign in (('due_date', 1), ('-due_date', -1)):
+            with self.subTest(ordering=ordering):
+                url = reverse('tasks:task-list') + f'?cursor=&page_size=2&ordering={ordering}'
+                expected = self.expected(lambda task: (
+                    task.due_date is None,
+                    sign * task.due_date.timestamp() if task.due_date else 0,
+                    sign * task.pk,
+                ))
+                self.assertEqual(sum(self.walk(url), []), expected)
+
+    def test_previous_links_walk_back_to_the_first_page(self):
+        url = reverse('tasks:task-list') + '?cursor=&page_size=3&ordering=title'
+        forward = self.walk(url)
+        last = self.client.get(url)
+        while last.data['next']:
+            last = self.client.get(last.data['next'])
+        backward = self.walk(last.data['previous'], link='previous')
+        self.assertEqual(backward, forward[-2::-1])
+
+    def test_cursor_pages_skip_the_count_query(self):
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(reverse('tasks:task-list') + '?cursor=')
+        self.assertFalse(any('COUNT(' in query['sql'].upper() for query in queries))
+
+    def test_invalid_cursor_is_not_found(self):
+        response = self.client.get(reverse('tasks:task-list') + '?cursor=not-base64')
+        self.assertEqual(response.status_code, 404)
+
+    def test_page_numbers_still_work_without_a_cursor(self):
+        response = self.client.get(reverse('tasks:task-list') + '?page=2&page_size=3')
+        self.assertEqual((response.data['count'], len(response.data['results'])), (7, 3))
@@ -0,0 +1,113 @@
+"""Migration 0009: status partitions on PostgreSQL, unique external ids everywhere."""
+
+import unittest
+
+from django.contrib.auth import get_user_model
+from django.db import IntegrityError, connection, transaction
+from django.db.migrations.executor import MigrationExecutor
+from django.test import TestCase, TransactionTestCase
+
+from apps.tasks.models import Task
+
+BEFORE = [('tasks', '0008_task_soft_delete')]
+INDEX = 'tasks_user_external_id_idx'
+CONSTRAINT = 'tasks_user_external_id_uniq'
+
+
+def _constraints():
+    with connection.cursor() as cursor:
+        return connection.introspection.get_constraints(cursor, 'tasks')
+
+
+def _relkind():
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT relkind FROM pg_class WHERE oid = 'tasks'::regclass")
+        return cursor.fetchone()[0]
+
+
+def _partition_of(task):
+    with connection.cursor() as cursor:
+        cursor.execute('SELECT tableoid::regclass::text FROM tasks WHERE id = %s', [task.pk])
+        return cursor.fetchone()[0]
+
+
+class MigrationRoundTripTests(TransactionTestCase):
+
+    def setUp(self):
+        self.user = get_user_model().objects.create(username='alice', email='alice@example.com')
+        self.executor = MigrationExecutor(connection)
+        self.latest = self.executor.loader.graph.leaf_nodes()
+
+    def tearDown(self):
+        self.executor.loader.build_graph()
+        self.executor.migrate(self.latest)
+
+    def migrate(self, targets):
+        self.executor.loader.build_graph()
+        self.executor.migrate(targets)
+
+    def assertExternalIdsUnique(self):
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            Task.objects.create(user=self.user, title='dup', external_id='a')
+
+    def test_round_trip_keeps_rows_and_uniqueness(self):
+        task = Task.objects.create(user=self.user, title='keep', status='archived', external_id='a')
+        self.assertExternalIdsUnique()
+        self.migrate(BEFORE)
+        self.assertTrue(_constraints()[CONSTRAINT]['unique'])
+        self.assertExternalIdsUnique()
+
+        self.migrate(self.latest)
+        self.assertEqual(Task.objects.get(pk=task.pk).title, 'keep')
+        self.assertExternalIdsUnique()
+
+    @unittest.skipIf(connection.vendor == 'postgresql', 'PostgreSQL uses a trigger')
+    def test_other_databases_keep_the_constraint(self):
+        self.assertTrue(_constraints()[CONSTRAINT]['unique'])
+
+    @unittest.skipUnless(connection.vendor == 'postgresql', 'partitioning is PostgreSQL only')
+    def test_round_trip_on_postgresql(self):
+        task = Task.objects.create(user=self.user, title='keep', status='archived')
+        self.assertEqual(_relkind(), 'p')
+        self.migrate(BEFORE)
+        self.assertEqual(_relkind(), 'r')
+        self.assertNotIn(INDEX, _constraints())
+        self.assertEqual(Task.objects.get(pk=task.pk).title, 'keep')
+        self.migrate(self.latest)
+        self.assertEqual(_relkind(), 'p')
+        self.assertEqual(_partition_of(task), 'tasks_archived')
+        # The id sequence carries over, so new ids do not collide.
+        self.assertGreater(Task.objects.create(user=self.user, title='new').pk, task.pk)
+
+
+@unittest.skipUnless(connection.vendor == 'postgresql', 'partitioning is PostgreSQL only')
+class PartitionRoutingTests(TestCase):
+
+    def setUp(self):
+        self.user = get_user_model().objects.create(username='alice', email='alice@example.com')
+
+    def test_rows_follow_their_status(self):
+        task = Task.objects.create(user=self.user, title='t')
+        self.assertEqual(_partition_of(task), 'tasks_active')
+        task.status = Task.ARCHIVED
+        task.save()
+        self.assertEqual(_partition_of(task), 'tasks_archived')
+        task.status = 'done'
+        task.save()
+        self.assertEqual(_partition_of(task), 'tasks_active')
+
+    def test_external_ids_are_unique_across_partitions(self):
+        Task.objects.create(user=self.user, title='old', status=Task.ARCHIVED, external_id='a')
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            Task.objects.create(user=self.user, title='new', external_id='a')
+        task = Task.objects.create(user=self.user, title='other', external_id='b')
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            Task.objects.filter(pk=task.pk).update(external_id='a')
+        # Moving a row between partitions does not clash with itself.
+        task.status = Task.ARCHIVED
+        task.save()
+        self.assertFalse(_constraints()[INDEX]['unique'])
+
+    def test_status_queries_prune_partitions(self):
+        self.assertNotIn('tasks_archived', Task.objects.active().filter(user=self.user).explain())
+        self.assertNotIn('tasks_active', Task.objects.archived().filter(user=self.user).explain())
@@ -0,0 +1,81 @@
+"""Per-user task response cache with ETags."""
+
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from apps.tasks import response_cache
+from apps.tasks.models import Task
+
+CACHES = {
+    'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'},
+    'task_responses': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'test-task-responses',
+    },
+    'replica_pins': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'test-pins'},
+}
+
+
+@override_settings(TASK_RESPONSE_CACHE=True, CACHES=CACHES)
+class ResponseCacheTests(TestCase):
+
+    def setUp(self):
+        response_cache.get_cache().clear()
+        self.user = get_user_model().objects.create(username='alice', email='alice@example.com')
+        self.task = Task.objects.create(user=self.user, title='buy milk')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.url = reverse('tasks:task-list')
+
+    def test_repeated_reads_are_served_from_the_cache(self):
+        first = self.client.get(self.url)
+        with self.assertNumQueries(0):
+            second = self.client.get(self.url)
+        self.assertEqual(second.data, first.data)
+        self.assertEqual(second['ETag'], first['ETag'])
+
+    def test_matching_etag_gets_not_modified(self):
+        etag = self.client.get(self.url)['ETag']
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response['ETag'], etag)
+        self.assertFalse(response.content)
+
+    def test_stale_etag_gets_the_full_response(self):
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH='"stale"')
+        self.assertEqual(response.status_code, 200)
+
+    def test_committed_write_invalidates_every_cached_page(self):
+        detail_url = reverse('tasks:task-detail', args=[self.task.pk])
+        etag = self.client.get(self.url)['ETag']
+        self.client.get(detail_url)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.patch(detail_url, {'title': 'buy bread'}, format='json')
+
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['results'][0]['title'], 'buy bread')
+        self.assertEqual(self.client.get(detail_url).data['title'], 'buy bread')
+
+    def test_users_do_not_share_entries(self):
+        self.client.get(self.url)
+        other = get_user_model().objects.create(username='bob', email='bob@example.com')
+        self.client.force_authenticate(other)
+        self.assertEqual(self.client.get(self.url).data['results'], [])
+
+    def test_entries_expire_when_a_task_turns_overdue(self):
+        due_date = timezone.now() + timedelta(seconds=30)
+        data = {'results': [
+            {'status': 'pending', 'due_date': due_date.isoformat()},
+            {'status': 'done', 'due_date': (due_date - timedelta(seconds=20)).isoformat()},
+        ]}
+        self.assertEqual(response_cache._next_overdue_at(data, timezone.now()), due_date)
+
+    @override_settings(TASK_RESPONSE_CACHE=False)
+    def test_disabled_cache_sends_no_etag(self):
+        self.assertNotIn('ETag', self.client.get(self.url))
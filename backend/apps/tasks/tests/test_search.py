@@ -0,0 +1,40 @@
+"""Task search backends."""
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+
+from apps.tasks.models import Task
+from apps.tasks.search import InvertedIndexSearchBackend, _id_set
+
+
+class InvertedIndexSearchTests(TestCase):
+
+    def setUp(self):
+        self.backend = InvertedIndexSearchBackend()
+        self.user = get_user_model().objects.create(username='alice', email='alice@example.com')
+        self.title_hit = Task.objects.create(user=self.user, title='buy milk')
+        self.description_hit = Task.objects.create(
+            user=self.user, title='errands', description='milk and bread'
+        )
+        Task.objects.create(user=self.user, title='call mom')
+
+    def search(self, value):
+        return self.backend.search(Task.objects.all(), value, self.user)
+
+    def test_title_hits_rank_first(self):
+        results = self.search('milk').order_by('-search_rank')
+        self.assertEqual(list(results), [self.title_hit, self.description_hit])
+
+    def test_no_match_returns_nothing(self):
+        self.assertFalse(self.search('cheese').exists())
+
+    def test_index_follows_committed_writes(self):
+        self.search('milk')
+        with self.captureOnCommitCallbacks(execute=True):
+            task = Task.objects.create(user=self.user, title='milk again')
+            self.backend.index_task(task)
+            self.assertNotIn(task, self.search('milk'))
+        self.assertIn(task, self.search('milk'))
+
+    def test_other_backends_get_a_plain_id_list(self):
+        self.assertEqual(_id_set([1, 2], 'postgresql'), [1, 2])
@@ -0,0 +1,57 @@
+"""The values_list() fast path for task list pages."""
+
+from datetime import timedelta
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.exceptions import ImproperlyConfigured
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from apps.tasks.models import Task
+from apps.tasks.serializers import TaskListRenderer, TaskListSerializer
+
+
+class TaskListRendererTests(TestCase):
+
+    def setUp(self):
+        self.user = get_user_model().objects.create(username='alice', email='alice@example.com')
+        now = timezone.now()
+        Task.objects.create(user=self.user, title='no due date')
+        Task.objects.create(user=self.user, title='overdue', due_date=now - timedelta(days=1))
+        Task.objects.create(user=self.user, title='done late', status='done', due_date=now - timedelta(days=1))
+        Task.objects.create(user=self.user, title='upcoming', status='in_progress', due_date=now + timedelta(days=1))
+        Task.objects.create(user=self.user, title='whole second', due_date=now.replace(microsecond=0))
+
+    def assertMatchesSerializer(self):
+        queryset = Task.objects.order_by('id')
+        rows = queryset.values_list(*TaskListRenderer.columns)
+        with mock.patch('django.utils.timezone.now', return_value=timezone.now()):
+            expected = TaskListSerializer(queryset, many=True).data
+            self.assertEqual(TaskListRenderer().render(rows), [dict(item) for item in expected])
+
+    def test_output_matches_the_serializer(self):
+        self.assertMatchesSerializer()
+
+    @override_settings(TIME_ZONE='Asia/Kolkata')
+    def test_output_matches_the_serializer_in_another_timezone(self):
+        self.assertMatchesSerializer()
+
+    @override_settings(REST_FRAMEWORK={'DATETIME_FORMAT': '%Y-%m-%d %H:%M'})
+    def test_output_matches_the_serializer_with_a_custom_format(self):
+        self.assertMatchesSerializer()
+
+    def test_list_endpoint_serves_the_same_items(self):
+        client = APIClient()
+        client.force_authenticate(self.user)
+        response = client.get(reverse('tasks:task-list'), {'ordering': 'title'})
+        expected = TaskListSerializer(Task.objects.order_by('title'), many=True).data
+        self.assertEqual(response.json()['results'], [dict(item) for item in expected])
+
+    def test_refuses_to_build_when_the_serializer_gains_fields(self):
+        fields = [*TaskListSerializer.Meta.fields, 'description']
+        with mock.patch.object(TaskListSerializer.Meta, 'fields', fields):
+            with self.assertRaises(ImproperlyConfigured):
+                TaskListRenderer()
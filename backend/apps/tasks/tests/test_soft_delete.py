@@ -0,0 +1,135 @@
+"""Soft deletes, tombstone purging and hard deletes."""
+
+from datetime import timedelta
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import connection
+from django.db.models.signals import post_delete
+from django.test.utils import CaptureQueriesContext
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from apps.tasks import bulk, signals
+from apps.tasks.models import Task
+
+
+class SoftDeleteTests(TestCase):
+
+    def setUp(self):
+        self.user = get_user_model().objects.create(username='alice', email='alice@example.com')
+        self.tasks = [Task.objects.create(user=self.user, title=f'task {n}') for n in range(3)]
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_soft_delete_leaves_tombstones(self):
+        ids = [task.pk for task in self.tasks[:2]]
+        result = bulk.delete_tasks(self.user, ids, soft=True)
+        self.assertEqual((result['deleted_count'], result['soft']), (2, True))
+        self.assertEqual(list(Task.objects.values_list('pk', flat=True)), [self.tasks[2].pk])
+        self.assertEqual(Task.all_objects.filter(pk__in=ids, deleted_at__isnull=False).count(), 2)
+
+    def test_soft_deleted_tasks_cannot_be_deleted_again(self):
+        bulk.delete_tasks(self.user, [self.tasks[0].pk], soft=True)
+        result = bulk.delete_tasks(self.user, [self.tasks[0].pk], soft=True)
+        self.assertEqual(result['deleted_count'], 0)
+
+    def test_hard_delete_removes_rows(self):
+        result = bulk.delete_tasks(self.user, [task.pk for task in self.tasks], soft=False)
+        self.assertEqual(result['deleted_count'], 3)
+        self.assertFalse(Task.all_objects.exists())
+
+    def test_delete_is_limited_to_the_owner(self):
+        other = get_user_model().objects.create(username='bob', email='bob@example.com')
+        result = bulk.delete_tasks(other, [self.tasks[0].pk], soft=False)
+        self.assertEqual(result['deleted_count'], 0)
+        self.assertTrue(Task.objects.filter(pk=self.tasks[0].pk).exists())
+
+    @override_settings(TASK_SOFT_DELETE=True)
+    def test_api_delete_hides_task(self):
+        task = self.tasks[0]
+        response = self.client.delete(reverse('tasks:task-detail', args=[task.pk]))
+        self.assertEqual(response.status_code, 204)
+        self.assertEqual(self.client.get(reverse('tasks:task-detail', args=[task.pk])).status_code, 404)
+        self.assertTrue(Task.all_objects.filter(pk=task.pk).exists())
+
+    @override_settings(TASK_SOFT_DELETE=True)
+    def test_api_bulk_delete(self):
+        response = self.client.delete(
+            reverse('tasks:task-bulk-delete'), {'task_ids': [self.tasks[0].pk]}, format='json',
+        )
+        self.assertEqual(response.data['deleted_count'], 1)
+        self.assertEqual(Task.objects.count(), 2)
+
+
+class PurgeDeletedTests(TestCase):
+
+    def setUp(self):
+        user = get_user_model().objects.create(username='alice', email='alice@example.com')
+        tasks = [Task.objects.create(user=user, title=f'task {n}') for n in range(5)]
+        self.alive = tasks[0]
+        now = timezone.now()
+        Task.all_objects.filter(pk__in=[task.pk for task in tasks[1:3]]).update(
+            deleted_at=now - timedelta(days=2),
+        )
+        Task.all_objects.filter(pk__in=[task.pk for task in tasks[3:]]).update(deleted_at=now)
+
+    def test_purge_removes_only_tombstones(self):
+        self.assertEqual(bulk.purge_deleted(), 4)
+        self.assertEqual(list(Task.all_objects.values_list('pk', flat=True)), [self.alive.pk])
+
+    def test_purge_older_than(self):
+        self.assertEqual(bulk.purge_deleted(older_than=timedelta(days=1)), 2)
+        self.assertEqual(Task.all_objects.count(), 3)
+
+    @override_settings(TASK_BULK_BATCH_SIZE=1)
+    def test_purge_limit_and_batches(self):
+        self.assertEqual(bulk.purge_deleted(limit=3), 3)
+        self.assertEqual(Task.all_objects.count(), 2)
+
+    def test_purge_skips_task_bookkeeping(self):
+        with mock.patch('apps.tasks.signals.response_cache.invalidate') as invalidate:
+            bulk.purge_deleted()
+        invalidate.assert_not_called()
+
+    def test_command(self):
+        call_command('purge_deleted_tasks', '--older-than', '86400', stdout=mock.Mock())
+        self.assertEqual(Task.all_objects.count(), 3)
+
+
+class RawDeleteTests(TestCase):
+
+    def setUp(self):
+        self.user = get_user_model().objects.create(username='alice', email='alice@example.com')
+        self.ids = [Task.objects.create(user=self.user, title=f'task {n}').pk for n in range(3)]
+
+    def test_tasks_are_deleted_without_loading_rows(self):
+        # Also guards the private Django APIs can_raw_delete relies on.
+        self.assertTrue(bulk.can_raw_delete())
+        with CaptureQueriesContext(connection) as queries:
+            bulk.delete_tasks(self.user, self.ids, soft=False)
+        self.assertFalse([q for q in queries if 'description' in q['sql']])
+        self.assertFalse(Task.all_objects.exists())
+
+    def test_foreign_receivers_get_the_collector(self):
+        deleted = []
+
+        def receiver(sender, instance, **kwargs):
+            deleted.append(instance.pk)
+
+        post_delete.connect(receiver, sender=Task)
+        try:
+            self.assertFalse(bulk.can_raw_delete())
+            bulk.delete_tasks(self.user, self.ids, soft=False)
+        finally:
+            post_delete.disconnect(receiver, sender=Task)
+        self.assertEqual(sorted(deleted), sorted(self.ids))
+
+    def test_suspended_receivers_skip_the_search_index(self):
+        with mock.patch('apps.tasks.signals.get_search_backend') as backend, signals.suspended():
+            Task.objects.filter(pk__in=self.ids).delete()
+            Task.objects.create(user=self.user, title='new')
+        backend.assert_not_called()
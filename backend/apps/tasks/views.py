@@ -1,40 +1,79 @@
 """Views for task management."""
 
+from asgiref.sync import sync_to_async
 from rest_framework import viewsets, permissions, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from django_filters.rest_framework import DjangoFilterBackend
-from rest_framework.filters import OrderingFilter, SearchFilter
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.http import Http404
+from todo_project.db.replicas import read_from_replica
+from todo_project.renderers import streaming_response
+from todo_project.viewsets import AsyncActionsMixin
 
+from . import bulk, counters, export
 from .models import Task
 from .serializers import (
     TaskSerializer,
     TaskListSerializer,
     TaskCreateSerializer,
     TaskUpdateSerializer,
-    TaskStatusUpdateSerializer
+    TaskStatusUpdateSerializer,
+    TaskListRenderer,
 )
-from .filters import TaskFilter
+from .filters import TaskFilter, TaskOrderingFilter
+from .pagination import TaskPagination
+from .response_cache import cache_response, invalidate as invalidate_responses
 
 
-class TaskViewSet(viewsets.ModelViewSet):
+class TaskViewSet(AsyncActionsMixin, viewsets.ModelViewSet):
     """
     ViewSet for managing tasks.
     
     Provides full CRUD functionality for tasks with filtering,
-    search, and pagination capabilities.
+    search, and pagination capabilities. The list supports an opt-in
+    keyset mode via ``?cursor=`` (see ``TaskPagination``). Under ASGI the
+    read actions are served by their async ``a*`` counterparts. The
+    ``replica_actions`` read from a database replica when one is set up.
     """
     
+    async_actions = ['list', 'retrieve', 'stats']
+    replica_actions = ['list', 'retrieve', 'stats', 'export']
     permission_classes = [permissions.IsAuthenticated]
-    filter_backends = [DjangoFilterBackend, SearchFilter, OrderingFilter]
+    pagination_class = TaskPagination
+    filter_backends = [DjangoFilterBackend, TaskOrderingFilter]
     filterset_class = TaskFilter
-    search_fields = ['title', 'description']
     ordering_fields = ['created_at', 'updated_at', 'due_date', 'title']
     ordering = ['-created_at']
 
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        # After authentication, which keeps reading the primary.
+        if self.action in self.replica_actions:
+            read_from_replica(request.user)
+
+    # Task columns for the actions that load instances, and the owner's
+    # columns read by TaskSerializer's StringRelatedField (User.__str__),
+    # so the owner comes with the task instead of in a query of its own.
+    instance_fields = [
+        field.name for field in Task._meta.concrete_fields if field.name != 'search_vector'
+    ]
+    owner_fields = ['user__username', 'user__email']
+
     def get_queryset(self):
-        """Return tasks for the current user only."""
-        return Task.objects.filter(user=self.request.user)
+        """Return tasks for the current user only, loading what the action needs."""
+        queryset = Task.objects.filter(user=self.request.user)
+        if self.action == 'list':
+            # Just the TaskListSerializer columns, so that the covering
+            # index can answer list pages without visiting the table.
+            return queryset.only(
+                'id', 'title', 'status', 'due_date', 'created_at', 'updated_at'
+            )
+        if self.action in ('stats', 'export'):
+            # Aggregates and values() rows; no instances are built.
+            return queryset
+        return queryset.select_related('user').only(*self.instance_fields, *self.owner_fields)
 
     def get_serializer_class(self):
         """Return appropriate serializer based on action."""
@@ -48,6 +87,63 @@ class TaskViewSet(viewsets.ModelViewSet):
             return TaskStatusUpdateSerializer
         return TaskSerializer
 
+    list_renderer = TaskListRenderer()
+
+    @cache_response
+    def list(self, request, *args, **kwargs):
+        """
+        List tasks, served from the response cache when enabled.
+
+        Rows are fetched as tuples and rendered by ``TaskListRenderer``,
+        which matches ``TaskListSerializer`` output without building model
+        instances.
+        """
+        queryset = self.filter_queryset(self.get_queryset())
+        rows = queryset.values_list(*self.list_renderer.columns)
+
+        page = self.paginate_queryset(rows)
+        if page is not None:
+            return self.get_paginated_response(self.list_renderer.render(page))
+        return Response(self.list_renderer.render(rows))
+
+    @cache_response
+    async def alist(self, request, *args, **kwargs):
+        """Async counterpart of ``list``."""
+        # The search backend may load its index, so filter in a thread.
+        queryset = await sync_to_async(self.filter_queryset)(self.get_queryset())
+        rows = queryset.values_list(*self.list_renderer.columns)
+
+        if self.paginator is not None:
+            page = await self.paginator.apaginate_queryset(rows, request, view=self)
+            if page is not None:
+                return self.get_paginated_response(self.list_renderer.render(page))
+        return Response(self.list_renderer.render([row async for row in rows]))
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        """Stream large list pages instead of rendering them in one piece."""
+        response = super().finalize_response(request, response, *args, **kwargs)
+        if self.action == 'list':
+            response = streaming_response(response)
+        return response
+
+    @cache_response
+    def retrieve(self, request, *args, **kwargs):
+        """Retrieve a task, served from the response cache when enabled."""
+        return super().retrieve(request, *args, **kwargs)
+
+    @cache_response
+    async def aretrieve(self, request, *args, **kwargs):
+        """Async counterpart of ``retrieve``."""
+        queryset = await sync_to_async(self.filter_queryset)(self.get_queryset())
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        try:
+            # get_queryset() joins the owner, which must not load lazily here.
+            instance = await queryset.aget(**{self.lookup_field: self.kwargs[lookup_url_kwarg]})
+        except (Task.DoesNotExist, TypeError, ValueError, ValidationError):
+            raise Http404
+        self.check_object_permissions(request, instance)
+        return Response(self.get_serializer(instance).data)
+
     def create(self, request, *args, **kwargs):
         """Create a new task."""
         serializer = self.get_serializer(data=request.data)
@@ -73,6 +169,13 @@ class TaskViewSet(viewsets.ModelViewSet):
         response_serializer = TaskSerializer(task)
         return Response(response_serializer.data)
 
+    def perform_destroy(self, instance):
+        """Delete a task, leaving a tombstone when soft deletes are enabled."""
+        if bulk.soft_delete_enabled():
+            bulk.delete_tasks(self.request.user, [instance.pk], soft=True)
+        else:
+            instance.delete()
+
     @action(detail=True, methods=['patch'])
     def update_status(self, request, pk=None):
         """Update only the status of a task."""
@@ -85,35 +188,108 @@ class TaskViewSet(viewsets.ModelViewSet):
         return Response(response_serializer.data)
 
     @action(detail=False, methods=['get'])
+    @cache_response
     def stats(self, request):
         """Get task statistics for the current user."""
-        queryset = self.get_queryset()
-        
-        total_tasks = queryset.count()
-        pending_tasks = queryset.filter(status='pending').count()
-        done_tasks = queryset.filter(status='done').count()
-        archived_tasks = queryset.filter(status='archived').count()
-        
-        # Count overdue tasks
-        from django.utils import timezone
-        now = timezone.now()
-        overdue_tasks = queryset.filter(
-            due_date__lt=now,
-            status__in=['pending', 'archived']
-        ).count()
+        if counters.counters_enabled():
+            stats = counters.get_stats(request.user)
+        else:
+            stats = counters.aggregate_stats(self.get_queryset())
+
+        # The overdue count changes once the next outstanding due date passes.
+        self.response_expires_at = stats['next_due']
+        return Response({
+            'total': stats['total'],
+            'pending': stats['pending'],
+            'done': stats['done'],
+            'archived': stats['archived'],
+            'overdue': stats['overdue'],
+        })
+
+    @cache_response
+    async def astats(self, request):
+        """Async counterpart of ``stats``."""
+        if counters.counters_enabled():
+            # The counter cache rebuilds itself inside a transaction.
+            stats = await sync_to_async(counters.get_stats)(request.user)
+        else:
+            stats = await counters.aaggregate_stats(self.get_queryset())
 
+        self.response_expires_at = stats['next_due']
         return Response({
-            'total': total_tasks,
-            'pending': pending_tasks,
-            'done': done_tasks,
-            'archived': archived_tasks,
-            'overdue': overdue_tasks,
+            'total': stats['total'],
+            'pending': stats['pending'],
+            'done': stats['done'],
+            'archived': stats['archived'],
+            'overdue': stats['overdue'],
         })
 
+    @action(detail=False, methods=['get'])
+    def export(self, request):
+        """
+        Stream every matching task as NDJSON or CSV.
+
+        Honours the same filters and ordering as the list, without
+        pagination. The format is chosen with ``?export_format=ndjson|csv``.
+        """
+        export_format = request.query_params.get('export_format', 'ndjson')
+        if export_format not in export.CONTENT_TYPES:
+            return Response(
+                {'error': 'export_format must be one of: ' + ', '.join(export.CONTENT_TYPES)},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        queryset = self.filter_queryset(self.get_queryset())
+        # The rows are read while streaming, after the request's routing
+        # state is gone, so bind the database chosen for this request.
+        return export.export_response(queryset.using(queryset.db), export_format, request)
+
+    @action(detail=False, methods=['post'])
+    def bulk_create(self, request):
+        """
+        Create many tasks in one request.
+
+        Expects ``{"tasks": [...], "mode": "create" | "upsert"}``. Invalid
+        items are reported by index in ``errors`` and do not stop the rest
+        of the batch from being written.
+        """
+        tasks = request.data.get('tasks') if isinstance(request.data, dict) else None
+        mode = request.data.get('mode', 'create') if isinstance(request.data, dict) else None
+        max_items = getattr(settings, 'TASK_BULK_MAX_ITEMS', 50000)
+
+        if not isinstance(tasks, list) or not tasks:
+            return Response(
+                {'error': 'tasks must be a non-empty list'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if len(tasks) > max_items:
+            return Response(
+                {'error': f'At most {max_items} tasks can be sent at once'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if mode not in ('create', 'upsert'):
+            return Response(
+                {'error': 'mode must be create or upsert'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        result = bulk.create_tasks(
+            request.user, tasks,
+            upsert=mode == 'upsert',
+            context=self.get_serializer_context(),
+        )
+        if not result['results']:
+            response_status = status.HTTP_400_BAD_REQUEST
+        elif result['created']:
+            response_status = status.HTTP_201_CREATED
+        else:
+            response_status = status.HTTP_200_OK
+        return Response(result, status=response_status)
+
     @action(detail=False, methods=['post'])
     def bulk_update_status(self, request):
         """Bulk update status for multiple tasks."""
-        task_ids = request.data.get('task_ids', [])
+        task_ids = bulk.clean_ids(request.data.get('task_ids', []))
         new_status = request.data.get('status')
         
         if not task_ids or not new_status:
@@ -128,20 +304,70 @@ class TaskViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_400_BAD_REQUEST
             )
         
-        # Update tasks for current user only
-        updated_count = self.get_queryset().filter(
-            id__in=task_ids
-        ).update(status=new_status)
+        # Update tasks for current user only, in bounded chunks
+        result = bulk.update_tasks(request.user, task_ids, {'status': new_status})
         
         return Response({
-            'message': f'Updated {updated_count} tasks',
-            'updated_count': updated_count
+            'message': f'Updated {result["updated_count"]} tasks',
+            **result
         })
 
+    @action(detail=False, methods=['patch'])
+    def bulk_patch(self, request):
+        """
+        Update several fields of many tasks at once.
+
+        Accepts either ``{"task_ids": [...], "values": {...}}`` to set the
+        same values on every task, or ``{"tasks": [{"id": ..., ...}]}`` for
+        per-task values. Invalid items are reported by index in ``errors``.
+        """
+        data = request.data if isinstance(request.data, dict) else {}
+        max_items = getattr(settings, 'TASK_BULK_MAX_ITEMS', 50000)
+
+        if 'tasks' in data:
+            tasks = data['tasks']
+            if not isinstance(tasks, list) or not tasks:
+                return Response(
+                    {'error': 'tasks must be a non-empty list'},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            if len(tasks) > max_items:
+                return Response(
+                    {'error': f'At most {max_items} tasks can be sent at once'},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            result = bulk.patch_tasks(
+                request.user, tasks, context=self.get_serializer_context()
+            )
+            return Response(result)
+
+        task_ids = bulk.clean_ids(data.get('task_ids'))
+        values = data.get('values')
+        if not task_ids or not isinstance(values, dict) or not values:
+            return Response(
+                {'error': 'tasks, or task_ids and values, are required'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if len(task_ids) > max_items:
+            return Response(
+                {'error': f'At most {max_items} tasks can be sent at once'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        serializer = TaskUpdateSerializer(
+            data=values, partial=True, context=self.get_serializer_context()
+        )
+        serializer.is_valid(raise_exception=True)
+        if not serializer.validated_data:
+            return Response(
+                {'error': f'values must contain one of: {", ".join(bulk.PATCH_FIELDS)}'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        return Response(bulk.update_tasks(request.user, task_ids, serializer.validated_data))
+
     @action(detail=False, methods=['delete'])
     def bulk_delete(self, request):
         """Bulk delete multiple tasks."""
-        task_ids = request.data.get('task_ids', [])
+        task_ids = bulk.clean_ids(request.data.get('task_ids', []))
         
         if not task_ids:
             return Response(
@@ -149,12 +375,10 @@ class TaskViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_400_BAD_REQUEST
             )
         
-        # Delete tasks for current user only
-        deleted_count, _ = self.get_queryset().filter(
-            id__in=task_ids
-        ).delete()
+        # Delete tasks for current user only, in bounded chunks
+        result = bulk.delete_tasks(request.user, task_ids)
         
         return Response({
-            'message': f'Deleted {deleted_count} tasks',
-            'deleted_count': deleted_count
-        }) 
\ No newline at end of file
+            'message': f'Deleted {result["deleted_count"]} tasks',
+            **result
+        })
@@ -0,0 +1,127 @@
+"""Authentication classes for the todo application."""
+
+import threading
+import time
+
+from django.conf import settings
+from django.db import router
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.utils import get_md5_hash_password
+
+from .models import User
+
+
+class UserStateCache:
+    """
+    Short-lived, per-process cache of ``(is_active, password hash)`` by user id.
+
+    Entries expire after ``AUTH_USER_STATE_TTL`` seconds, which bounds how
+    long another process keeps accepting a user deactivated elsewhere.
+    Saves and deletes in this process drop the entry immediately.
+    """
+
+    max_entries = 10000
+
+    def __init__(self):
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def get(self, user_id):
+        """Return the cached state for ``user_id``, loading it if missing or stale."""
+        ttl = getattr(settings, 'AUTH_USER_STATE_TTL', 30)
+        now = time.monotonic()
+        entry = self._entries.get(user_id)
+        if entry is not None and entry[0] > now:
+            return entry[1]
+
+        row = (
+            User.objects.filter(**{api_settings.USER_ID_FIELD: user_id})
+            .values_list('is_active', 'password')
+            .first()
+        )
+        state = None
+        if row is not None:
+            is_active, password = row
+            password_hash = get_md5_hash_password(password) if api_settings.CHECK_REVOKE_TOKEN else None
+            state = (is_active, password_hash)
+
+        if ttl > 0 and state is not None:
+            with self._lock:
+                if len(self._entries) >= self.max_entries:
+                    self._entries = {
+                        key: value for key, value in self._entries.items() if value[0] > now
+                    }
+                    if len(self._entries) >= self.max_entries:
+                        self._entries.clear()
+                self._entries[user_id] = (now + ttl, state)
+        return state
+
+    def invalidate(self, user_id):
+        with self._lock:
+            self._entries.pop(user_id, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+user_states = UserStateCache()
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def _drop_user_state(sender, instance, **kwargs):
+    user_states.invalidate(getattr(instance, api_settings.USER_ID_FIELD))
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """
+    ``JWTAuthentication`` without the per-request ``SELECT`` on ``users``.
+
+    The user is built from the token claims as a ``User`` instance with
+    only its id loaded: it can be used in queries and foreign keys right
+    away, while any other field is fetched from the database on first
+    access. Whether the user still exists and is active is checked against
+    ``UserStateCache``. Views that need the whole row should call
+    ``get_full_user``.
+    """
+
+    def get_user(self, validated_token):
+        id_field = User._meta.get_field(api_settings.USER_ID_FIELD)
+        if not id_field.primary_key:
+            # Only a primary key makes a usable id-only instance.
+            return super().get_user(validated_token)
+
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(_('Token contained no recognizable user identification'))
+
+        state = user_states.get(user_id)
+        if state is None:
+            raise AuthenticationFailed(_('User not found'), code='user_not_found')
+        is_active, password_hash = state
+        if not is_active:
+            raise AuthenticationFailed(_('User is inactive'), code='user_inactive')
+        if api_settings.CHECK_REVOKE_TOKEN and (
+            validated_token.get(api_settings.REVOKE_TOKEN_CLAIM) != password_hash
+        ):
+            raise AuthenticationFailed(
+                _("The user's password has been changed."), code='password_changed'
+            )
+
+        return User.from_db(
+            router.db_for_read(User), [id_field.attname], [id_field.to_python(user_id)]
+        )
+
+
+def get_full_user(user):
+    """Return ``user`` with all fields loaded, querying only if some are deferred."""
+    if not user.get_deferred_fields():
+        return user
+    return type(user)._default_manager.get(pk=user.pk)
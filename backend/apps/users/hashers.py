@@ -0,0 +1,112 @@
+"""Password hashing for the todo application."""
+
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.contrib.auth import hashers
+
+
+class PBKDF2PasswordHasher(hashers.PBKDF2PasswordHasher):
+    """
+    ``PBKDF2PasswordHasher`` with its cost taken from ``PASSWORD_HASH_ITERATIONS``.
+
+    Hashes made with fewer iterations still verify and are re-encoded with
+    the configured count on the next successful login. Stronger hashes are
+    kept, so a lower setting never weakens stored passwords.
+    """
+
+    @property
+    def iterations(self):
+        return getattr(settings, 'PASSWORD_HASH_ITERATIONS', hashers.PBKDF2PasswordHasher.iterations)
+
+    def must_update(self, encoded):
+        decoded = self.decode(encoded)
+        return (
+            decoded['iterations'] < self.iterations
+            or hashers.must_update_salt(decoded['salt'], self.salt_entropy)
+        )
+
+
+class PoolSaturated(Exception):
+    """Raised when too many password checks are already waiting."""
+
+
+def _check(password, encoded):
+    """
+    Return ``(is_correct, must_update)`` for ``password`` against ``encoded``.
+
+    Mirrors ``django.contrib.auth.hashers.check_password`` but reports the
+    rehash instead of saving it, so the caller can do that off the pool.
+    Without ``encoded`` (unknown user) the default hasher is run once so
+    the response time does not reveal whether the user exists.
+    """
+    if encoded is None:
+        hashers.make_password(password)
+        return False, False
+    if not hashers.is_password_usable(encoded):
+        return False, False
+
+    preferred = hashers.get_hasher('default')
+    try:
+        hasher = hashers.identify_hasher(encoded)
+    except ValueError:
+        return False, False
+
+    hasher_changed = hasher.algorithm != preferred.algorithm
+    must_update = hasher_changed or preferred.must_update(encoded)
+    is_correct = hasher.verify(password, encoded)
+    if not is_correct and not hasher_changed and must_update:
+        hasher.harden_runtime(password, encoded)
+    return is_correct, is_correct and must_update
+
+
+class PasswordCheckPool:
+    """
+    Bounded thread pool for password checks.
+
+    ``hashlib`` releases the GIL while hashing, so ``PASSWORD_HASH_WORKERS``
+    threads hash in parallel while the event loop keeps serving requests.
+    At most ``PASSWORD_HASH_QUEUE`` checks may wait for a thread; beyond
+    that ``PoolSaturated`` is raised so a login storm is shed instead of
+    queueing without limit.
+    """
+
+    def __init__(self):
+        self._executor = None
+        self._pending = 0
+        self._lock = threading.Lock()
+
+    @property
+    def workers(self):
+        return getattr(settings, 'PASSWORD_HASH_WORKERS', 1)
+
+    def _submit(self, func, *args):
+        limit = self.workers + getattr(settings, 'PASSWORD_HASH_QUEUE', 64)
+        with self._lock:
+            if self._pending >= limit:
+                raise PoolSaturated()
+            self._pending += 1
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.workers, thread_name_prefix='password-check'
+                )
+            executor = self._executor
+        future = executor.submit(func, *args)
+        future.add_done_callback(self._release)
+        return asyncio.wrap_future(future)
+
+    def _release(self, future):
+        with self._lock:
+            self._pending -= 1
+
+    async def check_password(self, password, encoded):
+        """Return ``(is_correct, must_update)``; ``encoded`` is None for unknown users."""
+        return await self._submit(_check, password, encoded)
+
+    async def make_password(self, password):
+        return await self._submit(hashers.make_password, password)
+
+
+password_checks = PasswordCheckPool()
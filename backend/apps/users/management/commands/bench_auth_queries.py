@@ -0,0 +1,95 @@
+"""Count queries per request with the stock and the cached JWT authentication."""
+
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test import Client
+from rest_framework.views import APIView
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from apps.tasks.models import Task
+from apps.users.authentication import CachedJWTAuthentication, user_states
+from apps.users.models import User
+
+ENDPOINTS = [
+    ('GET', '/api/tasks/'),
+    ('GET', '/api/tasks/{task_id}/'),
+    ('GET', '/api/tasks/stats/'),
+    ('POST', '/api/tasks/'),
+    ('GET', '/api/auth/profile/'),
+]
+
+
+class Command(BaseCommand):
+    """
+    Drive a few authenticated endpoints with each authentication class.
+
+    Every endpoint is requested once to warm up and then ``--repeat``
+    times; the table shows the queries of a warm request and the median
+    latency. Data is created in a transaction that is rolled back.
+    """
+
+    help = 'Compare queries per request for JWTAuthentication and CachedJWTAuthentication.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--repeat', type=int, default=50)
+
+    def handle(self, *args, **options):
+        classes = [JWTAuthentication, CachedJWTAuthentication]
+        original = APIView.authentication_classes
+
+        with transaction.atomic():
+            user = User.objects.create_user(
+                username='bench_auth_queries',
+                email='bench_auth_queries@example.com',
+            )
+            task = Task.objects.create(user=user, title='Benchmark task')
+            token = str(RefreshToken.for_user(user).access_token)
+            client = Client(SERVER_NAME='localhost', HTTP_AUTHORIZATION=f'Bearer {token}')
+
+            self.stdout.write(
+                f'{"endpoint":<28}'
+                + ''.join(f'{cls.__name__ + " q":>28}{"ms":>8}' for cls in classes)
+            )
+            try:
+                for method, path in ENDPOINTS:
+                    path = path.format(task_id=task.pk)
+                    row = f'{method + " " + path:<28}'
+                    for cls in classes:
+                        APIView.authentication_classes = [cls]
+                        user_states.clear()
+                        queries, ms = self._measure(client, method, path, options['repeat'])
+                        row += f'{queries:>28}{ms:>8.2f}'
+                    self.stdout.write(row)
+            finally:
+                APIView.authentication_classes = original
+
+            transaction.set_rollback(True)
+
+    def _measure(self, client, method, path, repeat):
+        def request():
+            if method == 'POST':
+                response = client.post(path, {'title': 'Created'}, content_type='application/json')
+            else:
+                response = client.get(path)
+            if response.status_code >= 400:
+                raise CommandError(f'{method} {path} returned {response.status_code}')
+
+        def count(execute, sql, params, many, context):
+            executed.append(sql)
+            return execute(sql, params, many, context)
+
+        request()
+        # request_started resets connection.queries, so count with a wrapper.
+        executed = []
+        with connection.execute_wrapper(count):
+            request()
+        timings = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            request()
+            timings.append(time.perf_counter() - started)
+        timings.sort()
+        return len(executed), timings[len(timings) // 2] * 1000
@@ -0,0 +1,128 @@
+"""Load-test the login endpoint and report logins per second per core."""
+
+import asyncio
+import json
+import os
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.test import AsyncClient, override_settings
+
+from apps.users.models import User
+
+USERNAME = 'bench_login'
+PASSWORD = 'bench-login-Password-1'
+
+
+class Command(BaseCommand):
+    """
+    Fire ``--requests`` logins with ``--concurrency`` in flight.
+
+    By default the requests go through ``AsyncClient`` in this process, so
+    the numbers show the async view and the password pool on their own.
+    With ``--url`` they go over HTTP to a running server instead. A
+    throwaway user is created for the run and deleted afterwards.
+    """
+
+    help = 'Measure login throughput (logins/s and logins/s per core).'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=200)
+        parser.add_argument('--concurrency', type=int, default=16)
+        parser.add_argument(
+            '--url', default=None,
+            help='Base URL of a running server, e.g. http://localhost:8000.',
+        )
+        parser.add_argument(
+            '--cores', type=int, default=None,
+            help='Cores to divide by (defaults to the CPUs available to this process).',
+        )
+
+    def handle(self, *args, **options):
+        cores = options['cores'] or _available_cores()
+        User.objects.filter(username=USERNAME).delete()
+        User.objects.create_user(
+            username=USERNAME, email=f'{USERNAME}@example.com', password=PASSWORD
+        )
+        try:
+            if options['url']:
+                results, elapsed = self._run_http(options)
+            else:
+                # AsyncClient always sends Host: testserver.
+                with override_settings(ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, 'testserver']):
+                    results, elapsed = asyncio.run(self._run_in_process(options))
+        finally:
+            User.objects.filter(username=USERNAME).delete()
+
+        ok = sorted(duration for code, duration in results if code == 200)
+        shed = sum(1 for code, _ in results if code == 503)
+        failed = len(results) - len(ok) - shed
+        if not ok:
+            raise CommandError('No login succeeded.')
+
+        rate = len(ok) / elapsed
+        self.stdout.write(
+            f'iterations={settings.PASSWORD_HASH_ITERATIONS} '
+            f'workers={settings.PASSWORD_HASH_WORKERS} '
+            f'concurrency={options["concurrency"]} cores={cores}'
+        )
+        self.stdout.write(f'{len(ok)} ok, {shed} shed (503), {failed} failed in {elapsed:.2f}s')
+        self.stdout.write(
+            f'p50={_percentile(ok, 50) * 1000:.1f}ms p95={_percentile(ok, 95) * 1000:.1f}ms'
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f'{rate:.1f} logins/s, {rate / cores:.1f} logins/s per core'
+        ))
+
+    async def _run_in_process(self, options):
+        client = AsyncClient()
+        slots = asyncio.Semaphore(options['concurrency'])
+        body = {'username': USERNAME, 'password': PASSWORD}
+
+        async def login():
+            async with slots:
+                started = time.perf_counter()
+                response = await client.post(
+                    '/api/auth/login/', body, content_type='application/json'
+                )
+                return response.status_code, time.perf_counter() - started
+
+        started = time.perf_counter()
+        results = await asyncio.gather(*(login() for _ in range(options['requests'])))
+        return results, time.perf_counter() - started
+
+    def _run_http(self, options):
+        url = options['url'].rstrip('/') + '/api/auth/login/'
+        body = json.dumps({'username': USERNAME, 'password': PASSWORD}).encode()
+
+        def login(_):
+            request = urllib.request.Request(
+                url, data=body, headers={'Content-Type': 'application/json'}
+            )
+            started = time.perf_counter()
+            try:
+                with urllib.request.urlopen(request) as response:
+                    response.read()
+                    code = response.status
+            except urllib.error.HTTPError as exc:
+                code = exc.code
+            return code, time.perf_counter() - started
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=options['concurrency']) as executor:
+            results = list(executor.map(login, range(options['requests'])))
+        return results, time.perf_counter() - started
+
+
+def _available_cores():
+    if hasattr(os, 'sched_getaffinity'):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
+def _percentile(values, percent):
+    return values[min(len(values) - 1, len(values) * percent // 100)]
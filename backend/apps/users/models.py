@@ -25,6 +25,19 @@ class User(AbstractUser):
         verbose_name = 'User'
         verbose_name_plural = 'Users'
 
+    def refresh_from_db(self, using=None, fields=None, **kwargs):
+        """
+        Load all deferred fields together when one of them is first read.
+
+        Users authenticated from a token start with only their id loaded
+        (see ``apps.users.authentication``), so this turns what would be a
+        query per attribute into a single query.
+        """
+        deferred = self.get_deferred_fields()
+        if fields is not None and deferred and set(fields) <= deferred:
+            fields = list(deferred)
+        super().refresh_from_db(using=using, fields=fields, **kwargs)
+
     def __str__(self):
         return f"{self.username} ({self.email})"
 
@@ -1,9 +1,11 @@
 """Serializers for user authentication and management."""
 
 from rest_framework import serializers
-from django.contrib.auth import authenticate
 from django.contrib.auth.password_validation import validate_password
+from rest_framework_simplejwt.serializers import TokenRefreshSerializer as BaseTokenRefreshSerializer
+from rest_framework_simplejwt.settings import api_settings
 from .models import User
+from .tokens import RefreshToken, checked_on_blacklist
 
 
 class UserRegistrationSerializer(serializers.ModelSerializer):
@@ -42,28 +44,16 @@ class UserRegistrationSerializer(serializers.ModelSerializer):
 
 
 class UserLoginSerializer(serializers.Serializer):
-    """Serializer for user login."""
+    """
+    Serializer for user login.
+
+    Only checks the shape of the request; the credentials are verified by
+    ``UserLoginView`` off the request thread.
+    """
     
     username = serializers.CharField()
     password = serializers.CharField(write_only=True)
 
-    def validate(self, attrs):
-        """Validate user credentials."""
-        username = attrs.get('username')
-        password = attrs.get('password')
-
-        if username and password:
-            user = authenticate(username=username, password=password)
-            if not user:
-                raise serializers.ValidationError('Invalid credentials.')
-            if not user.is_active:
-                raise serializers.ValidationError('User account is disabled.')
-            attrs['user'] = user
-        else:
-            raise serializers.ValidationError('Username and password are required.')
-        
-        return attrs
-
 
 class UserProfileSerializer(serializers.ModelSerializer):
     """Serializer for user profile information."""
@@ -107,4 +97,30 @@ class ChangePasswordSerializer(serializers.Serializer):
         user = self.context['request'].user
         user.set_password(self.validated_data['new_password'])
         user.save()
-        return user 
\ No newline at end of file
+        return user 
+
+
+class TokenRefreshSerializer(BaseTokenRefreshSerializer):
+    """
+    Refresh serializer that rotates tokens with a single blacklist write.
+
+    When rotated tokens are blacklisted, the blacklist insert itself
+    rejects a reused token, so the separate blacklist read is skipped.
+    """
+
+    token_class = RefreshToken
+
+    def validate(self, attrs):
+        if not (api_settings.ROTATE_REFRESH_TOKENS and api_settings.BLACKLIST_AFTER_ROTATION):
+            return super().validate(attrs)
+
+        with checked_on_blacklist():
+            refresh = self.token_class(attrs['refresh'])
+        refresh.blacklist_once()
+
+        data = {'access': str(refresh.access_token)}
+        refresh.set_jti()
+        refresh.set_exp()
+        refresh.set_iat()
+        data['refresh'] = str(refresh)
+        return data
@@ -0,0 +1,86 @@
+"""JWT authentication without loading the user row per request."""
+
+import time
+from unittest import mock
+
+from django.conf import settings
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.settings import api_settings
+
+from apps.users.authentication import CachedJWTAuthentication, user_states
+from apps.users.models import User
+from apps.users.tokens import RefreshToken
+
+
+@override_settings(PASSWORD_HASH_ITERATIONS=1000)
+class CachedJWTAuthenticationTests(TestCase):
+
+    def setUp(self):
+        user_states.clear()
+        self.addCleanup(user_states.clear)
+        self.user = User.objects.create_user(username='alice', email='alice@example.com', password='secret-pass-1')
+        self.client = APIClient()
+        self.authorize()
+
+    def authorize(self):
+        token = RefreshToken.for_user(self.user).access_token
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+
+    def user_queries(self, url):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        return response, [query['sql'] for query in queries if 'FROM "users"' in query['sql']]
+
+    def test_task_requests_do_not_load_the_user_row(self):
+        response, queries = self.user_queries(reverse('tasks:task-list'))
+        self.assertEqual(response.status_code, 200)
+        # Only the (is_active, password) state lookup, once per TTL.
+        self.assertEqual(len(queries), 1)
+        self.assertNotIn('"username"', queries[0])
+
+        response, queries = self.user_queries(reverse('tasks:task-list'))
+        self.assertEqual((response.status_code, queries), (200, []))
+
+    def test_deferred_fields_load_in_one_query(self):
+        token = RefreshToken.for_user(self.user).access_token
+        user = CachedJWTAuthentication().get_user(token)
+        self.assertEqual(user.pk, self.user.pk)
+        with self.assertNumQueries(1):
+            self.assertEqual((user.username, user.email, user.is_staff), ('alice', 'alice@example.com', False))
+
+    def test_profile_returns_the_full_user(self):
+        response = self.client.get(reverse('users:profile'))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['username'], 'alice')
+
+    def test_deactivating_a_user_takes_effect_at_once_in_this_process(self):
+        self.assertEqual(self.client.get(reverse('tasks:task-list')).status_code, 200)
+        self.user.is_active = False
+        self.user.save()
+        self.assertEqual(self.client.get(reverse('tasks:task-list')).status_code, 401)
+
+    def test_deleted_user_is_rejected(self):
+        self.client.get(reverse('tasks:task-list'))
+        self.user.delete()
+        self.assertEqual(self.client.get(reverse('tasks:task-list')).status_code, 401)
+
+    def test_changes_made_elsewhere_are_seen_after_the_ttl(self):
+        self.client.get(reverse('tasks:task-list'))
+        # No signal fires for a queryset update, as for another process's write.
+        User.objects.filter(pk=self.user.pk).update(is_active=False)
+        self.assertEqual(self.client.get(reverse('tasks:task-list')).status_code, 200)
+        later = time.monotonic() + settings.AUTH_USER_STATE_TTL + 1
+        with mock.patch('time.monotonic', return_value=later):
+            self.assertEqual(self.client.get(reverse('tasks:task-list')).status_code, 401)
+
+    @mock.patch.object(api_settings, 'CHECK_REVOKE_TOKEN', True)
+    def test_password_change_revokes_tokens_when_enabled(self):
+        self.authorize()
+        self.assertEqual(self.client.get(reverse('tasks:task-list')).status_code, 200)
+        self.user.set_password('another-pass-2')
+        self.user.save()
+        self.assertEqual(self.client.get(reverse('tasks:task-list')).status_code, 401)
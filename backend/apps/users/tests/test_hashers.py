@@ -0,0 +1,29 @@
+"""The configurable PBKDF2 hasher only ever strengthens stored hashes."""
+
+from django.contrib.auth import hashers
+from django.test import SimpleTestCase, override_settings
+
+from apps.users.hashers import PBKDF2PasswordHasher, _check
+
+
+@override_settings(PASSWORD_HASH_ITERATIONS=1000)
+class PBKDF2PasswordHasherTests(SimpleTestCase):
+
+    def encode(self, iterations):
+        hasher = PBKDF2PasswordHasher()
+        return hasher.encode('secret', hasher.salt(), iterations=iterations)
+
+    def test_weaker_hash_is_upgraded(self):
+        self.assertTrue(PBKDF2PasswordHasher().must_update(self.encode(500)))
+        self.assertEqual(_check('secret', self.encode(500)), (True, True))
+
+    def test_current_and_stronger_hashes_are_kept(self):
+        self.assertFalse(PBKDF2PasswordHasher().must_update(self.encode(1000)))
+        self.assertEqual(_check('secret', self.encode(2000)), (True, False))
+
+    def test_new_hashes_use_the_setting(self):
+        encoded = hashers.make_password('secret')
+        self.assertEqual(PBKDF2PasswordHasher().decode(encoded)['iterations'], 1000)
+
+    def test_wrong_password_is_never_rehashed(self):
+        self.assertEqual(_check('wrong', self.encode(500)), (False, False))
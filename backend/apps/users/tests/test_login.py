@@ -0,0 +1,96 @@
+"""The async login view and its bounded password check pool."""
+
+import asyncio
+import threading
+from unittest import mock
+
+from django.contrib.auth import hashers
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+
+from apps.users.hashers import PasswordCheckPool, PBKDF2PasswordHasher, PoolSaturated
+from apps.users.models import User
+
+
+@override_settings(PASSWORD_HASH_ITERATIONS=1000)
+class LoginViewTests(TestCase):
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='alice', email='alice@example.com', password='secret-pass-1')
+
+    def login(self, username='alice', password='secret-pass-1'):
+        return self.client.post(
+            reverse('users:login'), {'username': username, 'password': password},
+            content_type='application/json',
+        )
+
+    def test_valid_credentials_get_tokens(self):
+        response = self.login()
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual(data['user']['username'], 'alice')
+        self.assertTrue(data['access'] and data['refresh'])
+
+    def test_invalid_credentials_are_rejected(self):
+        for username, password in (('alice', 'wrong'), ('nobody', 'secret-pass-1')):
+            with self.subTest(username=username):
+                response = self.login(username, password)
+                self.assertEqual(response.status_code, 400)
+                self.assertEqual(response.json(), {'non_field_errors': ['Invalid credentials.']})
+
+    def test_inactive_users_cannot_log_in(self):
+        User.objects.filter(pk=self.user.pk).update(is_active=False)
+        self.assertEqual(self.login().status_code, 400)
+
+    def test_malformed_bodies_are_rejected(self):
+        response = self.client.post(reverse('users:login'), '{"username":', content_type='application/json')
+        self.assertEqual(response.status_code, 400)
+        response = self.client.post(reverse('users:login'), {'username': 'alice'}, content_type='application/json')
+        self.assertEqual(response.json(), {'password': ['This field is required.']})
+
+    def test_weaker_hash_is_upgraded_on_login(self):
+        hasher = PBKDF2PasswordHasher()
+        User.objects.filter(pk=self.user.pk).update(
+            password=hasher.encode('secret-pass-1', hasher.salt(), iterations=500)
+        )
+        self.assertEqual(self.login().status_code, 200)
+        self.user.refresh_from_db()
+        self.assertEqual(hasher.decode(self.user.password)['iterations'], 1000)
+
+    def test_saturated_pool_answers_503(self):
+        with mock.patch(
+            'apps.users.views.password_checks.check_password', side_effect=PoolSaturated
+        ):
+            response = self.login()
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response['Retry-After'], '1')
+
+    def test_saturated_rehash_still_logs_in(self):
+        hasher = PBKDF2PasswordHasher()
+        weak = hasher.encode('secret-pass-1', hasher.salt(), iterations=500)
+        User.objects.filter(pk=self.user.pk).update(password=weak)
+        with mock.patch('apps.users.views.password_checks.make_password', side_effect=PoolSaturated):
+            self.assertEqual(self.login().status_code, 200)
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.password, weak)
+
+
+@override_settings(PASSWORD_HASH_WORKERS=1, PASSWORD_HASH_QUEUE=1, PASSWORD_HASH_ITERATIONS=1000)
+class PasswordCheckPoolTests(SimpleTestCase):
+
+    async def test_checks_beyond_workers_and_queue_are_shed(self):
+        pool = PasswordCheckPool()
+        release = threading.Event()
+        self.addCleanup(release.set)
+        running = [pool._submit(release.wait), pool._submit(release.wait)]
+        with self.assertRaises(PoolSaturated):
+            await pool.check_password('secret', None)
+        release.set()
+        await asyncio.gather(*running)
+        encoded = await pool.make_password('secret')
+        self.assertEqual(await pool.check_password('secret', encoded), (True, False))
+
+    async def test_unknown_users_still_cost_a_hash(self):
+        with mock.patch.object(hashers, 'make_password', wraps=hashers.make_password) as make_password:
+            self.assertEqual(await PasswordCheckPool().check_password('secret', None), (False, False))
+        make_password.assert_called_once_with('secret')
@@ -0,0 +1,135 @@
+"""Refresh token blacklisting, its cache and compaction."""
+
+import time
+from datetime import timedelta
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient
+from rest_framework_simplejwt import tokens
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+from rest_framework_simplejwt.utils import aware_utcnow
+
+from apps.users.tokens import RefreshToken, blacklist_cache
+
+
+class LogoutTests(TestCase):
+
+    def setUp(self):
+        blacklist_cache.clear()
+        self.addCleanup(blacklist_cache.clear)
+        self.user = get_user_model().objects.create(username='alice', email='alice@example.com')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.refresh = str(RefreshToken.for_user(self.user))
+
+    def logout(self):
+        return self.client.post(reverse('users:logout'), {'refresh': self.refresh}, format='json')
+
+    def test_logout_blacklists_the_refresh_token(self):
+        self.assertEqual(self.logout().status_code, 200)
+        response = self.client.post(reverse('users:token_refresh'), {'refresh': self.refresh}, format='json')
+        self.assertEqual(response.status_code, 401)
+
+    def test_logout_with_a_blacklisted_token_is_rejected(self):
+        self.logout()
+        self.assertEqual(self.logout().status_code, 400)
+
+    def test_logout_rejects_a_token_blacklisted_by_another_process(self):
+        self.assertNotIn('unknown-jti', blacklist_cache)  # warms the cache
+        # Blacklisted afterwards, bypassing this process's cache.
+        tokens.RefreshToken(self.refresh).blacklist()
+        self.assertEqual(self.logout().status_code, 400)
+
+
+class RefreshRotationTests(TestCase):
+
+    def setUp(self):
+        blacklist_cache.clear()
+        self.addCleanup(blacklist_cache.clear)
+        self.user = get_user_model().objects.create(username='alice', email='alice@example.com')
+        self.client = APIClient()
+
+    def refresh(self, token):
+        return self.client.post(reverse('users:token_refresh'), {'refresh': token}, format='json')
+
+    def test_rotation_blacklists_the_used_token(self):
+        token = str(RefreshToken.for_user(self.user))
+        response = self.refresh(token)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response.data['refresh'], token)
+        self.assertEqual(self.refresh(response.data['refresh']).status_code, 200)
+        self.assertEqual(self.refresh(token).status_code, 401)
+
+    def test_reuse_is_caught_by_the_insert_when_the_cache_misses(self):
+        token = str(RefreshToken.for_user(self.user))
+        self.assertEqual(self.refresh(token).status_code, 200)
+        # A warm cache without the entry, as in another worker.
+        self.assertNotIn('unknown-jti', blacklist_cache)
+        blacklist_cache._entries.clear()
+        self.assertEqual(self.refresh(token).status_code, 401)
+
+
+class BlacklistCacheTests(TestCase):
+
+    def setUp(self):
+        blacklist_cache.clear()
+        self.addCleanup(blacklist_cache.clear)
+        self.user = get_user_model().objects.create(username='alice', email='alice@example.com')
+
+    def test_hits_are_answered_without_queries(self):
+        token = RefreshToken.for_user(self.user)
+        token.blacklist()
+        self.assertIn(token['jti'], blacklist_cache)
+        with self.assertNumQueries(0), self.assertRaises(TokenError):
+            RefreshToken(str(token))
+
+    def test_blacklisted_tokens_are_loaded_on_first_use(self):
+        token = RefreshToken.for_user(self.user)
+        tokens.RefreshToken(str(token)).blacklist()
+        with self.assertNumQueries(1):
+            self.assertIn(token['jti'], blacklist_cache)
+        with self.assertNumQueries(0):
+            self.assertIn(token['jti'], blacklist_cache)
+
+    def test_misses_still_consult_the_database(self):
+        token = RefreshToken.for_user(self.user)
+        self.assertNotIn('unknown-jti', blacklist_cache)
+        tokens.RefreshToken(str(token)).blacklist()
+        with self.assertRaises(TokenError):
+            RefreshToken(str(token))
+        self.assertIn(token['jti'], blacklist_cache)
+
+    def test_expired_entries_are_dropped(self):
+        self.assertNotIn('unknown-jti', blacklist_cache)
+        blacklist_cache.add('old', time.time() - 1)
+        self.assertNotIn('old', blacklist_cache)
+        self.assertNotIn('old', blacklist_cache._entries)
+
+    @override_settings(TOKEN_BLACKLIST_CACHE_SIZE=2)
+    def test_oldest_entries_are_evicted_beyond_the_size(self):
+        self.assertNotIn('unknown-jti', blacklist_cache)
+        expires_at = time.time() + 60
+        for jti in ('a', 'b', 'c'):
+            blacklist_cache.add(jti, expires_at)
+        self.assertEqual(list(blacklist_cache._entries), ['b', 'c'])
+
+
+class CompactTokensTests(TestCase):
+
+    def test_only_expired_tokens_are_removed(self):
+        user = get_user_model().objects.create(username='alice', email='alice@example.com')
+        live = RefreshToken.for_user(user)
+        live.blacklist()
+        for _ in range(3):
+            RefreshToken.for_user(user).blacklist()
+        OutstandingToken.objects.exclude(jti=live['jti']).update(expires_at=aware_utcnow() - timedelta(seconds=1))
+
+        call_command('compact_tokens', batch_size=2, stdout=StringIO())
+
+        self.assertEqual(list(OutstandingToken.objects.values_list('jti', flat=True)), [live['jti']])
+        self.assertEqual(BlacklistedToken.objects.get().token.jti, live['jti'])
@@ -0,0 +1,125 @@
+"""JWT token classes for the todo application."""
+
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt import tokens
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken
+from rest_framework_simplejwt.utils import aware_utcnow
+
+_checked_on_blacklist = ContextVar('token_checked_on_blacklist', default=False)
+
+
+@contextmanager
+def checked_on_blacklist():
+    """
+    Skip the blacklist read while building tokens that will be blacklisted.
+
+    Only for callers that go on to call ``RefreshToken.blacklist_once``,
+    whose insert detects a reused token atomically in the database.
+    """
+    token = _checked_on_blacklist.set(True)
+    try:
+        yield
+    finally:
+        _checked_on_blacklist.reset(token)
+
+
+class BlacklistCache:
+    """
+    Per-process set of blacklisted ``jti`` values.
+
+    Entries are dropped once the token itself expires, and the oldest are
+    evicted beyond ``TOKEN_BLACKLIST_CACHE_SIZE``. The set is filled from
+    the database on first use and then by every blacklisting in this
+    process. A hit is authoritative; a miss is not (another process may
+    have blacklisted the token), so misses still consult the database
+    unless the caller blacklists atomically.
+    """
+
+    def __init__(self):
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._warmed = False
+
+    @property
+    def max_entries(self):
+        return getattr(settings, 'TOKEN_BLACKLIST_CACHE_SIZE', 100000)
+
+    def __contains__(self, jti):
+        self._warm()
+        expires_at = self._entries.get(jti)
+        if expires_at is None:
+            return False
+        if expires_at <= time.time():
+            with self._lock:
+                self._entries.pop(jti, None)
+            return False
+        return True
+
+    def add(self, jti, expires_at):
+        """Remember ``jti`` as blacklisted until ``expires_at`` (epoch seconds)."""
+        with self._lock:
+            self._entries[jti] = expires_at
+            self._entries.move_to_end(jti)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._warmed = False
+
+    def _warm(self):
+        if self._warmed:
+            return
+        rows = (
+            BlacklistedToken.objects
+            .filter(token__expires_at__gt=aware_utcnow())
+            .order_by('-token__expires_at')
+            .values_list('token__jti', 'token__expires_at')[:self.max_entries]
+        )
+        entries = [(jti, expires_at.timestamp()) for jti, expires_at in rows]
+        with self._lock:
+            if self._warmed:
+                return
+            for jti, expires_at in reversed(entries):
+                self._entries.setdefault(jti, expires_at)
+            self._warmed = True
+
+
+blacklist_cache = BlacklistCache()
+
+
+class RefreshToken(tokens.RefreshToken):
+    """``RefreshToken`` whose blacklist checks go through ``BlacklistCache``."""
+
+    def check_blacklist(self):
+        jti = self.payload[api_settings.JTI_CLAIM]
+        if jti in blacklist_cache:
+            raise TokenError(_('Token is blacklisted'))
+        if _checked_on_blacklist.get():
+            return
+        try:
+            super().check_blacklist()
+        except TokenError:
+            blacklist_cache.add(jti, self.payload['exp'])
+            raise
+
+    def blacklist(self):
+        result = super().blacklist()
+        blacklist_cache.add(self.payload[api_settings.JTI_CLAIM], self.payload['exp'])
+        return result
+
+    def blacklist_once(self):
+        """Blacklist this token, failing if it already was (i.e. it is being reused)."""
+        created = self.blacklist()[1]
+        if not created:
+            raise TokenError(_('Token is blacklisted'))
@@ -1,7 +1,6 @@
 """URL configuration for users app."""
 
 from django.urls import path
-from rest_framework_simplejwt.views import TokenRefreshView
 
 from . import views
 
@@ -12,7 +11,7 @@ urlpatterns = [
     path('register/', views.UserRegistrationView.as_view(), name='register'),
     path('login/', views.UserLoginView.as_view(), name='login'),
     path('logout/', views.logout_view, name='logout'),
-    path('refresh/', TokenRefreshView.as_view(), name='token_refresh'),
+    path('refresh/', views.UserTokenRefreshView.as_view(), name='token_refresh'),
     
     # User management
     path('profile/', views.UserProfileView.as_view(), name='profile'),
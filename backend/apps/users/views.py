@@ -1,19 +1,36 @@
 """Views for user authentication and management."""
 
+import io
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.http import HttpResponse
+from django.utils.decorators import method_decorator
+from django.views import View
+from django.views.decorators.csrf import csrf_exempt
 from rest_framework import status, generics, permissions
 from rest_framework.decorators import api_view, permission_classes
+from rest_framework.exceptions import ParseError
 from rest_framework.response import Response
-from rest_framework_simplejwt.tokens import RefreshToken
-from rest_framework_simplejwt.views import TokenObtainPairView, TokenRefreshView
+from rest_framework.settings import api_settings
+from rest_framework_simplejwt.views import TokenRefreshView
 from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
 
+from todo_project.db.replicas import pin_to_primary, read_from_replica
+from todo_project.parsers import FastJSONParser
+from todo_project.renderers import FastJSONRenderer
+
+from .authentication import get_full_user
+from .hashers import PoolSaturated, password_checks
 from .models import User
 from .serializers import (
     UserRegistrationSerializer,
     UserLoginSerializer,
     UserProfileSerializer,
-    ChangePasswordSerializer
+    ChangePasswordSerializer,
+    TokenRefreshSerializer
 )
+from .tokens import RefreshToken, checked_on_blacklist
 
 
 class UserRegistrationView(generics.CreateAPIView):
@@ -31,6 +48,8 @@ class UserRegistrationView(generics.CreateAPIView):
         serializer = self.get_serializer(data=request.data)
         serializer.is_valid(raise_exception=True)
         user = serializer.save()
+        # The user is anonymous here, so the middleware cannot pin them.
+        pin_to_primary(user.pk)
         
         # Return user profile data
         profile_serializer = UserProfileSerializer(user)
@@ -43,33 +62,101 @@ class UserRegistrationView(generics.CreateAPIView):
         )
 
 
-class UserLoginView(TokenObtainPairView):
+@method_decorator(csrf_exempt, name='dispatch')
+class UserLoginView(View):
     """
     User login endpoint.
     
-    Authenticates user and returns JWT access and refresh tokens.
+    Authenticates user and returns JWT access and refresh tokens. The view
+    is async: the password check runs on a bounded thread pool while the
+    worker keeps serving other requests, and a full pool answers 503.
+    That only holds under ASGI (``SERVER_INTERFACE=asgi``); gunicorn's
+    gthread workers run the view through ``async_to_sync``, so there the
+    login keeps its worker thread for the whole check.
     """
-    permission_classes = [permissions.AllowAny]
+    http_method_names = ['post', 'options']
 
-    def post(self, request, *args, **kwargs):
+    async def post(self, request, *args, **kwargs):
         # Validate credentials
-        login_serializer = UserLoginSerializer(data=request.data)
-        login_serializer.is_valid(raise_exception=True)
-        user = login_serializer.validated_data['user']
+        try:
+            data = FastJSONParser().parse(
+                io.BytesIO(request.body),
+                parser_context={'encoding': request.encoding or settings.DEFAULT_CHARSET},
+            )
+        except ParseError as exc:
+            return _json_response({'detail': exc.detail}, status.HTTP_400_BAD_REQUEST)
+        login_serializer = UserLoginSerializer(data=data)
+        if not login_serializer.is_valid():
+            return _json_response(login_serializer.errors, status.HTTP_400_BAD_REQUEST)
+
+        try:
+            user = await _authenticate(**login_serializer.validated_data)
+        except PoolSaturated:
+            response = _json_response(
+                {'error': 'Too many logins in progress, please retry'},
+                status.HTTP_503_SERVICE_UNAVAILABLE,
+            )
+            response['Retry-After'] = '1'
+            return response
+        if user is None:
+            return _json_response(
+                {api_settings.NON_FIELD_ERRORS_KEY: ['Invalid credentials.']},
+                status.HTTP_400_BAD_REQUEST,
+            )
 
         # Generate tokens
-        refresh = RefreshToken.for_user(user)
+        refresh = await sync_to_async(RefreshToken.for_user)(user)
         access = refresh.access_token
 
         # Return user profile and tokens
         profile_serializer = UserProfileSerializer(user)
-        return Response({
+        return _json_response({
             'access': str(access),
             'refresh': str(refresh),
             'user': profile_serializer.data
         })
 
 
+async def _authenticate(username, password):
+    """
+    Async counterpart of ``authenticate()`` for ``ModelBackend`` users.
+
+    A hash made with outdated settings is re-encoded and saved, like
+    ``User.check_password`` does.
+    """
+    user = await User._default_manager.filter(**{User.USERNAME_FIELD: username}).afirst()
+    is_correct, must_update = await password_checks.check_password(
+        password, user.password if user is not None else None
+    )
+    if not is_correct or not user.is_active:
+        return None
+
+    if must_update:
+        try:
+            user.password = await password_checks.make_password(password)
+        except PoolSaturated:
+            # The hash still verifies; a later login upgrades it.
+            pass
+        else:
+            await user.asave(update_fields=['password'])
+    return user
+
+
+def _json_response(data, status=status.HTTP_200_OK):
+    return HttpResponse(
+        FastJSONRenderer().render(data), content_type='application/json', status=status
+    )
+
+
+class UserTokenRefreshView(TokenRefreshView):
+    """
+    Token refresh endpoint.
+    
+    Rotates the refresh token and blacklists the one that was used.
+    """
+    serializer_class = TokenRefreshSerializer
+
+
 @api_view(['POST'])
 @permission_classes([permissions.IsAuthenticated])
 def logout_view(request):
@@ -81,8 +168,10 @@ def logout_view(request):
     try:
         refresh_token = request.data.get('refresh')
         if refresh_token:
-            token = RefreshToken(refresh_token)
-            token.blacklist()
+            with checked_on_blacklist():
+                token = RefreshToken(refresh_token)
+            # Fails for a token that was already blacklisted.
+            token.blacklist_once()
         
         return Response({
             'message': 'Successfully logged out'
@@ -103,8 +192,14 @@ class UserProfileView(generics.RetrieveUpdateAPIView):
     serializer_class = UserProfileSerializer
     permission_classes = [permissions.IsAuthenticated]
 
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        if request.method == 'GET':
+            read_from_replica(request.user)
+
     def get_object(self):
-        return self.request.user
+        # Authentication only loads the user id; the profile needs the row.
+        return get_full_user(self.request.user)
 
 
 class ChangePasswordView(generics.UpdateAPIView):
@@ -117,9 +212,10 @@ class ChangePasswordView(generics.UpdateAPIView):
     permission_classes = [permissions.IsAuthenticated]
 
     def get_object(self):
-        return self.request.user
+        return get_full_user(self.request.user)
 
     def update(self, request, *args, **kwargs):
+        request.user = self.get_object()
         serializer = self.get_serializer(data=request.data)
         serializer.is_valid(raise_exception=True)
         serializer.save()
@@ -1,49 +1,19 @@
 #!/bin/bash
 
-# Функция для проверки подключения к базе данных
-wait_for_db() {
-    echo "Waiting for PostgreSQL database..."
-    while ! nc -z $DB_HOST $DB_PORT; do
-        echo "PostgreSQL is unavailable - sleeping"
-        sleep 1
-    done
-    echo "PostgreSQL is up - continuing..."
-}
-
-# Проверка соединения с базой данных
-wait_for_db
-
-# Дополнительная пауза для полной готовности PostgreSQL
-sleep 2
-
 # Создание директорий для логов
 mkdir -p /app/logs
 
-# Проверка и создание миграций
-echo "Making migrations..."
-python manage.py makemigrations users
-python manage.py makemigrations tasks
-
-# Применение миграций
-echo "Applying database migrations..."
-python manage.py migrate
-
-# Сбор статических файлов
-echo "Collecting static files..."
-python manage.py collectstatic --noinput
-
-# Создание суперпользователя если он не существует
-echo "Creating superuser..."
-python manage.py shell << EOF
-from django.contrib.auth import get_user_model
-User = get_user_model()
-
-if not User.objects.filter(username='admin').exists():
-    User.objects.create_superuser('admin', 'admin@example.com', 'admin123')
-    print('Superuser created: admin/admin123')
-else:
-    print('Superuser already exists')
-EOF
+# Ожидание базы данных, миграции, статика и суперпользователь за один запуск Django.
+# Миграции и collectstatic пропускаются, если совпадают с отпечатком сборки;
+# FAST_BOOT=False выполняет их всегда.
+BOOT_ARGS="--create-superuser"
+case "${FAST_BOOT:-True}" in
+    False|false|0)
+        BOOT_ARGS="$BOOT_ARGS --force"
+        ;;
+esac
+echo "Preparing database and static files..."
+python manage.py boot $BOOT_ARGS || exit 1
 
 # Загрузка тестовых данных (опционально)
 echo "Loading fixtures (if any)..."
@@ -54,5 +24,13 @@ else
     echo "No test data found - skipping"
 fi
 
-echo "Starting Django development server..."
-exec python manage.py runserver 0.0.0.0:8000 
\ No newline at end of file
+# Встроенный сервер Django только по флагу DEV_SERVER, иначе gunicorn
+case "${DEV_SERVER:-False}" in
+    True|true|1)
+        echo "Starting Django development server..."
+        exec python manage.py runserver 0.0.0.0:8000
+        ;;
+esac
+
+echo "Starting gunicorn (${SERVER_INTERFACE:-wsgi})..."
+exec gunicorn -c gunicorn.conf.py 
\ No newline at end of file
@@ -0,0 +1,127 @@
+"""
+Gunicorn configuration for todo_project.
+
+Every value can be overridden from the environment. ``SERVER_INTERFACE``
+picks the WSGI application with threaded sync workers (``wsgi``, the
+default) or the ASGI application with uvicorn workers (``asgi``).
+"""
+
+import os
+
+# Not imported as ``config``: gunicorn would read that name as a setting.
+from decouple import config as env
+
+
+def _cpu_count():
+    """CPUs this container may use, honouring affinity and a cgroup quota."""
+    try:
+        cpus = len(os.sched_getaffinity(0))
+    except AttributeError:
+        cpus = os.cpu_count() or 1
+    try:
+        with open('/sys/fs/cgroup/cpu.max') as cpu_max:
+            quota, period = cpu_max.read().split()
+        if quota != 'max':
+            cpus = min(cpus, max(1, int(quota) // int(period)))
+    except (OSError, ValueError):
+        pass
+    return cpus
+
+
+cpus = _cpu_count()
+interface = env('SERVER_INTERFACE', default='wsgi')
+
+bind = env('GUNICORN_BIND', default='0.0.0.0:8000')
+
+if interface == 'asgi':
+    # One event loop per core; concurrency comes from the loop, not threads.
+    wsgi_app = 'todo_project.asgi:application'
+    worker_class = 'uvicorn.workers.UvicornWorker'
+    workers = env('GUNICORN_WORKERS', default=cpus, cast=int)
+    threads = 1
+else:
+    # Threads let a worker keep serving while another request waits on
+    # PostgreSQL; processes give parallelism for the CPU-bound parts.
+    wsgi_app = 'todo_project.wsgi:application'
+    worker_class = 'gthread'
+    workers = env('GUNICORN_WORKERS', default=cpus * 2 + 1, cast=int)
+    threads = env('GUNICORN_THREADS', default=4, cast=int)
+
+# The locmem response cache is per process: workers would serve pages a
+# write in another worker has already invalidated.
+if (
+    workers > 1
+    and env('TASK_RESPONSE_CACHE', default=False, cast=bool)
+    and env('TASK_RESPONSE_CACHE_BACKEND', default='file') == 'locmem'
+):
+    raise RuntimeError(
+        "TASK_RESPONSE_CACHE_BACKEND='locmem' is per process; "
+        "use 'redis' or 'file' with GUNICORN_WORKERS > 1."
+    )
+
+# Import Django once in the master so workers share its memory pages
+# copy-on-write instead of each loading the project.
+preload_app = env('GUNICORN_PRELOAD', default=True, cast=bool)
+
+# Recycle workers to bound slow memory growth; the jitter keeps them from
+# all restarting at the same moment.
+max_requests = env('GUNICORN_MAX_REQUESTS', default=2000, cast=int)
+max_requests_jitter = env('GUNICORN_MAX_REQUESTS_JITTER', default=200, cast=int)
+
+# Keep-alive slightly above a typical proxy's idle timeout avoids races
+# where the proxy reuses a connection the worker has just closed.
+keepalive = env('GUNICORN_KEEPALIVE', default=75, cast=int)
+timeout = env('GUNICORN_TIMEOUT', default=30, cast=int)
+graceful_timeout = env('GUNICORN_GRACEFUL_TIMEOUT', default=30, cast=int)
+
+# Heartbeat files on tmpfs, so a slow container disk cannot stall workers.
+worker_tmp_dir = '/dev/shm' if os.path.isdir('/dev/shm') else None
+
+# Each worker keeps its own request metrics; with sampling on they are
+# written here so /metrics can sum every worker (see todo_project.metrics).
+metrics_dir = ''
+if env('REQUEST_METRICS_SAMPLE_RATE', default=0.0, cast=float) > 0:
+    metrics_dir = env(
+        'REQUEST_METRICS_DIR',
+        default='/dev/shm/todo-metrics' if os.path.isdir('/dev/shm') else '/tmp/todo-metrics',
+    )
+    os.environ['REQUEST_METRICS_DIR'] = metrics_dir
+
+accesslog = env('GUNICORN_ACCESS_LOG', default='-')
+errorlog = '-'
+loglevel = env('GUNICORN_LOG_LEVEL', default='info')
+
+
+def pre_fork(server, worker):
+    """Close connections the preloaded app opened, so no worker inherits one."""
+    if preload_app:
+        from django.db import connections
+
+        from todo_project.db.pool import close_pools
+
+        connections.close_all()
+        close_pools()
+
+
+def on_starting(server):
+    """Drop metrics left behind by a previous run."""
+    if metrics_dir:
+        from todo_project.metrics import reset_directory
+
+        reset_directory(metrics_dir)
+
+
+def worker_exit(server, worker):
+    """Write the exiting worker's last metrics before they are lost."""
+    if metrics_dir:
+        from todo_project.metrics import flush
+
+        flush()
+
+
+def child_exit(server, worker):
+    """Keep the counters of a worker that has exited."""
+    if metrics_dir:
+        from todo_project.metrics import retire_process
+
+        retire_process(metrics_dir, worker.pid)
@@ -0,0 +1,13 @@
+"""
+ASGI config for todo_project project.
+"""
+
+import os
+
+from django.core.asgi import get_asgi_application
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'todo_project.settings')
+# Serve the task read endpoints from their async handlers.
+os.environ.setdefault('ASYNC_VIEWS', 'True')
+
+application = get_asgi_application()
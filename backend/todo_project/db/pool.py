@@ -0,0 +1,210 @@
+"""Per-process database connection pool."""
+
+import bisect
+import logging
+import os
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+# Upper bounds (seconds) of the connection wait time histogram.
+WAIT_BUCKETS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0)
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+class PoolTimeout(Exception):
+    """Raised when no connection became available within the pool timeout."""
+
+
+class ConnectionPool:
+    """
+    Bounded pool of DB-API connections shared by the threads of a process.
+
+    Up to ``size`` connections are kept open between requests; under load
+    up to ``max_overflow`` more are opened and closed again when returned.
+    A caller that finds the pool exhausted waits up to ``timeout`` seconds
+    for a connection. Connections idle for longer than
+    ``health_check_after`` seconds are pinged before they are handed out,
+    and connections older than ``max_lifetime`` are replaced.
+
+    Every checkout records how long it waited, which ``stats()`` exposes
+    as a total, a maximum and a histogram over ``WAIT_BUCKETS``.
+    """
+
+    def __init__(self, ping, size=10, max_overflow=10, timeout=30,
+                 health_check_after=10, max_lifetime=1800):
+        self.ping = ping
+        self.size = size
+        self.max_overflow = max_overflow
+        self.timeout = timeout
+        self.health_check_after = health_check_after
+        self.max_lifetime = max_lifetime
+
+        self._condition = threading.Condition()
+        self._idle = []  # (connection, created_at, returned_at), most recent last
+        self._created = {}  # id(connection) -> created_at, for checked out ones
+        self._open = 0
+        self._pid = os.getpid()
+
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+        self.wait_buckets = [0] * (len(WAIT_BUCKETS) + 1)
+
+    def acquire(self, connect):
+        """Return a connection, opening one with ``connect()`` if the pool may grow."""
+        started = time.monotonic()
+        while True:
+            entry = self._checkout(started)
+            if entry is None:
+                connection, created_at = self._open_connection(connect), time.monotonic()
+                break
+            connection, created_at, returned_at = entry
+            if self._healthy(connection, created_at, returned_at):
+                break
+            self._discard(connection)
+
+        self._checked_out(connection, created_at, time.monotonic() - started)
+        return connection
+
+    def release(self, connection, reusable=True):
+        """Return ``connection``; it is closed instead if unusable or overflow."""
+        with self._condition:
+            if self._pid != os.getpid():
+                # Checked out before a fork; the parent still owns it.
+                return
+            created_at = self._created.pop(id(connection), None)
+            if created_at is None:
+                return
+            if reusable and self._open <= self.size:
+                self._idle.append((connection, created_at, time.monotonic()))
+                self._condition.notify()
+                return
+        self._discard(connection)
+
+    def close(self):
+        """Close every idle connection."""
+        with self._condition:
+            idle, self._idle = self._idle, []
+            self._open -= len(idle)
+        for connection, _, _ in idle:
+            _close_quietly(connection)
+
+    def stats(self):
+        with self._condition:
+            return {
+                'size': self.size,
+                'max_overflow': self.max_overflow,
+                'open': self._open,
+                'idle': len(self._idle),
+                'in_use': self._open - len(self._idle),
+                'checkouts': self.checkouts,
+                'timeouts': self.timeouts,
+                'wait_seconds_total': self.wait_seconds_total,
+                'wait_seconds_max': self.wait_seconds_max,
+                'wait_buckets': dict(zip([*map(str, WAIT_BUCKETS), '+Inf'], self.wait_buckets)),
+            }
+
+    def _checkout(self, started):
+        """Pop an idle connection, or reserve a slot to open one (``None``)."""
+        with self._condition:
+            self._after_fork()
+            while True:
+                if self._idle:
+                    return self._idle.pop()
+                if self._open < self.size + self.max_overflow:
+                    self._open += 1
+                    return None
+                remaining = self.timeout - (time.monotonic() - started)
+                if remaining <= 0:
+                    self.timeouts += 1
+                    raise PoolTimeout(
+                        f'No database connection available within {self.timeout}s '
+                        f'({self._open} open)'
+                    )
+                self._condition.wait(remaining)
+
+    def _open_connection(self, connect):
+        try:
+            return connect()
+        except BaseException:
+            with self._condition:
+                self._open -= 1
+                self._condition.notify()
+            raise
+
+    def _healthy(self, connection, created_at, returned_at):
+        now = time.monotonic()
+        if self.max_lifetime and now - created_at >= self.max_lifetime:
+            return False
+        if now - returned_at < self.health_check_after:
+            return True
+        try:
+            return self.ping(connection)
+        except Exception:
+            return False
+
+    def _discard(self, connection):
+        _close_quietly(connection)
+        with self._condition:
+            self._open -= 1
+            self._condition.notify()
+
+    def _checked_out(self, connection, created_at, waited):
+        with self._condition:
+            self._created[id(connection)] = created_at
+            self.checkouts += 1
+            self.wait_seconds_total += waited
+            self.wait_seconds_max = max(self.wait_seconds_max, waited)
+            self.wait_buckets[bisect.bisect_left(WAIT_BUCKETS, waited)] += 1
+        if waited >= 1:
+            logger.warning('Waited %.2fs for a database connection', waited)
+
+    def _after_fork(self):
+        """Forget connections inherited from the parent process."""
+        if self._pid == os.getpid():
+            return
+        self._pid = os.getpid()
+        self._idle = []
+        self._created = {}
+        self._open = 0
+
+
+def _close_quietly(connection):
+    try:
+        connection.close()
+    except Exception:
+        pass
+
+
+def get_pool(alias, options, ping):
+    """Return the pool for database ``alias``, creating it on first use."""
+    pool = _pools.get(alias)
+    if pool is None:
+        with _pools_lock:
+            pool = _pools.get(alias)
+            if pool is None:
+                pool = _pools[alias] = ConnectionPool(
+                    ping,
+                    size=options.get('SIZE', 10),
+                    max_overflow=options.get('MAX_OVERFLOW', 10),
+                    timeout=options.get('TIMEOUT', 30),
+                    health_check_after=options.get('HEALTH_CHECK_AFTER', 10),
+                    max_lifetime=options.get('MAX_LIFETIME', 1800),
+                )
+    return pool
+
+
+def pool_stats():
+    """Return ``stats()`` of every pool in this process by database alias."""
+    return {alias: pool.stats() for alias, pool in _pools.items()}
+
+
+def close_pools():
+    """Close all idle pooled connections, e.g. in a master before forking."""
+    for pool in list(_pools.values()):
+        pool.close()
@@ -0,0 +1,46 @@
+"""PostgreSQL backend that borrows connections from a per-process pool."""
+
+from functools import partial
+
+from django.db.backends.postgresql import base
+from psycopg2 import extensions
+
+from ..pool import get_pool
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    """
+    Route connects and closes through ``ConnectionPool``.
+
+    Django still "closes" the connection after every request (keep
+    ``CONN_MAX_AGE`` at 0); the close hands the connection back to the
+    pool, and the next connect takes it out again. Pool options come from
+    the ``POOL`` key of the database settings.
+    """
+
+    def get_pool(self):
+        return get_pool(self.alias, self.settings_dict.get('POOL') or {}, self.ping_connection)
+
+    def get_new_connection(self, conn_params):
+        return self.get_pool().acquire(partial(super().get_new_connection, conn_params))
+
+    def _close(self):
+        if self.connection is not None:
+            reusable = not self.errors_occurred and self.prepare_for_reuse(self.connection)
+            self.get_pool().release(self.connection, reusable)
+
+    def ping_connection(self, connection):
+        """Return whether a pooled connection still answers."""
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT 1')
+        return self.prepare_for_reuse(connection)
+
+    def prepare_for_reuse(self, connection):
+        """Reset ``connection`` for the next checkout; False if it can't be reused."""
+        if connection.closed:
+            return False
+        status = connection.info.transaction_status
+        if status in (extensions.TRANSACTION_STATUS_INTRANS, extensions.TRANSACTION_STATUS_INERROR):
+            connection.rollback()
+            status = connection.info.transaction_status
+        return status == extensions.TRANSACTION_STATUS_IDLE
@@ -0,0 +1,115 @@
+"""Read-replica routing with read-your-writes stickiness."""
+
+import random
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import DEFAULT_DB_ALIAS, connections
+
+PIN_CACHE_ALIAS = 'replica_pins'
+
+_request_state = ContextVar('replica_request_state', default=None)
+
+
+class _RequestState:
+    __slots__ = ('replica', 'wrote')
+
+    def __init__(self):
+        self.replica = None
+        self.wrote = False
+
+
+def replica_aliases():
+    """Return the database aliases configured as replicas of ``default``."""
+    return getattr(settings, 'DATABASE_REPLICAS', [])
+
+
+def _pin_key(user_id):
+    return f'replica-pin:{user_id}'
+
+
+def pin_to_primary(user_id):
+    """Route ``user_id``'s reads to the primary for ``DATABASE_REPLICA_STICKY_SECONDS``."""
+    if replica_aliases():
+        timeout = getattr(settings, 'DATABASE_REPLICA_STICKY_SECONDS', 10)
+        caches[PIN_CACHE_ALIAS].set(_pin_key(user_id), True, timeout=timeout)
+
+
+def read_from_replica(user):
+    """
+    Send the remaining reads of the current request to a replica.
+
+    Does nothing outside ``ReplicaMiddleware``, without replicas, after
+    the request has written, and while ``user`` is pinned to the primary
+    by a recent write. Returns whether a replica was picked.
+    """
+    state = _request_state.get()
+    aliases = replica_aliases()
+    if state is None or state.wrote or not aliases:
+        return False
+    if user.is_authenticated and caches[PIN_CACHE_ALIAS].get(_pin_key(user.pk)):
+        return False
+    state.replica = random.choice(aliases)
+    return True
+
+
+class ReplicaRouter:
+    """
+    Route reads to the replica picked by ``read_from_replica``.
+
+    Everything else, including every write and every read inside a
+    transaction on the primary, goes to ``default``. The first write of a
+    request switches its later reads back to the primary, and
+    ``ReplicaMiddleware`` then pins the user there for a while, so a
+    replica that lags behind cannot hide what they just wrote.
+    """
+
+    def db_for_read(self, model, **hints):
+        state = _request_state.get()
+        if state is None or state.replica is None:
+            return None
+        if connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return DEFAULT_DB_ALIAS
+        return state.replica
+
+    def db_for_write(self, model, **hints):
+        state = _request_state.get()
+        if state is not None:
+            state.wrote = True
+            state.replica = None
+        # Explicit, so instances loaded from a replica are saved to the primary.
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        databases = {DEFAULT_DB_ALIAS, *replica_aliases()}
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # Replicas receive the schema from the primary.
+        if db in replica_aliases():
+            return False
+        return None
+
+
+class ReplicaMiddleware:
+    """Track replica routing per request and pin users who wrote to the primary."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        state = _RequestState()
+        token = _request_state.set(state)
+        try:
+            response = self.get_response(request)
+        finally:
+            _request_state.reset(token)
+        if state.wrote:
+            # DRF copies the authenticated user onto the Django request.
+            user = getattr(request, 'user', None)
+            if user is not None and user.is_authenticated:
+                pin_to_primary(user.pk)
+        return response
@@ -0,0 +1,187 @@
+"""Prepare the database and static files for a container start."""
+
+import hashlib
+import json
+import time
+import zlib
+from contextlib import contextmanager
+from pathlib import Path
+
+from django.conf import settings
+from django.contrib.staticfiles.finders import get_finders
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, OperationalError, connections
+from django.db.migrations.loader import MigrationLoader
+from django.db.migrations.recorder import MigrationRecorder
+
+FINGERPRINT_NAME = 'build-fingerprint.json'
+STATIC_STAMP_NAME = '.fingerprint'
+# Any fixed key shared by all replicas would do.
+MIGRATION_LOCK_KEY = zlib.crc32(b'todo_project:migrate')
+
+
+class Command(BaseCommand):
+    """
+    Single-process replacement for the per-step ``manage.py`` calls at boot.
+
+    ``--build`` runs at image build time: it collects static files and
+    records a fingerprint of the migration graph and the static sources.
+    At container start the command then only migrates when the database
+    lacks a migration from that graph, and only collects static files
+    when the collected copy's stamp differs. Migrations run under a
+    PostgreSQL advisory lock, so when several replicas start together one
+    applies them and the others wait and find nothing left to do.
+    Without a build fingerprint (e.g. with the source mounted over the
+    image) both are computed at start instead.
+    """
+
+    help = 'Apply pending migrations and collect changed static files, skipping unchanged ones.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--build', action='store_true',
+            help='Collect static files and write the build fingerprint; no database needed.',
+        )
+        parser.add_argument(
+            '--force', action='store_true',
+            help='Run migrate and collectstatic without checking fingerprints.',
+        )
+        parser.add_argument(
+            '--create-superuser', action='store_true',
+            help='Create the admin/admin123 superuser if it does not exist.',
+        )
+        parser.add_argument(
+            '--db-timeout', type=float, default=60,
+            help='Seconds to wait for the database to accept connections.',
+        )
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        self.verbosity = options['verbosity']
+        if options['build']:
+            static = static_fingerprint()
+            self._collect_static(static)
+            fingerprint = {'migrations': sorted(migration_nodes()), 'static': static}
+            self._fingerprint_path().write_text(json.dumps(fingerprint, indent=2))
+            self.stdout.write(self.style.SUCCESS(f'Wrote {self._fingerprint_path()}.'))
+            return
+
+        fingerprint = {} if options['force'] else self._read_fingerprint()
+        self._wait_for_db(options['db_timeout'])
+        self._migrate(fingerprint, options['force'])
+
+        static = fingerprint.get('static') or static_fingerprint()
+        if options['force'] or self._static_stamp() != static:
+            self._collect_static(static)
+        else:
+            self.stdout.write('Static files unchanged - skipping collectstatic.')
+
+        if options['create_superuser']:
+            self._create_superuser()
+        self.stdout.write(self.style.SUCCESS(f'Boot finished in {time.perf_counter() - started:.1f}s.'))
+
+    def _migrate(self, fingerprint, force):
+        connection = connections[DEFAULT_DB_ALIAS]
+        expected = None
+        if not force:
+            expected = {tuple(node) for node in fingerprint.get('migrations', [])}
+            expected = expected or migration_nodes()
+            if self._all_applied(connection, expected):
+                self.stdout.write('Migrations unchanged - skipping migrate.')
+                return
+
+        with advisory_lock(connection, MIGRATION_LOCK_KEY):
+            # Another replica may have migrated while this one waited.
+            if not force and self._all_applied(connection, expected):
+                self.stdout.write('Migrations already applied by another instance.')
+                return
+            self.stdout.write('Applying database migrations...')
+            call_command('migrate', interactive=False, verbosity=self.verbosity)
+
+    def _all_applied(self, connection, expected):
+        """Return whether every migration in ``expected`` is recorded as applied."""
+        recorder = MigrationRecorder(connection)
+        if not recorder.has_table():
+            return False
+        return expected <= set(recorder.applied_migrations())
+
+    def _collect_static(self, fingerprint):
+        self.stdout.write('Collecting static files...')
+        call_command('collectstatic', interactive=False, verbosity=self.verbosity)
+        static_root = Path(settings.STATIC_ROOT)
+        static_root.mkdir(parents=True, exist_ok=True)
+        (static_root / STATIC_STAMP_NAME).write_text(fingerprint)
+
+    def _static_stamp(self):
+        try:
+            return (Path(settings.STATIC_ROOT) / STATIC_STAMP_NAME).read_text()
+        except OSError:
+            return None
+
+    def _fingerprint_path(self):
+        return Path(settings.BASE_DIR) / FINGERPRINT_NAME
+
+    def _read_fingerprint(self):
+        try:
+            return json.loads(self._fingerprint_path().read_text())
+        except (OSError, ValueError):
+            return {}
+
+    def _wait_for_db(self, timeout):
+        connection = connections[DEFAULT_DB_ALIAS]
+        deadline = time.monotonic() + timeout
+        while True:
+            try:
+                connection.ensure_connection()
+                return
+            except OperationalError as exc:
+                if time.monotonic() >= deadline:
+                    raise CommandError(f'Database unavailable after {timeout:.0f}s: {exc}')
+                self.stdout.write('Database is unavailable - sleeping')
+                time.sleep(1)
+
+    def _create_superuser(self):
+        from django.contrib.auth import get_user_model
+
+        User = get_user_model()
+        if User.objects.filter(username='admin').exists():
+            self.stdout.write('Superuser already exists')
+        else:
+            User.objects.create_superuser('admin', 'admin@example.com', 'admin123')
+            self.stdout.write('Superuser created: admin/admin123')
+
+
+def migration_nodes():
+    """Return the ``(app, name)`` of every migration in the project's graph."""
+    return set(MigrationLoader(None, ignore_no_migrations=True).graph.nodes)
+
+
+def static_fingerprint():
+    """Hash the paths and contents of every file ``collectstatic`` would copy."""
+    digest = hashlib.sha1()
+    files = {}
+    for finder in get_finders():
+        for path, storage in finder.list(['CVS', '.*', '*~']):
+            # The first finder to provide a path wins, as in collectstatic.
+            files.setdefault(path, storage)
+    for path in sorted(files):
+        digest.update(path.encode('utf-8') + b'\0')
+        with files[path].open(path) as source:
+            digest.update(hashlib.sha1(source.read()).digest())
+    return digest.hexdigest()
+
+
+@contextmanager
+def advisory_lock(connection, key):
+    """Hold a PostgreSQL session advisory lock; a no-op on other databases."""
+    if connection.vendor != 'postgresql':
+        yield
+        return
+    with connection.cursor() as cursor:
+        cursor.execute('SELECT pg_advisory_lock(%s)', [key])
+    try:
+        yield
+    finally:
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT pg_advisory_unlock(%s)', [key])
@@ -0,0 +1,431 @@
+"""Per-request query and latency metrics with a Prometheus endpoint."""
+
+import bisect
+import fcntl
+import hmac
+import json
+import logging
+import os
+import random
+import threading
+import time
+from contextvars import ContextVar
+from pathlib import Path
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.core.signals import request_started
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.http import HttpResponse, HttpResponseForbidden
+
+from .db.pool import WAIT_BUCKETS, pool_stats
+
+logger = logging.getLogger(__name__)
+
+DURATION_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+_timings = ContextVar('request_timings', default=None)
+_lock = threading.Lock()
+
+
+class Histogram:
+    """Prometheus histogram with one series per label combination."""
+
+    kind = 'histogram'
+
+    def __init__(self, name, help_text, buckets):
+        self.name = name
+        self.help_text = help_text
+        self.buckets = buckets
+        self._series = {}  # labels -> [bucket counts..., +Inf count, sum]
+
+    def empty(self):
+        return type(self)(self.name, self.help_text, self.buckets)
+
+    def observe(self, labels, value):
+        series = self._series.get(labels)
+        if series is None:
+            series = self._series.setdefault(labels, [0] * (len(self.buckets) + 1) + [0.0])
+        series[bisect.bisect_left(self.buckets, value)] += 1
+        series[-1] += value
+
+    def dump(self):
+        return [[labels, list(series)] for labels, series in self._series.items()]
+
+    def merge(self, rows):
+        """Add series from ``dump()`` output, e.g. another process's."""
+        for labels, series in rows:
+            labels = tuple(map(tuple, labels))
+            current = self._series.get(labels)
+            self._series[labels] = list(series) if current is None else [
+                a + b for a, b in zip(current, series)
+            ]
+
+    def expose(self):
+        lines = [f'# HELP {self.name} {self.help_text}', f'# TYPE {self.name} histogram']
+        for labels, series in sorted(self._series.items()):
+            lines.extend(histogram_lines(self.name, labels, self.buckets, series[:-1], series[-1]))
+        return lines
+
+
+class Counter:
+    """Prometheus counter with one series per label combination."""
+
+    kind = 'counter'
+
+    def __init__(self, name, help_text):
+        self.name = name
+        self.help_text = help_text
+        self._series = {}
+
+    def empty(self):
+        return type(self)(self.name, self.help_text)
+
+    def inc(self, labels):
+        self._series[labels] = self._series.get(labels, 0) + 1
+
+    def dump(self):
+        return [[labels, value] for labels, value in self._series.items()]
+
+    def merge(self, rows):
+        """Add series from ``dump()`` output, e.g. another process's."""
+        for labels, value in rows:
+            labels = tuple(map(tuple, labels))
+            self._series[labels] = self._series.get(labels, 0) + value
+
+    def expose(self):
+        lines = [f'# HELP {self.name} {self.help_text}', f'# TYPE {self.name} {self.kind}']
+        for labels, value in sorted(self._series.items()):
+            lines.append(f'{self.name}{format_labels(labels)} {value}')
+        return lines
+
+
+class Gauge(Counter):
+    """Prometheus gauge; merged processes are summed, like counters."""
+
+    kind = 'gauge'
+
+
+requests_total = Counter('http_requests_total', 'Sampled requests by view, method and status.')
+request_duration = Histogram(
+    'http_request_duration_seconds', 'Total latency of sampled requests.', DURATION_BUCKETS,
+)
+request_queries = Histogram(
+    'http_request_db_queries', 'SQL queries run by sampled requests.', QUERY_BUCKETS,
+)
+request_db_duration = Histogram(
+    'http_request_db_duration_seconds', 'Time sampled requests spent in SQL queries.', DURATION_BUCKETS,
+)
+request_serialize_duration = Histogram(
+    'http_request_serialize_duration_seconds',
+    'Time sampled requests spent rendering the response body.',
+    DURATION_BUCKETS,
+)
+REQUEST_METRICS = [
+    requests_total, request_duration, request_queries, request_db_duration, request_serialize_duration,
+]
+# Templates only; filled from pool_stats() when metrics are collected.
+POOL_METRICS = [
+    Gauge('db_pool_connections', 'Pooled database connections by state.'),
+    Counter('db_pool_timeouts_total', 'Checkouts that gave up waiting.'),
+    Histogram('db_pool_wait_seconds', 'Time spent waiting for a pooled connection.', WAIT_BUCKETS),
+]
+
+
+class _Timings:
+    __slots__ = ('queries', 'db', 'serialize', 'serialize_started')
+
+    def __init__(self):
+        self.queries = 0
+        self.db = 0.0
+        self.serialize = 0.0
+        self.serialize_started = None
+
+
+def format_labels(labels):
+    if not labels:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in labels) + '}'
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def histogram_lines(name, labels, buckets, counts, total):
+    """Return the exposition lines of one histogram series from per-bucket ``counts``."""
+    lines = []
+    cumulative = 0
+    for bound, count in zip([*map(str, buckets), '+Inf'], counts):
+        cumulative += count
+        lines.append(f'{name}_bucket{format_labels((*labels, ("le", bound)))} {cumulative}')
+    lines.append(f'{name}_sum{format_labels(labels)} {total}')
+    lines.append(f'{name}_count{format_labels(labels)} {cumulative}')
+    return lines
+
+
+def _record_query(execute, sql, params, many, context):
+    timings = _timings.get()
+    if timings is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        timings.queries += 1
+        timings.db += time.perf_counter() - started
+
+
+def _install_query_recorder(connection, **kwargs):
+    if _record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_record_query)
+
+
+class RequestMetricsMiddleware:
+    """
+    Measure a sample of requests.
+
+    A fraction ``REQUEST_METRICS_SAMPLE_RATE`` of requests is timed: SQL
+    query count and time (on every database alias), time spent rendering
+    the response body and total latency. The figures are returned in a
+    ``Server-Timing`` header and added to per-view histograms served by
+    ``metrics_view``. With a sample rate of 0 the middleware is not
+    installed at all; for unsampled requests it costs one random number.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.sample_rate = getattr(settings, 'REQUEST_METRICS_SAMPLE_RATE', 0)
+        self.slow_seconds = getattr(settings, 'REQUEST_METRICS_SLOW_SECONDS', 1.0)
+        if self.sample_rate <= 0:
+            raise MiddlewareNotUsed
+        connection_created.connect(_install_query_recorder, dispatch_uid='request_metrics')
+        if multiprocess_dir():
+            request_started.connect(_start_flusher, dispatch_uid='metrics_flusher')
+        for connection in connections.all(initialized_only=True):
+            _install_query_recorder(connection)
+
+    def __call__(self, request):
+        if self.sample_rate < 1 and random.random() >= self.sample_rate:
+            return self.get_response(request)
+
+        timings = _Timings()
+        token = _timings.set(timings)
+        started = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            _timings.reset(token)
+        total = time.perf_counter() - started
+
+        match = request.resolver_match
+        labels = (('view', match.view_name if match else 'unmatched'), ('method', request.method))
+        with _lock:
+            requests_total.inc((*labels, ('status', response.status_code)))
+            request_duration.observe(labels, total)
+            request_queries.observe(labels, timings.queries)
+            request_db_duration.observe(labels, timings.db)
+            request_serialize_duration.observe(labels, timings.serialize)
+
+        response['Server-Timing'] = (
+            f'db;dur={timings.db * 1000:.2f};desc="{timings.queries} queries", '
+            f'serialize;dur={timings.serialize * 1000:.2f}, '
+            f'total;dur={total * 1000:.2f}'
+        )
+        if total >= self.slow_seconds:
+            logger.warning(
+                'Slow request %s %s: %.0f ms, %d queries in %.0f ms',
+                request.method, request.path, total * 1000, timings.queries, timings.db * 1000,
+            )
+        return response
+
+    def process_template_response(self, request, response):
+        """Time the rendering of DRF responses, which happens after this hook."""
+        timings = _timings.get()
+        if timings is not None:
+            timings.serialize_started = time.perf_counter()
+            response.add_post_render_callback(lambda rendered: _rendered(timings))
+        return response
+
+
+def _rendered(timings):
+    timings.serialize += time.perf_counter() - timings.serialize_started
+
+
+def _pool_metrics():
+    connections_by_state, timeouts, wait = (metric.empty() for metric in POOL_METRICS)
+    for alias, stats in pool_stats().items():
+        connections_by_state.merge(
+            [((('alias', alias), ('state', state)), stats[state]) for state in ('idle', 'in_use')]
+        )
+        timeouts.merge([((('alias', alias),), stats['timeouts'])])
+        wait.merge([((('alias', alias),), [*stats['wait_buckets'].values(), stats['wait_seconds_total']])])
+    return [connections_by_state, timeouts, wait]
+
+
+def _snapshot():
+    """This process's metrics as ``{name: dump()}``."""
+    with _lock:
+        snapshot = {metric.name: metric.dump() for metric in REQUEST_METRICS}
+    snapshot.update((metric.name, metric.dump()) for metric in _pool_metrics())
+    return snapshot
+
+
+def _combine(snapshots, kinds=None):
+    """Sum ``snapshots`` into fresh metrics, keeping only ``kinds`` if given."""
+    metrics = [
+        metric.empty() for metric in [*REQUEST_METRICS, *POOL_METRICS]
+        if kinds is None or metric.kind in kinds
+    ]
+    for snapshot in snapshots:
+        for metric in metrics:
+            metric.merge(snapshot.get(metric.name, []))
+    return metrics
+
+
+# Multiprocess mode
+#
+# With REQUEST_METRICS_DIR set, every process writes its snapshot to
+# <dir>/<pid>.json every REQUEST_METRICS_FLUSH_SECONDS and /metrics/ sums
+# the files. Snapshots of exited processes are folded into dead.json,
+# without their gauges, so counters never go backwards when gunicorn
+# recycles a worker.
+
+DEAD_SNAPSHOT = 'dead.json'
+
+_flusher_pid = None
+_flusher_lock = threading.Lock()
+
+
+def multiprocess_dir():
+    return getattr(settings, 'REQUEST_METRICS_DIR', '')
+
+
+def _locked(directory):
+    """Open and ``flock`` the directory's lock file; close the result to release it."""
+    lock = open(Path(directory) / '.lock', 'a')
+    fcntl.flock(lock, fcntl.LOCK_EX)
+    return lock
+
+
+def _write_json(path, data):
+    temporary = path.with_name(path.name + '.tmp')
+    temporary.write_text(json.dumps(data))
+    os.replace(temporary, path)
+
+
+def _read_json(path):
+    try:
+        return json.loads(path.read_text())
+    except (OSError, ValueError):
+        return {}
+
+
+def _alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+def _retire(directory, pid):
+    """Fold an exited process's counters into the dead snapshot; caller holds the lock."""
+    path = Path(directory) / f'{pid}.json'
+    if not path.exists():
+        return
+    dead_path = Path(directory) / DEAD_SNAPSHOT
+    metrics = _combine([_read_json(dead_path), _read_json(path)], kinds={'counter', 'histogram'})
+    _write_json(dead_path, {metric.name: metric.dump() for metric in metrics})
+    path.unlink()
+
+
+def flush():
+    """Write this process's snapshot to ``REQUEST_METRICS_DIR``."""
+    directory = multiprocess_dir()
+    if directory:
+        Path(directory).mkdir(parents=True, exist_ok=True)
+        _write_json(Path(directory) / f'{os.getpid()}.json', _snapshot())
+
+
+def retire_process(directory, pid):
+    """Called by the gunicorn master when worker ``pid`` has exited."""
+    with _locked(directory):
+        _retire(directory, pid)
+
+
+def reset_directory(directory):
+    """Remove every snapshot, e.g. when the server starts."""
+    path = Path(directory)
+    path.mkdir(parents=True, exist_ok=True)
+    for snapshot in path.glob('*.json*'):
+        snapshot.unlink(missing_ok=True)
+
+
+def _flush_periodically():
+    interval = getattr(settings, 'REQUEST_METRICS_FLUSH_SECONDS', 5.0)
+    while True:
+        time.sleep(interval)
+        try:
+            flush()
+        except OSError:
+            logger.exception('Could not write the metrics snapshot')
+
+
+def _start_flusher(**kwargs):
+    """Start this process's flush thread; threads do not survive a fork, hence the pid."""
+    global _flusher_pid
+    if _flusher_pid == os.getpid():
+        return
+    with _flusher_lock:
+        if _flusher_pid != os.getpid():
+            _flusher_pid = os.getpid()
+            threading.Thread(target=_flush_periodically, name='metrics-flush', daemon=True).start()
+
+
+
+def collect():
+    """Return the metrics of this process, or of every process in multiprocess mode."""
+    directory = multiprocess_dir()
+    if not directory:
+        return _combine([_snapshot()])
+    flush()
+    with _locked(directory):
+        snapshots = []
+        for path in list(Path(directory).glob('*.json')):
+            if path.name == DEAD_SNAPSHOT:
+                continue
+            if not _alive(int(path.stem)):
+                _retire(directory, int(path.stem))
+                continue
+            snapshots.append(_read_json(path))
+        # Read last: _retire() may have just added to it.
+        snapshots.append(_read_json(Path(directory) / DEAD_SNAPSHOT))
+    return _combine(snapshots)
+
+
+def metrics_allowed(request):
+    """Return whether ``request`` may read internal stats: ``METRICS_TOKEN`` or ``METRICS_ALLOWED_IPS``."""
+    token = getattr(settings, 'METRICS_TOKEN', '')
+    if token and hmac.compare_digest(
+        request.META.get('HTTP_AUTHORIZATION', '').encode(), f'Bearer {token}'.encode(),
+    ):
+        return True
+    return request.META.get('REMOTE_ADDR') in getattr(settings, 'METRICS_ALLOWED_IPS', [])
+
+
+def metrics_view(request):
+    """
+    Serve request and connection pool metrics in Prometheus text format.
+
+    Only for requests with ``Authorization: Bearer <METRICS_TOKEN>`` or
+    from an address in ``METRICS_ALLOWED_IPS``.
+    """
+    if not metrics_allowed(request):
+        return HttpResponseForbidden()
+    lines = [line for metric in collect() for line in metric.expose()]
+    return HttpResponse('\n'.join(lines) + '\n', content_type='text/plain; version=0.0.4; charset=utf-8')
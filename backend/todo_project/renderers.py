@@ -0,0 +1,164 @@
+"""JSON renderers for the API."""
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.http import StreamingHttpResponse
+from rest_framework import status
+from rest_framework.renderers import JSONRenderer
+from rest_framework.response import Response
+from rest_framework.utils import encoders
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson is optional
+    orjson = None
+
+# Types orjson would encode differently from DRF's encoder are passed
+# through to it, so both produce the same bytes.
+ORJSON_OPTIONS = (
+    orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+    if orjson is not None else 0
+)
+
+
+class FastJSONRenderer(JSONRenderer):
+    """
+    ``JSONRenderer`` backed by orjson, with the stdlib encoder as fallback.
+
+    Output is identical to ``JSONRenderer``: datetimes, Decimals and the
+    other types orjson does not handle the DRF way go through DRF's
+    ``JSONEncoder.default``. The one exception is floats written with an
+    exponent (``1e100``, not ``1e+100``), which decode to the same value. The stdlib path is used when orjson is not
+    installed, when indentation is requested, when the ``UNICODE_JSON``,
+    ``COMPACT_JSON`` or ``STRICT_JSON`` settings are changed from their
+    defaults, and for payloads orjson rejects (e.g. integers over 64 bits).
+    """
+
+    default = staticmethod(encoders.JSONEncoder().default)
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        if not self._use_orjson(accepted_media_type, renderer_context):
+            return super().render(data, accepted_media_type, renderer_context)
+        try:
+            return self.dumps(data)
+        except TypeError:
+            return super().render(data, accepted_media_type, renderer_context)
+
+    def dumps(self, data):
+        """Encode ``data`` with orjson the way ``JSONRenderer`` would."""
+        ret = orjson.dumps(data, default=self.default, option=ORJSON_OPTIONS)
+        if b'\xe2\x80\xa8' in ret or b'\xe2\x80\xa9' in ret:
+            ret = ret.replace(b'\xe2\x80\xa8', b'\\u2028').replace(b'\xe2\x80\xa9', b'\\u2029')
+        return ret
+
+    def iter_render(self, data, accepted_media_type=None, renderer_context=None):
+        """
+        Yield the rendered JSON of ``data`` in pieces.
+
+        Lists, including the ``results`` of a paginated response, are
+        encoded ``JSON_STREAMING_CHUNK_SIZE`` items at a time, so the whole
+        document never has to be held in memory at once. The concatenated
+        pieces equal ``render(data)``.
+        """
+        if not self._use_orjson(accepted_media_type, renderer_context):
+            yield self.render(data, accepted_media_type, renderer_context)
+            return
+
+        if isinstance(data, list):
+            yield from self._iter_list(data)
+        elif isinstance(data, dict) and all(isinstance(key, str) for key in data):
+            yield b'{'
+            for index, (key, value) in enumerate(data.items()):
+                yield (b',' if index else b'') + self.dumps(key) + b':'
+                if isinstance(value, list):
+                    yield from self._iter_list(value)
+                else:
+                    yield self.dumps(value)
+            yield b'}'
+        else:
+            yield self.dumps(data)
+
+    def _iter_list(self, items):
+        chunk_size = getattr(settings, 'JSON_STREAMING_CHUNK_SIZE', 500)
+        yield b'['
+        for start in range(0, len(items), chunk_size):
+            chunk = self.dumps(items[start:start + chunk_size])
+            yield (b',' if start else b'') + chunk[1:-1]
+        yield b']'
+
+    def _use_orjson(self, accepted_media_type, renderer_context):
+        return (
+            orjson is not None
+            and not self.ensure_ascii and self.compact and self.strict
+            and self.get_indent(accepted_media_type, renderer_context or {}) is None
+        )
+
+
+def streaming_response(response):
+    """
+    Turn a large rendered-later ``Response`` into a streaming one.
+
+    Applies to successful responses whose renderer can stream and whose
+    ``results`` list (or top-level list) holds at least
+    ``JSON_STREAMING_THRESHOLD`` items; anything else is returned unchanged.
+    """
+    threshold = getattr(settings, 'JSON_STREAMING_THRESHOLD', 0)
+    renderer = getattr(response, 'accepted_renderer', None)
+    if (
+        not threshold
+        or not isinstance(response, Response)
+        or response.status_code != status.HTTP_200_OK
+        or not hasattr(renderer, 'iter_render')
+    ):
+        return response
+
+    data = response.data
+    items = data.get('results') if isinstance(data, dict) else data
+    if not isinstance(items, list) or len(items) < threshold:
+        return response
+
+    streaming = streaming_http_response(
+        renderer.iter_render(data, response.accepted_media_type, response.renderer_context),
+        (response.renderer_context or {}).get('request'),
+        status=response.status_code,
+        content_type=renderer.media_type,
+    )
+    for header, value in response.items():
+        if header.lower() != 'content-type':
+            streaming[header] = value
+    streaming.cookies = response.cookies
+    return streaming
+
+
+def streaming_http_response(content, request, **kwargs):
+    """
+    Return a ``StreamingHttpResponse`` over the sync iterator ``content``.
+
+    Under ASGI Django reads a sync iterator into a list before the first
+    byte is sent, so for ASGI requests ``content`` is wrapped in an async
+    iterator that advances it one chunk at a time in the request's sync
+    thread (where its database connection lives).
+    """
+    if isinstance(getattr(request, '_request', request), ASGIRequest):
+        content = _aiter_sync(content)
+    return StreamingHttpResponse(content, **kwargs)
+
+
+async def _aiter_sync(content):
+    iterator = iter(content)
+    done = object()
+    advance = sync_to_async(next, thread_sensitive=True)
+    try:
+        while True:
+            chunk = await advance(iterator, done)
+            if chunk is done:
+                return
+            yield chunk
+    finally:
+        # Releases e.g. a server-side cursor when the client goes away.
+        close = getattr(iterator, 'close', None)
+        if close is not None:
+            await sync_to_async(close, thread_sensitive=True)()
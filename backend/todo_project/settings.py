@@ -23,6 +23,7 @@ DJANGO_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',
 ]
 
 THIRD_PARTY_APPS = [
@@ -36,11 +37,14 @@ THIRD_PARTY_APPS = [
 LOCAL_APPS = [
     'apps.users',
     'apps.tasks',
+    # Project-wide management commands (boot).
+    'todo_project',
 ]
 
 INSTALLED_APPS = DJANGO_APPS + THIRD_PARTY_APPS + LOCAL_APPS
 
 MIDDLEWARE = [
+    'todo_project.metrics.RequestMetricsMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -49,6 +53,7 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'todo_project.db.replicas.ReplicaMiddleware',
 ]
 
 ROOT_URLCONF = 'todo_project.urls'
@@ -72,17 +77,49 @@ TEMPLATES = [
 WSGI_APPLICATION = 'todo_project.wsgi.application'
 
 # Database
+# With DB_POOL on, connections are borrowed from a per-process pool
+# (todo_project.db.postgresql_pool) instead of being opened per request:
+# DB_POOL_SIZE stay open, up to DB_POOL_MAX_OVERFLOW more under load, and a
+# request waits at most DB_POOL_TIMEOUT seconds for one. Connections idle
+# longer than DB_POOL_HEALTH_CHECK_AFTER seconds are pinged before reuse.
+DB_POOL = config('DB_POOL', default=False, cast=bool)
+DB_POOL_OPTIONS = {
+    'SIZE': config('DB_POOL_SIZE', default=10, cast=int),
+    'MAX_OVERFLOW': config('DB_POOL_MAX_OVERFLOW', default=10, cast=int),
+    'TIMEOUT': config('DB_POOL_TIMEOUT', default=30, cast=float),
+    'HEALTH_CHECK_AFTER': config('DB_POOL_HEALTH_CHECK_AFTER', default=10, cast=float),
+    'MAX_LIFETIME': config('DB_POOL_MAX_LIFETIME', default=1800, cast=float),
+}
+
 DATABASES = {
     'default': {
-        'ENGINE': 'django.db.backends.postgresql',
+        'ENGINE': 'todo_project.db.postgresql_pool' if DB_POOL else 'django.db.backends.postgresql',
         'NAME': config('DB_NAME'),
         'USER': config('DB_USER'),
         'PASSWORD': config('DB_PASSWORD'),
         'HOST': config('DB_HOST'),
         'PORT': config('DB_PORT', cast=int),
+        'POOL': DB_POOL_OPTIONS,
     }
 }
 
+# Read replicas
+# Aliases in DATABASES that replicate 'default' (settings_production fills
+# them from DATABASE_REPLICA_URLS). Task reads and profile reads go to a
+# replica, except for DATABASE_REPLICA_STICKY_SECONDS after the user's last
+# write; keep that above the worst replication lag. The pins live in the
+# 'replica_pins' cache, shared by the workers on a host.
+DATABASE_REPLICAS = []
+DATABASE_ROUTERS = ['todo_project.db.replicas.ReplicaRouter']
+DATABASE_REPLICA_STICKY_SECONDS = config('DATABASE_REPLICA_STICKY_SECONDS', default=10, cast=int)
+REPLICA_PIN_CACHE = {
+    'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+    'LOCATION': config(
+        'DATABASE_REPLICA_PIN_LOCATION',
+        default='/dev/shm/todo-replica-pins' if os.path.isdir('/dev/shm') else '/tmp/todo-replica-pins',
+    ),
+}
+
 # Custom User Model
 AUTH_USER_MODEL = 'users.User'
 
@@ -102,6 +139,22 @@ AUTH_PASSWORD_VALIDATORS = [
     },
 ]
 
+# Password hashing
+# PBKDF2 iterations for new and upgraded hashes; weaker existing hashes are
+# rehashed on the next login, stronger ones are kept.
+PASSWORD_HASHERS = [
+    'apps.users.hashers.PBKDF2PasswordHasher',
+    'django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher',
+    'django.contrib.auth.hashers.Argon2PasswordHasher',
+    'django.contrib.auth.hashers.BCryptSHA256PasswordHasher',
+    'django.contrib.auth.hashers.ScryptPasswordHasher',
+]
+PASSWORD_HASH_ITERATIONS = config('PASSWORD_HASH_ITERATIONS', default=600000, cast=int)
+# Threads checking passwords for the login view, and how many more logins
+# may wait for one before the view answers 503.
+PASSWORD_HASH_WORKERS = config('PASSWORD_HASH_WORKERS', default=os.cpu_count() or 1, cast=int)
+PASSWORD_HASH_QUEUE = config('PASSWORD_HASH_QUEUE', default=64, cast=int)
+
 # Internationalization
 LANGUAGE_CODE = 'en-us'
 TIME_ZONE = 'UTC'
@@ -115,10 +168,14 @@ STATIC_ROOT = BASE_DIR / 'staticfiles'
 # Default primary key field type
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
+# Covering indexes (Index.include) are PostgreSQL only; other backends
+# create them without the extra columns.
+SILENCED_SYSTEM_CHECKS = ['models.W040']
+
 # Django REST Framework
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'apps.users.authentication.CachedJWTAuthentication',
     ],
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',
@@ -131,13 +188,116 @@ REST_FRAMEWORK = {
         'rest_framework.filters.OrderingFilter',
     ],
     'DEFAULT_RENDERER_CLASSES': [
-        'rest_framework.renderers.JSONRenderer',
+        'todo_project.renderers.FastJSONRenderer',
     ],
     'DEFAULT_PARSER_CLASSES': [
-        'rest_framework.parsers.JSONParser',
+        'todo_project.parsers.FastJSONParser',
     ],
 }
 
+# Serve the task read endpoints (list, retrieve, stats) from async handlers.
+# todo_project.asgi switches this on; under WSGI the sync handlers are faster.
+ASYNC_VIEWS = config('ASYNC_VIEWS', default=False, cast=bool)
+
+# Request metrics
+# Fraction of requests (0-1) whose SQL query count, DB time, render time and
+# total latency are measured, sent back in a Server-Timing header and
+# aggregated on /metrics. 0 removes the middleware. Sampled requests slower
+# than REQUEST_METRICS_SLOW_SECONDS are logged.
+REQUEST_METRICS_SAMPLE_RATE = config('REQUEST_METRICS_SAMPLE_RATE', default=0.0, cast=float)
+REQUEST_METRICS_SLOW_SECONDS = config('REQUEST_METRICS_SLOW_SECONDS', default=1.0, cast=float)
+# With several worker processes each one writes its metrics to a file in
+# REQUEST_METRICS_DIR every REQUEST_METRICS_FLUSH_SECONDS and /metrics sums
+# them; gunicorn.conf.py sets this up when sampling is on. Empty serves
+# this process only and starts no flush thread.
+REQUEST_METRICS_DIR = config('REQUEST_METRICS_DIR', default='')
+REQUEST_METRICS_FLUSH_SECONDS = config('REQUEST_METRICS_FLUSH_SECONDS', default=5.0, cast=float)
+# /metrics answers requests with "Authorization: Bearer <METRICS_TOKEN>" or
+# from one of METRICS_ALLOWED_IPS, and 403 to everyone else.
+METRICS_TOKEN = config('METRICS_TOKEN', default='')
+METRICS_ALLOWED_IPS = config('METRICS_ALLOWED_IPS', default='127.0.0.1,::1', cast=Csv())
+
+# JSON encoding
+# List responses with at least this many results are streamed to the client
+# in chunks instead of being rendered in one piece (0 disables streaming).
+JSON_STREAMING_THRESHOLD = config('JSON_STREAMING_THRESHOLD', default=1000, cast=int)
+JSON_STREAMING_CHUNK_SIZE = config('JSON_STREAMING_CHUNK_SIZE', default=500, cast=int)
+
+# Bulk task writes
+# Rows per INSERT statement and the largest batch /api/tasks/bulk_create/ accepts.
+TASK_BULK_BATCH_SIZE = config('TASK_BULK_BATCH_SIZE', default=1000, cast=int)
+TASK_BULK_MAX_ITEMS = config('TASK_BULK_MAX_ITEMS', default=50000, cast=int)
+# Rows per UPDATE ... CASE statement in bulk patches; large CASE expressions
+# get slower per row, so this is kept well below TASK_BULK_BATCH_SIZE.
+TASK_BULK_UPDATE_BATCH_SIZE = config('TASK_BULK_UPDATE_BATCH_SIZE', default=100, cast=int)
+
+# Soft deletes
+# Deleted tasks get a deleted_at tombstone and are removed later by
+# `manage.py purge_deleted_tasks` instead of being deleted in the request.
+TASK_SOFT_DELETE = config('TASK_SOFT_DELETE', default=False, cast=bool)
+
+# Task export
+# Rows fetched per server-side cursor round trip by /api/tasks/export/.
+TASK_EXPORT_CHUNK_SIZE = config('TASK_EXPORT_CHUNK_SIZE', default=2000, cast=int)
+
+# Task statistics
+# Serve /api/tasks/stats/ from per-user counters kept up to date on writes.
+TASK_COUNTER_CACHE = config('TASK_COUNTER_CACHE', default=False, cast=bool)
+
+# Task search backend: 'postgres', 'inverted_index' or 'ilike'.
+# Empty picks 'postgres' on PostgreSQL, elsewhere 'inverted_index' with
+# DEBUG and 'ilike' without. 'inverted_index' keeps a per-process index
+# that misses other workers' writes: single-process development only.
+TASK_SEARCH_BACKEND = config('TASK_SEARCH_BACKEND', default='')
+# Users whose inverted index is kept in memory, least recently searched dropped first.
+TASK_SEARCH_INDEX_MAX_USERS = config('TASK_SEARCH_INDEX_MAX_USERS', default=100, cast=int)
+
+# Task response cache
+# Per-user versioned cache for task list/retrieve/stats with ETag support.
+# 'redis' is shared by every worker on every host and is the default once
+# TASK_RESPONSE_CACHE_REDIS_URL is set (requires the redis package). 'file'
+# is shared by the workers on one host (under /dev/shm when available, i.e.
+# in shared memory); Django culls it by listing the whole directory on
+# every write, so each write costs O(entries) and
+# TASK_RESPONSE_CACHE_MAX_ENTRIES stays small. 'locmem' is per process: a
+# version bump in one worker does not reach the others, which keep serving
+# stale pages, so it is only for a single process and gunicorn.conf.py
+# refuses it with more than one worker.
+TASK_RESPONSE_CACHE = config('TASK_RESPONSE_CACHE', default=False, cast=bool)
+TASK_RESPONSE_CACHE_TIMEOUT = config('TASK_RESPONSE_CACHE_TIMEOUT', default=300, cast=int)
+TASK_RESPONSE_CACHE_REDIS_URL = config('TASK_RESPONSE_CACHE_REDIS_URL', default='')
+TASK_RESPONSE_CACHE_BACKEND = config(
+    'TASK_RESPONSE_CACHE_BACKEND', default='redis' if TASK_RESPONSE_CACHE_REDIS_URL else 'file'
+)
+TASK_RESPONSE_CACHE_MAX_ENTRIES = config('TASK_RESPONSE_CACHE_MAX_ENTRIES', default=1000, cast=int)
+TASK_RESPONSE_CACHE_BACKENDS = {
+    'redis': {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': TASK_RESPONSE_CACHE_REDIS_URL,
+    },
+    'locmem': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'task-responses',
+        'OPTIONS': {'MAX_ENTRIES': 10000},
+    },
+    'file': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': config(
+            'TASK_RESPONSE_CACHE_LOCATION',
+            default='/dev/shm/todo-task-responses' if os.path.isdir('/dev/shm') else '/tmp/todo-task-responses',
+        ),
+        'OPTIONS': {'MAX_ENTRIES': TASK_RESPONSE_CACHE_MAX_ENTRIES},
+    },
+}
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'task_responses': TASK_RESPONSE_CACHE_BACKENDS[TASK_RESPONSE_CACHE_BACKEND],
+    'replica_pins': REPLICA_PIN_CACHE,
+}
+
 # Simple JWT
 SIMPLE_JWT = {
     'ACCESS_TOKEN_LIFETIME': timedelta(minutes=config('ACCESS_TOKEN_LIFETIME_MINUTES', cast=int)),
@@ -159,6 +319,13 @@ SIMPLE_JWT = {
     'USER_AUTHENTICATION_RULE': 'rest_framework_simplejwt.authentication.default_user_authentication_rule',
 }
 
+# Seconds a worker trusts its cached copy of a user's active flag instead of
+# loading the user on every request (0 checks the database each time).
+AUTH_USER_STATE_TTL = config('AUTH_USER_STATE_TTL', default=30, cast=int)
+
+# Upper bound on blacklisted refresh token ids each worker keeps in memory.
+TOKEN_BLACKLIST_CACHE_SIZE = config('TOKEN_BLACKLIST_CACHE_SIZE', default=100000, cast=int)
+
 # CORS
 CORS_ALLOWED_ORIGINS = config('CORS_ALLOWED_ORIGINS', cast=Csv())
 CORS_ALLOW_CREDENTIALS = True
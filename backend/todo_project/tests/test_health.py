@@ -0,0 +1,26 @@
+"""The health check is public; pool internals are not."""
+
+from unittest import mock
+
+from django.test import SimpleTestCase, override_settings
+
+POOLS = {'default': {'size': 10, 'idle': 3, 'in_use': 1}}
+
+
+@override_settings(METRICS_TOKEN='secret', METRICS_ALLOWED_IPS=['10.0.0.1'])
+@mock.patch('todo_project.urls.pool_stats', return_value=POOLS)
+class HealthCheckTests(SimpleTestCase):
+
+    def test_anonymous_callers_get_only_the_status(self, pool_stats):
+        response = self.client.get('/health/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['status'], 'ok')
+        self.assertNotIn('db_pools', response.json())
+
+    def test_token_shows_pool_stats(self, pool_stats):
+        response = self.client.get('/health/', HTTP_AUTHORIZATION='Bearer secret')
+        self.assertEqual(response.json()['db_pools'], POOLS)
+
+    def test_allowed_address_shows_pool_stats(self, pool_stats):
+        response = self.client.get('/health/', REMOTE_ADDR='10.0.0.1')
+        self.assertEqual(response.json()['db_pools'], POOLS)
@@ -0,0 +1,121 @@
+"""The orjson renderer and parser behave like DRF's JSON classes."""
+
+import io
+import uuid
+from datetime import date, datetime, time, timedelta, timezone as dt_timezone
+from decimal import Decimal
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.http import StreamingHttpResponse
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+from django.utils.translation import gettext_lazy
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+
+from apps.tasks.models import Task
+from todo_project import parsers, renderers
+from todo_project.parsers import FastJSONParser
+from todo_project.renderers import FastJSONRenderer
+
+PAYLOAD = {
+    'aware': datetime(2024, 3, 10, 12, 30, 15, 123456, tzinfo=dt_timezone.utc),
+    'naive': datetime(2024, 3, 10, 12, 30),
+    'date': date(2024, 3, 10),
+    'time': time(8, 15, 30, 500),
+    'duration': timedelta(days=1, seconds=5),
+    'decimal': Decimal('1.10'),
+    'uuid': uuid.UUID(int=1),
+    'lazy': gettext_lazy('Not found.'),
+    'separators': 'line\u2028paragraph\u2029',
+    'unicode': 'задача',
+    'numbers': [1, -2.5, 0.1, 33.33, True, None],
+    'tuple': (1, 2),
+    'int_keys': {1: 'one'},
+    'nested': [{'title': 'a'}, {'title': 'b'}],
+}
+
+
+class FastJSONRendererTests(SimpleTestCase):
+
+    def assertRendersLikeDRF(self, data, accepted_media_type=None):
+        self.assertEqual(
+            FastJSONRenderer().render(data, accepted_media_type),
+            JSONRenderer().render(data, accepted_media_type),
+        )
+
+    def test_output_matches_json_renderer(self):
+        self.assertRendersLikeDRF(PAYLOAD)
+
+    def test_indented_output_matches_json_renderer(self):
+        self.assertRendersLikeDRF(PAYLOAD, 'application/json; indent=2')
+
+    def test_exponent_floats_decode_to_the_same_value(self):
+        data = [1e100, 1e-7]
+        self.assertEqual(parsers.orjson.loads(FastJSONRenderer().render(data)), data)
+
+    def test_integers_beyond_64_bits_fall_back(self):
+        self.assertRendersLikeDRF({'big': 2 ** 70})
+
+    def test_stdlib_encoder_is_used_without_orjson(self):
+        with mock.patch.object(renderers, 'orjson', None):
+            self.assertRendersLikeDRF(PAYLOAD)
+
+    @override_settings(JSON_STREAMING_CHUNK_SIZE=2)
+    def test_iter_render_pieces_add_up_to_render(self):
+        renderer = FastJSONRenderer()
+        for data in (PAYLOAD, {'results': list(range(7)), 'next': None}, list(range(5)), []):
+            with self.subTest(data=data):
+                self.assertEqual(b''.join(renderer.iter_render(data)), renderer.render(data))
+
+
+class FastJSONParserTests(SimpleTestCase):
+
+    def parse(self, parser, body, encoding='utf-8'):
+        return parser.parse(io.BytesIO(body), parser_context={'encoding': encoding})
+
+    def test_parses_like_json_parser(self):
+        body = '{"title": "задача", "n": [1, 2.5, null, true]}'
+        for encoding in ('utf-8', 'utf-16', 'latin-1'):
+            with self.subTest(encoding=encoding):
+                raw = body.encode(encoding, errors='replace')
+                self.assertEqual(
+                    self.parse(FastJSONParser(), raw, encoding),
+                    self.parse(JSONParser(), raw, encoding),
+                )
+
+    def test_malformed_and_non_finite_numbers_are_rejected(self):
+        for body in (b'{"title": ', b'{"n": NaN}', b'{"n": Infinity}'):
+            with self.subTest(body=body), self.assertRaises(ParseError):
+                self.parse(FastJSONParser(), body)
+
+    def test_stdlib_decoder_is_used_without_orjson(self):
+        with mock.patch.object(parsers, 'orjson', None):
+            self.assertEqual(self.parse(FastJSONParser(), b'{"a": 1}'), {'a': 1})
+
+
+@override_settings(JSON_STREAMING_THRESHOLD=3, JSON_STREAMING_CHUNK_SIZE=2)
+class StreamingListTests(TestCase):
+
+    def setUp(self):
+        self.user = get_user_model().objects.create(username='alice', email='alice@example.com')
+        for n in range(4):
+            Task.objects.create(user=self.user, title=f'task {n}')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_large_pages_stream_the_same_json(self):
+        response = self.client.get(reverse('tasks:task-list'))
+        self.assertIsInstance(response, StreamingHttpResponse)
+        self.assertEqual(response['Content-Type'], 'application/json')
+        body = b''.join(response.streaming_content)
+        data = parsers.orjson.loads(body)
+        self.assertEqual(data['count'], 4)
+        self.assertEqual([item['title'] for item in data['results']], [f'task {n}' for n in range(3, -1, -1)])
+
+    def test_small_pages_are_not_streamed(self):
+        response = self.client.get(reverse('tasks:task-list'), {'page_size': 2})
+        self.assertNotIsInstance(response, StreamingHttpResponse)
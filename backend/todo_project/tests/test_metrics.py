@@ -0,0 +1,84 @@
+"""Request metrics: access control, multi-worker aggregation and the off switch."""
+
+import json
+import os
+import runpy
+import tempfile
+from pathlib import Path
+from unittest import mock
+
+from django.core.exceptions import MiddlewareNotUsed
+from django.core.signals import request_started
+from django.http import HttpResponse
+from django.test import SimpleTestCase, override_settings
+
+from todo_project import metrics
+
+LABELS = (('view', 'tasks'), ('method', 'GET'), ('status', '200'))
+
+
+def _rows(count):
+    return {'http_requests_total': [[[list(pair) for pair in LABELS], count]]}
+
+
+def _requests_total(collected):
+    return next(metric for metric in collected if metric.name == 'http_requests_total')._series.get(LABELS)
+
+
+class MetricsAccessTests(SimpleTestCase):
+
+    @override_settings(METRICS_TOKEN='secret', METRICS_ALLOWED_IPS=[])
+    def test_token_is_required(self):
+        self.assertEqual(self.client.get('/metrics/').status_code, 403)
+        self.assertEqual(self.client.get('/metrics/', HTTP_AUTHORIZATION='Bearer wrong').status_code, 403)
+        self.assertEqual(self.client.get('/metrics/', HTTP_AUTHORIZATION='Bearer secret').status_code, 200)
+
+    @override_settings(METRICS_TOKEN='', METRICS_ALLOWED_IPS=['127.0.0.1'])
+    def test_allowed_addresses(self):
+        self.assertEqual(self.client.get('/metrics/').status_code, 200)
+        self.assertEqual(self.client.get('/metrics/', REMOTE_ADDR='10.1.2.3').status_code, 403)
+
+
+class MultiprocessTests(SimpleTestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        override = override_settings(REQUEST_METRICS_DIR=self.directory)
+        override.enable()
+        self.addCleanup(override.disable)
+
+    def write(self, name, data):
+        (Path(self.directory) / name).write_text(json.dumps(data))
+
+    def test_live_and_exited_workers_are_summed(self):
+        own = _requests_total(metrics.collect()) or 0
+        self.write('1.json', _rows(4))  # pid 1 is always alive
+        self.write('999999999.json', _rows(3))
+        self.assertEqual(_requests_total(metrics.collect()), own + 7)
+        # The exited worker was folded into the dead snapshot, once.
+        self.assertFalse((Path(self.directory) / '999999999.json').exists())
+        self.assertEqual(_requests_total(metrics.collect()), own + 7)
+
+    def test_gauges_of_exited_workers_are_dropped(self):
+        self.write('999999999.json', {'db_pool_connections': [[[['alias', 'x'], ['state', 'idle']], 5]]})
+        gauge = next(metric for metric in metrics.collect() if metric.name == 'db_pool_connections')
+        self.assertNotIn((('alias', 'x'), ('state', 'idle')), gauge._series)
+
+
+class DisabledMetricsTests(SimpleTestCase):
+
+    @override_settings(REQUEST_METRICS_SAMPLE_RATE=0, REQUEST_METRICS_DIR='/tmp/unused')
+    def test_sample_rate_zero_starts_no_flusher(self):
+        request_started.disconnect(dispatch_uid='metrics_flusher')
+        with self.assertRaises(MiddlewareNotUsed):
+            metrics.RequestMetricsMiddleware(lambda request: HttpResponse())
+        self.assertFalse(request_started.disconnect(dispatch_uid='metrics_flusher'))
+
+    def test_gunicorn_sets_no_directory_without_sampling(self):
+        config = Path(__file__).resolve().parents[2] / 'gunicorn.conf.py'
+        environ = {key: value for key, value in os.environ.items() if not key.startswith('REQUEST_METRICS')}
+        with mock.patch.dict(os.environ, environ, clear=True):
+            self.assertEqual(runpy.run_path(str(config))['metrics_dir'], '')
+            self.assertNotIn('REQUEST_METRICS_DIR', os.environ)
+        with mock.patch.dict(os.environ, {**environ, 'REQUEST_METRICS_SAMPLE_RATE': '0.1'}, clear=True):
+            self.assertTrue(runpy.run_path(str(config))['metrics_dir'])
@@ -4,15 +4,28 @@ from django.contrib import admin
 from django.urls import path, include
 from django.http import JsonResponse
 
+from .db.pool import pool_stats
+from .metrics import metrics_allowed, metrics_view
+
 
 def health_check(request):
-    """Health check endpoint for monitoring."""
-    return JsonResponse({'status': 'ok', 'message': 'Todo API is running'})
+    """
+    Health check endpoint for monitoring.
+
+    Connection pool stats are added when pooling, for the same callers
+    that may read ``/metrics/``.
+    """
+    data = {'status': 'ok', 'message': 'Todo API is running'}
+    pools = pool_stats() if metrics_allowed(request) else None
+    if pools:
+        data['db_pools'] = pools
+    return JsonResponse(data)
 
 
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('health/', health_check, name='health_check'),
+    path('metrics/', metrics_view, name='metrics'),
     path('api/auth/', include('apps.users.urls')),
     path('api/tasks/', include('apps.tasks.urls')),
 ] 
\ No newline at end of file
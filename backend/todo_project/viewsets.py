@@ -0,0 +1,74 @@
+"""Async request handling for DRF viewsets."""
+
+from functools import update_wrapper
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+
+
+def async_views_enabled():
+    """Return whether viewsets serve their ``async_actions`` from coroutines."""
+    return getattr(settings, 'ASYNC_VIEWS', False)
+
+
+class AsyncActionsMixin:
+    """
+    Serve selected viewset actions from coroutine handlers.
+
+    With ``ASYNC_VIEWS`` on (``todo_project.asgi`` turns it on), each
+    action named in ``async_actions`` is handled by the coroutine method
+    ``a<action>``, e.g. ``alist`` for ``list``. Routes that map one of
+    those actions become async views; their other methods keep running
+    the sync handlers in a thread. Authentication, permissions, exception
+    handling and ``finalize_response`` behave as for sync actions.
+    """
+
+    async_actions = ()
+
+    @classmethod
+    def as_view(cls, actions=None, **initkwargs):
+        view = super().as_view(actions, **initkwargs)
+        if not async_views_enabled() or not set(actions.values()) & set(cls.async_actions):
+            return view
+
+        actions = dict(actions)
+        if 'get' in actions and 'head' not in actions:
+            actions['head'] = actions['get']
+        sync_view = sync_to_async(view)
+
+        async def async_view(request, *args, **kwargs):
+            if actions.get(request.method.lower()) not in cls.async_actions:
+                return await sync_view(request, *args, **kwargs)
+
+            self = cls(**initkwargs)
+            self.action_map = actions
+            for method, action in actions.items():
+                setattr(self, method, getattr(self, action))
+            self.request = request
+            self.args = args
+            self.kwargs = kwargs
+            return await self.adispatch(request, *args, **kwargs)
+
+        update_wrapper(async_view, view)
+        # csrf_exempt() does not keep coroutine functions recognisable.
+        async_view.csrf_exempt = True
+        return async_view
+
+    async def adispatch(self, request, *args, **kwargs):
+        """Async counterpart of ``APIView.dispatch`` for ``async_actions``."""
+        self.args = args
+        self.kwargs = kwargs
+        request = self.initialize_request(request, *args, **kwargs)
+        self.request = request
+        self.headers = self.default_response_headers
+
+        try:
+            # Authentication and throttling may touch the database.
+            await sync_to_async(self.initial)(request, *args, **kwargs)
+            handler = getattr(self, 'a' + self.action)
+            response = await handler(request, *args, **kwargs)
+        except Exception as exc:
+            response = self.handle_exception(exc)
+
+        self.response = self.finalize_response(request, response, *args, **kwargs)
+        return self.response